@@ -1,68 +1,96 @@
+import sys
 import streamlit as st
-from src.database import init_db
+from src.database import init_db, enable_query_stats
 from src.const import CACHE_TTL_SHORT, CACHE_TTL_LONG
-from src.data_service import (
+from src.data_service import get_query_stats, explain_query
+from src.query_engine import (
     get_available_symbols,
     get_earliest_transaction_date,
     load_slippage_matrix,
     get_transaction_counts,
     get_volume_matrix,
     get_routes_data,
+    get_routes_summary,
     get_route_daily_stats,
     get_route_slippage_percentile,
     get_token_stats,
     get_token_daily_stats,
 )
-from src.ui.pages import render_same_token_tab, render_routes_tab, render_zero_fee_routes_tab
+from src.ui.pages import (
+    render_same_token_tab,
+    render_routes_tab,
+    render_zero_fee_routes_tab,
+    render_query_stats_tab,
+)
 from src.auth import require_auth
+from src.ui import components, pages
+from src.ui.profiler import (
+    profiled_cache_data,
+    instrument_render_functions,
+    is_profiling_enabled,
+    start_rerun,
+    finish_rerun,
+    render_profile_panel,
+)
+
+# Render functions only record timings during a profiled rerun
+instrument_render_functions(components, pages, sys.modules[__name__])
 
 
-@st.cache_data(ttl=CACHE_TTL_LONG)
+@profiled_cache_data(ttl=CACHE_TTL_LONG)
 def cached_get_earliest_date():
     return get_earliest_transaction_date()
 
 
-@st.cache_data(ttl=CACHE_TTL_SHORT)
+@profiled_cache_data(ttl=CACHE_TTL_SHORT)
 def cached_get_available_symbols():
     return get_available_symbols()
 
 
-@st.cache_data(ttl=CACHE_TTL_SHORT)
+@profiled_cache_data(ttl=CACHE_TTL_SHORT)
 def cached_load_slippage_matrix(symbol, start_date, end_date, percentile_type):
     return load_slippage_matrix(symbol, start_date, end_date, percentile_type)
 
 
-@st.cache_data(ttl=CACHE_TTL_SHORT)
+@profiled_cache_data(ttl=CACHE_TTL_SHORT)
 def cached_get_transaction_counts(symbol, start_date, end_date):
     return get_transaction_counts(symbol, start_date, end_date)
 
 
-@st.cache_data(ttl=CACHE_TTL_SHORT)
+@profiled_cache_data(ttl=CACHE_TTL_SHORT)
 def cached_get_volume_matrix(symbol, start_date, end_date):
     return get_volume_matrix(symbol, start_date, end_date)
 
 
-@st.cache_data(ttl=CACHE_TTL_SHORT)
-def cached_get_routes_data(start_date, end_date, min_amount, max_amount):
-    return get_routes_data(start_date, end_date, min_amount, max_amount)
+@profiled_cache_data(ttl=CACHE_TTL_SHORT)
+def cached_get_routes_page(start_date, end_date, min_amount, max_amount, stablecoin_filter, order_by, limit, after):
+    return get_routes_data(
+        start_date, end_date, min_amount, max_amount, stablecoin_filter,
+        order_by=order_by, limit=limit, after=after,
+    )
+
+
+@profiled_cache_data(ttl=CACHE_TTL_SHORT)
+def cached_get_routes_summary(start_date, end_date, min_amount, max_amount, stablecoin_filter):
+    return get_routes_summary(start_date, end_date, min_amount, max_amount, stablecoin_filter)
 
 
-@st.cache_data(ttl=CACHE_TTL_LONG)
+@profiled_cache_data(ttl=CACHE_TTL_LONG)
 def cached_get_token_stats(symbol, start_date, end_date):
     return get_token_stats(symbol, start_date, end_date)
 
 
-@st.cache_data(ttl=CACHE_TTL_SHORT)
+@profiled_cache_data(ttl=CACHE_TTL_SHORT)
 def cached_get_token_daily_stats(symbol, start_date, end_date):
     return get_token_daily_stats(symbol, start_date, end_date)
 
 
-@st.cache_data(ttl=CACHE_TTL_SHORT)
+@profiled_cache_data(ttl=CACHE_TTL_SHORT)
 def cached_get_route_daily_stats(source_token, source_chain, dest_token, dest_chain, start_date, end_date):
     return get_route_daily_stats(source_token, source_chain, dest_token, dest_chain, start_date, end_date)
 
 
-@st.cache_data(ttl=CACHE_TTL_SHORT)
+@profiled_cache_data(ttl=CACHE_TTL_SHORT)
 def cached_get_route_slippage_percentile(source_token, source_chain, dest_token, dest_chain, percentile_type, start_date, end_date):
     return get_route_slippage_percentile(source_token, source_chain, dest_token, dest_chain, percentile_type, start_date, end_date)
 
@@ -73,50 +101,68 @@ def main():
     # Require authentication before showing any content
     require_auth()
 
-    init_db()
+    profiling = is_profiling_enabled()
+    if profiling:
+        start_rerun()
 
-    symbols = cached_get_available_symbols()
-    if not symbols:
-        st.error("No tokens found in database. Please run the collector first.")
-        st.stop()
+    # Schema check runs on the first rerun of this process only
+    init_db()
+    enable_query_stats()
 
-    earliest_date = cached_get_earliest_date()
+    # Sidebar navigation (the Query Stats admin page is only listed with ?admin=1)
+    page_names = ["Routes Analysis", "Same Token Transfers", "Zero Fee Routes"]
+    if st.query_params.get("admin") == "1":
+        page_names.append("Query Stats")
 
-    # Sidebar navigation
     with st.sidebar:
         st.header("Navigation")
         page = st.radio(
             "Go to",
-            ["Routes Analysis", "Same Token Transfers", "Zero Fee Routes"],
+            page_names,
             label_visibility="collapsed",
         )
 
     st.title("Stablecoin Bridge Analytics")
     st.markdown("### Cross-Chain Bridging Analysis Dashboard")
 
+    # Each page queries only the data it shows
     if page == "Routes Analysis":
         render_routes_tab(
-            earliest_date=earliest_date,
-            get_routes_data_fn=cached_get_routes_data,
+            earliest_date=cached_get_earliest_date(),
+            get_routes_data_fn=cached_get_routes_page,
+            get_routes_summary_fn=cached_get_routes_summary,
             get_route_daily_stats_fn=cached_get_route_daily_stats,
             get_route_slippage_percentile_fn=cached_get_route_slippage_percentile,
         )
     elif page == "Same Token Transfers":
+        symbols = cached_get_available_symbols()
+        if not symbols:
+            st.error("No tokens found in database. Please run the collector first.")
+            st.stop()
+
         render_same_token_tab(
             symbols=symbols,
-            earliest_date=earliest_date,
+            earliest_date=cached_get_earliest_date(),
             get_token_stats_fn=cached_get_token_stats,
             load_slippage_matrix_fn=cached_load_slippage_matrix,
             get_transaction_counts_fn=cached_get_transaction_counts,
             get_volume_matrix_fn=cached_get_volume_matrix,
             get_token_daily_stats_fn=cached_get_token_daily_stats,
         )
+    elif page == "Query Stats":
+        render_query_stats_tab(
+            get_query_stats_fn=get_query_stats,
+            explain_query_fn=explain_query,
+        )
     else:  # Zero Fee Routes
         render_zero_fee_routes_tab()
 
     st.markdown("---")
     st.caption("**Slippage Formula:** (Amount In - Amount Out) / Amount In x 100%")
 
+    if profiling:
+        render_profile_panel(*finish_rerun())
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,122 @@
+"""Benchmark collector throughput and completeness against the local mock API.
+
+Runs collect_window over the newest pages of a synthetic dataset and checks
+that every transaction in the window reached the database. Point DATABASE_URL
+at a scratch database: the benchmark writes to it.
+
+Usage:
+    uv run python -m benchmarks.collector_bench --pages 50 --throttle-rate 0.05
+"""
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.common import Stopwatch, add_output_argument, emit_report, rate
+from benchmarks.synthetic import SyntheticTransactions
+from benchmarks.mock_api_server import MockApiConfig, create_server, start_in_background
+
+
+def run_benchmark(
+    transactions: int,
+    pages: int,
+    seed: int = 42,
+    latency_ms: float = 0.0,
+    error_rate: float = 0.0,
+    throttle_rate: float = 0.0,
+    archive: bool = False,
+) -> dict:
+    """Collect the newest `pages` pages from a mock server and report throughput."""
+    if not archive:
+        os.environ["ARCHIVE_DIR"] = ""
+
+    from src import api_client
+    from src.api_client import ApiClient, AdaptiveRateController
+    from src.database import SessionLocal, BridgeTransaction, init_db
+    from src.const import PAGINATION_SIZE
+    from scripts.collector import collect_window
+
+    dataset = SyntheticTransactions(transactions, seed)
+    config = MockApiConfig(
+        latency_ms=latency_ms,
+        error_rate=error_rate,
+        throttle_rate=throttle_rate,
+        retry_after=0,
+        seed=seed,
+    )
+    server = create_server(dataset, config, port=0)
+    url = start_in_background(server)
+
+    # No pacing: measure the collector, not the production rate limit
+    api_client._client = ApiClient(
+        url=url,
+        rate_controller=AdaptiveRateController(initial_delay=0, min_delay=0, max_delay=1),
+    )
+
+    first_index = max(0, len(dataset) - pages * PAGINATION_SIZE)
+    window_start = dataset.timestamp(first_index).replace(microsecond=0)
+    window_end = dataset.end
+    expected = len(dataset) - dataset.index_at(window_start)
+
+    init_db()
+    db = SessionLocal()
+    try:
+        with Stopwatch() as elapsed:
+            result = collect_window(db, window_start, window_end)
+
+        stored_in_window = (
+            db.query(BridgeTransaction)
+            .filter(
+                BridgeTransaction.created_at >= window_start,
+                BridgeTransaction.created_at < window_end,
+            )
+            .count()
+        )
+    finally:
+        db.close()
+        server.shutdown()
+        server.server_close()
+
+    return {
+        "transactions": transactions,
+        "seed": seed,
+        "window_start": window_start.isoformat(),
+        "window_end": window_end.isoformat(),
+        "pages": result["pages"],
+        "fetched": result["fetched"],
+        "stored": result["stored"],
+        "complete": result["complete"],
+        "expected_in_window": expected,
+        "rows_in_window": stored_in_window,
+        "elapsed_seconds": round(elapsed.seconds, 3),
+        "pages_per_second": rate(result["pages"], elapsed.seconds, 2),
+        "transactions_per_second": rate(result["fetched"], elapsed.seconds, 1),
+        "server": dict(config.stats),
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark the collector against the mock API")
+    parser.add_argument("--transactions", type=int, default=1_000_000, help="Synthetic dataset size")
+    parser.add_argument("--pages", type=int, default=20, help="Newest pages to collect")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--archive", action="store_true", help="Also write the raw page archive")
+    add_output_argument(parser)
+    args = parser.parse_args()
+
+    report = run_benchmark(
+        transactions=args.transactions,
+        pages=args.pages,
+        seed=args.seed,
+        latency_ms=args.latency_ms,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        archive=args.archive,
+    )
+    emit_report(report, args.output)
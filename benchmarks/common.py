@@ -0,0 +1,41 @@
+"""Timing and report helpers shared by the benchmarks."""
+import argparse
+import json
+import time
+from pathlib import Path
+
+
+class Stopwatch:
+    """Context manager measuring wall-clock seconds with perf_counter."""
+
+    def __init__(self):
+        self.seconds = 0.0
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.seconds = time.perf_counter() - self._started
+
+
+def rate(count: int, elapsed: float, ndigits: int | None = None) -> float | None:
+    """Items per second, or None if nothing measurable elapsed."""
+    if not elapsed:
+        return None
+    return round(count / elapsed, ndigits)
+
+
+def add_output_argument(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--output", help="Write the JSON result to this file")
+
+
+def write_report(report: dict, path: str) -> None:
+    Path(path).write_text(json.dumps(report, indent=2) + "\n")
+
+
+def emit_report(report: dict, path: str | None = None) -> None:
+    """Print a benchmark result as JSON and optionally write it to path."""
+    print(json.dumps(report, indent=2))
+    if path:
+        write_report(report, path)
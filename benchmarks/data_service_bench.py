@@ -0,0 +1,221 @@
+"""Benchmark data_service functions across TIME_PERIODS.
+
+Each function runs `repeats` times per time period (ending at the newest
+transaction date). Latency is reported as p50/p95 and "rows scanned" is taken
+from EXPLAIN ANALYZE of the statements the function issued: rows returned by
+scan nodes plus rows they filtered out. Results are JSON so runs on different
+commits can be compared.
+
+Usage:
+    uv run python -m benchmarks.synthetic --rows 5000000 --reset
+    uv run python -m benchmarks.data_service_bench --output before.json
+    uv run python -m benchmarks.data_service_bench --compare before.json after.json
+"""
+import json
+import subprocess
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+from benchmarks.common import Stopwatch, add_output_argument, write_report
+from sqlalchemy import event, func, text
+from src import data_service
+from src.database import SessionLocal, BridgeTransaction, engine
+from src.const import TIME_PERIODS, STABLECOIN_FILTER_ONLY, ROUTES_PAGE_SIZE
+
+DEFAULT_SYMBOL = "USDC"
+
+
+class StatementRecorder:
+    """Captures statements executed on the engine while active."""
+
+    def __init__(self):
+        self.active = False
+        self.statements = []
+        event.listen(engine, "before_cursor_execute", self._record)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        if self.active and not executemany:
+            self.statements.append((statement, parameters))
+
+    def __enter__(self):
+        self.statements = []
+        self.active = True
+        return self
+
+    def __exit__(self, *exc):
+        self.active = False
+
+
+def _scan_rows(plan: dict) -> int:
+    """Sum rows read by scan nodes in an EXPLAIN (ANALYZE, FORMAT JSON) plan."""
+    rows = 0
+    if "Scan" in plan.get("Node Type", ""):
+        loops = plan.get("Actual Loops", 1)
+        rows += (plan.get("Actual Rows", 0) + plan.get("Rows Removed by Filter", 0)) * loops
+    for child in plan.get("Plans", []):
+        rows += _scan_rows(child)
+    return rows
+
+
+def rows_scanned(statements: list[tuple[str, object]]) -> int:
+    """Re-run captured SELECTs under EXPLAIN ANALYZE and total their scanned rows."""
+    total = 0
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        for statement, parameters in statements:
+            if not statement.lstrip().upper().startswith("SELECT"):
+                continue
+            cursor.execute(f"EXPLAIN (ANALYZE, FORMAT JSON) {statement}", parameters)
+            plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            total += _scan_rows(plan[0]["Plan"])
+        connection.rollback()
+    finally:
+        connection.close()
+    return total
+
+
+def get_benchmark_cases(symbol: str) -> list[tuple[str, callable]]:
+    """Build (name, fn(start_date, end_date)) cases for every data_service query."""
+    routes = data_service.get_routes_data()
+    if routes.empty:
+        raise RuntimeError("No routes in database, load a dataset with benchmarks.synthetic first")
+    top = routes.iloc[0]
+    route = (top["Source Token"], top["Source Chain"], top["Dest Token"], top["Dest Chain"])
+
+    return [
+        ("get_earliest_transaction_date", lambda s, e: data_service.get_earliest_transaction_date()),
+        ("get_available_symbols", lambda s, e: data_service.get_available_symbols()),
+        ("get_overall_stats", lambda s, e: data_service.get_overall_stats(s, e)),
+        ("get_routes_data", lambda s, e: data_service.get_routes_data(s, e)),
+        ("get_routes_data[1k-10k]", lambda s, e: data_service.get_routes_data(s, e, 1000, 10000)),
+        (
+            "get_routes_data[stablecoins]",
+            lambda s, e: data_service.get_routes_data(s, e, stablecoin_filter=STABLECOIN_FILTER_ONLY),
+        ),
+        (
+            "get_routes_data[page]",
+            lambda s, e: data_service.get_routes_data(s, e, limit=ROUTES_PAGE_SIZE),
+        ),
+        ("get_routes_summary", lambda s, e: data_service.get_routes_summary(s, e)),
+        ("load_slippage_matrix[avg]", lambda s, e: data_service.load_slippage_matrix(symbol, s, e, "avg")),
+        ("load_slippage_matrix[p50]", lambda s, e: data_service.load_slippage_matrix(symbol, s, e, 50)),
+        ("get_transaction_counts", lambda s, e: data_service.get_transaction_counts(symbol, s, e)),
+        ("get_volume_matrix", lambda s, e: data_service.get_volume_matrix(symbol, s, e)),
+        ("get_token_stats", lambda s, e: data_service.get_token_stats(symbol, s, e)),
+        ("get_token_daily_stats", lambda s, e: data_service.get_token_daily_stats(symbol, s, e)),
+        ("get_route_daily_stats", lambda s, e: data_service.get_route_daily_stats(*route, s, e)),
+        (
+            "get_route_slippage_percentile[p95]",
+            lambda s, e: data_service.get_route_slippage_percentile(*route, 95, s, e),
+        ),
+    ]
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(symbol: str = DEFAULT_SYMBOL, repeats: int = 5) -> dict:
+    """Run every case for every time period and collect latency and scan stats."""
+    db = SessionLocal()
+    try:
+        total_rows = db.query(func.count(BridgeTransaction.id)).scalar()
+        newest = db.query(func.max(BridgeTransaction.created_at)).scalar()
+    finally:
+        db.close()
+    end_date = (newest or datetime.utcnow()).date()
+
+    recorder = StatementRecorder()
+    results = []
+    for name, case in get_benchmark_cases(symbol):
+        for period, days in TIME_PERIODS.items():
+            start_date = end_date - timedelta(days=days) if days else None
+            period_end = end_date if days else None
+
+            timings = []
+            for _ in range(repeats):
+                with recorder, Stopwatch() as stopwatch:
+                    case(start_date, period_end)
+                timings.append(stopwatch.seconds * 1000)
+            statements = list(recorder.statements)
+
+            results.append({
+                "function": name,
+                "period": period,
+                "p50_ms": round(float(np.percentile(timings, 50)), 2),
+                "p95_ms": round(float(np.percentile(timings, 95)), 2),
+                "min_ms": round(min(timings), 2),
+                "statements": len(statements),
+                "rows_scanned": rows_scanned(statements),
+            })
+            print(f"  {name:<36} {period:<9} p50={results[-1]['p50_ms']:>9.2f}ms "
+                  f"rows_scanned={results[-1]['rows_scanned']:,}")
+
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "run_at": datetime.utcnow().isoformat(),
+            "rows": total_rows,
+            "symbol": symbol,
+            "repeats": repeats,
+            "postgres": _server_version(),
+        },
+        "results": results,
+    }
+
+
+def _server_version() -> str:
+    with engine.connect() as conn:
+        return conn.execute(text("SHOW server_version")).scalar()
+
+
+def compare(base_path: str, new_path: str) -> None:
+    """Print p50 latency and rows scanned deltas between two result files."""
+    base = json.loads(Path(base_path).read_text())
+    new = json.loads(Path(new_path).read_text())
+    base_results = {(r["function"], r["period"]): r for r in base["results"]}
+
+    print(f"{base['meta'].get('commit')} -> {new['meta'].get('commit')}")
+    for result in new["results"]:
+        key = (result["function"], result["period"])
+        before = base_results.get(key)
+        if not before:
+            continue
+        change = (result["p50_ms"] / before["p50_ms"] - 1) * 100 if before["p50_ms"] else 0
+        print(
+            f"  {key[0]:<36} {key[1]:<9} "
+            f"p50 {before['p50_ms']:>9.2f} -> {result['p50_ms']:>9.2f}ms ({change:+.1f}%)  "
+            f"rows {before['rows_scanned']:,} -> {result['rows_scanned']:,}"
+        )
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark data_service query functions")
+    parser.add_argument("--symbol", default=DEFAULT_SYMBOL, help="Token symbol for per-token functions")
+    parser.add_argument("--repeats", type=int, default=5, help="Runs per function and period")
+    add_output_argument(parser)
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"), help="Compare two result files")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+    else:
+        report = run_benchmarks(args.symbol, args.repeats)
+        if args.output:
+            write_report(report, args.output)
+            print(f"\nResults written to {args.output}")
@@ -0,0 +1,82 @@
+"""Microbenchmark page decoding throughput.
+
+Decodes synthetic API pages two ways: row by row as store_transactions used
+to (float(), fromisoformat() and slippage per transaction), and columnar via
+decode_page. Reports transactions/sec for each so changes to the decoder can
+be compared between commits.
+
+Usage:
+    uv run python -m benchmarks.decode_bench --pages 200
+"""
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.common import Stopwatch, add_output_argument, emit_report, rate
+from benchmarks.synthetic import SyntheticTransactions
+from src.page_decoder import decode_page
+from src.const import (
+    PAGINATION_SIZE,
+    FIELD_AMOUNT_IN,
+    FIELD_AMOUNT_OUT,
+    FIELD_CREATED_AT,
+    FIELD_DEPOSIT_KEY,
+    FIELD_DEST_ASSET,
+    FIELD_ORIGIN_ASSET,
+)
+
+
+def decode_rows(transactions: list) -> list[tuple]:
+    """Reference per-row decoding, as done before the columnar decoder."""
+    rows = []
+    for tx in transactions:
+        amount_in = float(tx.get(FIELD_AMOUNT_IN, 0))
+        amount_out = float(tx.get(FIELD_AMOUNT_OUT, 0))
+        slippage = ((amount_in - amount_out) / amount_in) * 100 if amount_in > 0 else 0
+        created_at = datetime.fromisoformat(tx[FIELD_CREATED_AT].replace("Z", "+00:00"))
+        created_at = created_at.astimezone(timezone.utc).replace(tzinfo=None)
+        rows.append((
+            tx[FIELD_DEPOSIT_KEY], tx[FIELD_ORIGIN_ASSET], tx[FIELD_DEST_ASSET],
+            amount_in, amount_out, slippage, created_at,
+        ))
+    return rows
+
+
+def run_benchmark(pages: int = 100, seed: int = 42) -> dict:
+    """Time per-row and columnar decoding of the same pages."""
+    dataset = SyntheticTransactions(pages * PAGINATION_SIZE, seed)
+    page_list = [
+        [dataset.transaction(i) for i in range(offset, offset + PAGINATION_SIZE)]
+        for offset in range(0, len(dataset), PAGINATION_SIZE)
+    ]
+    transactions = pages * PAGINATION_SIZE
+
+    with Stopwatch() as per_row:
+        for page in page_list:
+            decode_rows(page)
+
+    with Stopwatch() as columnar:
+        for page in page_list:
+            decode_page(page)
+
+    return {
+        "pages": pages,
+        "transactions": transactions,
+        "per_row_per_second": rate(transactions, per_row.seconds),
+        "columnar_per_second": rate(transactions, columnar.seconds),
+        "columnar_ms_per_page": round(columnar.seconds / pages * 1000, 3),
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark API page decoding throughput")
+    parser.add_argument("--pages", type=int, default=100, help="Pages of PAGINATION_SIZE transactions")
+    parser.add_argument("--seed", type=int, default=42)
+    add_output_argument(parser)
+    args = parser.parse_args()
+
+    emit_report(run_benchmark(args.pages, args.seed), args.output)
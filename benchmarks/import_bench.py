@@ -0,0 +1,89 @@
+"""Measure the import cost of the dashboard and guard against heavy eager imports.
+
+Imports a module (app by default) in fresh interpreters with -X importtime,
+reports the median total import time and the slowest modules, and fails
+if a module that should only load on demand (charts, styling colormaps,
+optional profilers) is imported eagerly or the time exceeds --max-ms.
+
+Usage:
+    uv run python -m benchmarks.import_bench
+    uv run python -m benchmarks.import_bench --max-ms 1500 --output imports.json
+"""
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+from benchmarks.common import add_output_argument, emit_report
+
+ROOT = Path(__file__).parent.parent
+
+# Only needed once a chart, styled matrix or profile dump is rendered
+LAZY_MODULES = ("altair", "matplotlib", "pyinstrument", "zstandard", "duckdb")
+
+
+def _import_once(module: str) -> tuple[float, dict[str, float], list[str]]:
+    """Import module in a fresh interpreter. Returns (total ms, cumulative ms per module, loaded modules)."""
+    script = f"import sys, json, {module}; print(json.dumps(sorted(sys.modules)))"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", script],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        cumulative[name.strip()] = int(cumulative_us) / 1000
+    # The module's own line covers everything it imported that wasn't loaded yet
+    total_ms = cumulative.get(module, 0.0)
+    loaded = json.loads(result.stdout.strip().splitlines()[-1])
+    return total_ms, cumulative, loaded
+
+
+def run_benchmark(module: str = "app", repeats: int = 5, top: int = 15) -> dict:
+    """Import module `repeats` times and report timings and eagerly loaded lazy modules."""
+    totals = []
+    cumulative = {}
+    loaded = []
+    for _ in range(repeats):
+        total_ms, cumulative, loaded = _import_once(module)
+        totals.append(total_ms)
+
+    eager = {name.split(".")[0] for name in loaded} & set(LAZY_MODULES)
+    slowest = sorted(cumulative.items(), key=lambda item: item[1], reverse=True)[:top]
+    return {
+        "module": module,
+        "repeats": repeats,
+        "median_ms": round(statistics.median(totals), 1),
+        "min_ms": round(min(totals), 1),
+        "modules_loaded": len(loaded),
+        "eager_lazy_modules": sorted(eager),
+        "slowest": [{"module": name, "cumulative_ms": round(ms, 1)} for name, ms in slowest],
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark dashboard import time")
+    parser.add_argument("--module", default="app", help="Module to import")
+    parser.add_argument("--repeats", type=int, default=5, help="Fresh interpreters to time")
+    parser.add_argument("--top", type=int, default=15, help="Slowest modules to list")
+    parser.add_argument("--max-ms", type=float, help="Fail if the median import time exceeds this")
+    add_output_argument(parser)
+    args = parser.parse_args()
+
+    report = run_benchmark(args.module, args.repeats, args.top)
+    emit_report(report, args.output)
+
+    failures = []
+    if report["eager_lazy_modules"]:
+        failures.append(f"imported eagerly: {', '.join(report['eager_lazy_modules'])}")
+    if args.max_ms is not None and report["median_ms"] > args.max_ms:
+        failures.append(f"median {report['median_ms']}ms exceeds {args.max_ms}ms")
+    if failures:
+        print(f"\nFAILED: {'; '.join(failures)}")
+        sys.exit(1)
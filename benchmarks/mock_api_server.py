@@ -0,0 +1,194 @@
+"""Local stand-in for the Near Intents /api/v0/transactions endpoint.
+
+Serves synthetic transactions with the same query contract the collector uses
+(numberOfTransactions, startTimestamp, endTimestamp, direction, statuses), with
+optional latency, server errors and 429 throttling injected.
+
+Usage:
+    uv run python -m benchmarks.mock_api_server --transactions 5000000 --port 8080
+    API_URL=http://127.0.0.1:8080/api/v0/transactions uv run python scripts/collector.py
+"""
+import gzip
+import json
+import random
+import sys
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlparse, parse_qs
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.synthetic import SyntheticTransactions
+
+API_PATH = "/api/v0/transactions"
+MAX_PAGE_SIZE = 1000
+
+
+def _parse_timestamp(value: str | None) -> datetime | None:
+    if not value:
+        return None
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).replace(tzinfo=None)
+
+
+class MockApiConfig:
+    """Failure injection and latency settings shared by request handlers."""
+
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        retry_after: int = 1,
+        seed: int = 42,
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = {"requests": 0, "ok": 0, "errors": 0, "throttled": 0, "transactions": 0}
+
+    def count(self, key: str, amount: int = 1) -> None:
+        with self.lock:
+            self.stats[key] += amount
+
+    def roll(self) -> tuple[float, float]:
+        with self.lock:
+            return self.rng.random(), self.rng.uniform(-1, 1)
+
+
+class MockApiHandler(BaseHTTPRequestHandler):
+    dataset: SyntheticTransactions
+    config: MockApiConfig
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, body, headers: dict | None = None) -> None:
+        payload = json.dumps(body, separators=(",", ":")).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            payload = gzip.compress(payload, compresslevel=1)
+            self.send_header("Content-Encoding", "gzip")
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        config = self.config
+        config.count("requests")
+        url = urlparse(self.path)
+        if url.path != API_PATH:
+            self._send_json(404, {"error": "Not found"})
+            return
+
+        outcome, jitter = config.roll()
+        delay_ms = config.latency_ms + jitter * config.jitter_ms
+        if delay_ms > 0:
+            time.sleep(delay_ms / 1000)
+
+        if outcome < config.throttle_rate:
+            config.count("throttled")
+            self._send_json(
+                429, {"error": "Too many requests"}, {"Retry-After": str(config.retry_after)}
+            )
+            return
+        if outcome < config.throttle_rate + config.error_rate:
+            config.count("errors")
+            self._send_json(500, {"error": "Injected server error"})
+            return
+
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        try:
+            limit = int(params.get("numberOfTransactions", MAX_PAGE_SIZE))
+            start = _parse_timestamp(params.get("startTimestamp"))
+            end = _parse_timestamp(params.get("endTimestamp"))
+        except ValueError as e:
+            self._send_json(400, {"error": str(e)})
+            return
+        if not 1 <= limit <= MAX_PAGE_SIZE:
+            self._send_json(400, {"error": f"numberOfTransactions must be 1-{MAX_PAGE_SIZE}"})
+            return
+
+        # Every synthetic transaction is successful
+        statuses = params.get("statuses", "SUCCESS").split(",")
+        if "SUCCESS" not in statuses:
+            transactions = []
+        else:
+            transactions = self.dataset.page(limit, start, end, params.get("direction", "next"))
+
+        config.count("ok")
+        config.count("transactions", len(transactions))
+        self._send_json(200, transactions)
+
+
+def create_server(
+    dataset: SyntheticTransactions,
+    config: MockApiConfig | None = None,
+    host: str = "127.0.0.1",
+    port: int = 8080,
+) -> ThreadingHTTPServer:
+    """Create (but don't start) a mock API server. Port 0 picks a free port."""
+    handler = type(
+        "BoundMockApiHandler",
+        (MockApiHandler,),
+        {"dataset": dataset, "config": config or MockApiConfig()},
+    )
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def start_in_background(server: ThreadingHTTPServer) -> str:
+    """Serve in a daemon thread. Returns the API URL."""
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}{API_PATH}"
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve synthetic transactions over the Near Intents API contract")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--transactions", type=int, default=1_000_000, help="Synthetic dataset size")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--start", type=datetime.fromisoformat, help="Oldest transaction time (defaults to DATA_START_DATE)")
+    parser.add_argument("--end", type=datetime.fromisoformat, help="Newest transaction time (defaults to now)")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Mean added response latency")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Uniform +/- latency jitter")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 500")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds sent with 429s")
+    args = parser.parse_args()
+
+    dataset = SyntheticTransactions(args.transactions, args.seed, args.start, args.end)
+    config = MockApiConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        retry_after=args.retry_after,
+        seed=args.seed,
+    )
+    server = create_server(dataset, config, args.host, args.port)
+    print(f"Serving {len(dataset):,} synthetic transactions ({dataset.start} -> {dataset.end})")
+    print(f"API_URL=http://{args.host}:{server.server_address[1]}{API_PATH}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"\nStats: {config.stats}")
@@ -0,0 +1,82 @@
+"""Microbenchmark parse_asset_id throughput.
+
+Parses a skewed stream of asset IDs (every protocol the parser supports,
+weighted like the synthetic dataset) three ways: unmemoized, memoized one
+at a time, and per page through parse_asset_ids. Reports parses/sec for
+each so changes to the parser can be compared between commits.
+
+Usage:
+    uv run python -m benchmarks.parser_bench --parses 2000000
+"""
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.common import Stopwatch, add_output_argument, emit_report, rate
+from benchmarks.synthetic import build_assets
+from src.const import CHAIN_ID_MAP, PAGINATION_SIZE
+from src.parser import parse_asset_id, parse_asset_ids, clear_parser_cache
+
+
+def build_asset_stream(count: int, seed: int = 42) -> list[str]:
+    """Get `count` asset IDs drawn with the synthetic popularity weights."""
+    assets = build_assets()
+    asset_ids = [asset["asset_id"] for asset in assets]
+    weights = [asset["weight"] for asset in assets]
+
+    # Cover the nep245 and 1cs_v1 parsers and unmapped tokens too
+    for chain_id in CHAIN_ID_MAP:
+        asset_ids.append(f"nep245:v2_1.omni.hot.tg:{chain_id}_11111111111111111111")
+        weights.append(1.0)
+    for i in range(50):
+        asset_ids.append(f"1cs_v1:base:erc20:0x{i:040x}")
+        weights.append(0.5)
+
+    rng = random.Random(seed)
+    return rng.choices(asset_ids, weights=weights, k=count)
+
+
+def run_benchmark(parses: int = 1_000_000, seed: int = 42) -> dict:
+    """Time unmemoized, memoized and batched parsing of the same stream."""
+    stream = build_asset_stream(parses, seed)
+    unmemoized = parse_asset_id.__wrapped__
+    page_size = PAGINATION_SIZE * 2  # origin and destination asset per transaction
+
+    with Stopwatch() as uncached:
+        for asset_id in stream:
+            unmemoized(asset_id)
+
+    clear_parser_cache()
+    with Stopwatch() as cached:
+        for asset_id in stream:
+            parse_asset_id(asset_id)
+    cache_info = parse_asset_id.cache_info()
+
+    clear_parser_cache()
+    with Stopwatch() as batched:
+        for offset in range(0, len(stream), page_size):
+            parse_asset_ids(stream[offset:offset + page_size])
+
+    return {
+        "parses": parses,
+        "distinct_asset_ids": len(set(stream)),
+        "uncached_per_second": rate(parses, uncached.seconds),
+        "memoized_per_second": rate(parses, cached.seconds),
+        "batched_per_second": rate(parses, batched.seconds),
+        "cache_hits": cache_info.hits,
+        "cache_misses": cache_info.misses,
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark asset ID parsing throughput")
+    parser.add_argument("--parses", type=int, default=1_000_000, help="Asset IDs to parse per mode")
+    parser.add_argument("--seed", type=int, default=42)
+    add_output_argument(parser)
+    args = parser.parse_args()
+
+    emit_report(run_benchmark(args.parses, args.seed), args.output)
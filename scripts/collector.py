@@ -7,84 +7,318 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from src.database import SessionLocal, init_db
 from src.api_client import fetch_transactions_page
-from src.transaction_service import store_transactions, get_oldest_transaction_timestamp
+from src.transaction_service import (
+    store_batch,
+    is_page_known,
+    preload_recent_keys,
+    get_oldest_transaction_timestamp,
+    get_newest_transaction_timestamp,
+)
+from src.page_decoder import decode_page
+from src.checkpoint_service import (
+    get_covered_ranges,
+    get_shards,
+    is_window_covered,
+    record_checkpoint,
+    skip_covered,
+)
+from src.lease_service import Lease, acquire_lease
 from src.cache_service import update_slippage_cache
+from src.archive import get_page_archive
+from src.token_cache import get_token_id_cache
+from src.mapping_service import get_mapping_registry
+from src import metrics
 from src.const import (
     PAGINATION_SIZE,
-    API_RATE_LIMIT_DELAY,
     DATA_START_DATE,
-    FIELD_CREATED_AT,
+    EARLY_STOP_KNOWN_PAGES,
 )
 
 
-def collect_data() -> None:
-    """Main collection function - fetches all transactions from start date."""
-    print(f"[{datetime.now()}] Starting data collection...")
-    print(f"Collecting all transactions since {DATA_START_DATE}")
-    init_db()
-    db = SessionLocal()
+def collect_window(
+    db,
+    window_start: datetime,
+    window_end: datetime | None = None,
+    covered: list[tuple[datetime, datetime]] | None = None,
+    max_pages: int | None = None,
+    lease: Lease | None = None,
+    stop_after_known: int | None = None,
+) -> dict:
+    """Page backward from window_end to window_start, checkpointing every page.
 
-    try:
-        total_fetched = 0
-        total_stored = 0
-        page = 1
-
-        # Resume from oldest transaction to continue fetching older data
-        end_timestamp = get_oldest_transaction_timestamp(db)
-        if end_timestamp:
-            print(f"Resuming from oldest transaction timestamp: {end_timestamp}...")
-        else:
-            print("No existing transactions, starting from scratch")
+    Args:
+        db: Database session
+        window_start: Oldest point to collect (naive UTC)
+        window_end: Newest point to collect, None for now
+        covered: Completed ranges to jump over while paging
+        max_pages: Stop after this many pages (None for no limit)
+        lease: Lease guarding this window; raises LeaseLost if it is lost
+        stop_after_known: Stop after this many consecutive pages that were
+            already stored (None to page through them)
 
-        while True:
-            print(f"\nPage {page}...")
+    Returns:
+        Dict with fetched/stored/pages counts and whether the window completed
+    """
+    covered = covered or []
+    archive = get_page_archive()
+    result = {"fetched": 0, "stored": 0, "pages": 0, "complete": False}
+    end_timestamp = window_end
+    known_pages = 0
 
-            data = fetch_transactions_page(
-                per_page=PAGINATION_SIZE, end_timestamp=end_timestamp
-            )
+    while True:
+        if lease:
+            lease.check()
 
-            if not data:
-                print("  No data returned, stopping")
+        if end_timestamp is not None:
+            resume_timestamp = skip_covered(end_timestamp, covered)
+            if resume_timestamp != end_timestamp:
+                print(f"\nSkipping completed window, resuming from {resume_timestamp}")
+                end_timestamp = resume_timestamp
+            if end_timestamp <= window_start:
+                print("\nWindow fully covered")
+                result["complete"] = True
                 break
 
-            transactions = data if isinstance(data, list) else []
+        if max_pages is not None and result["pages"] >= max_pages:
+            print(f"\nReached page limit ({max_pages}), stopping")
+            break
 
-            if not transactions:
-                print("  No more transactions")
-                break
+        result["pages"] += 1
+        print(f"\nPage {result['pages']}...")
 
-            total_fetched += len(transactions)
-            print(f"  Fetched {len(transactions)} transactions")
+        page_end = end_timestamp or datetime.utcnow()
+        data = fetch_transactions_page(
+            per_page=PAGINATION_SIZE,
+            end_timestamp=end_timestamp,
+            start_timestamp=window_start,
+        )
 
-            stored = store_transactions(db, transactions)
-            total_stored += stored
-            print(f"  Stored {stored} new transactions (total stored: {total_stored})")
+        if data is None:
+            # The uncovered remainder is picked up later by gap repair
+            print("  No data returned, stopping")
+            break
 
-            # Get end_timestamp for next page from the last transaction
-            if len(transactions) < PAGINATION_SIZE:
-                print("  Reached end of data")
-                break
+        transactions = data if isinstance(data, list) else []
 
-            last_tx = transactions[-1]
-            created_at_str = last_tx.get(FIELD_CREATED_AT)
-            if not created_at_str:
-                print("  No timestamp found in last transaction, stopping")
-                break
+        if not transactions:
+            print("  No more transactions")
+            # Nothing older than the cursor, so the rest of the window is complete
+            record_checkpoint(db, window_start, page_end, 0, None)
+            db.commit()
+            result["complete"] = True
+            break
+
+        result["fetched"] += len(transactions)
+        print(f"  Fetched {len(transactions)} transactions")
+
+        # Decode the page into columns once; the overlap check and the writer both use them
+        batch = decode_page(transactions)
+        metrics.ROWS_PARSED.inc(len(transactions))
+        if batch.oldest is None:
+            print("  No timestamp found in page, stopping")
+            break
 
-            end_timestamp = datetime.fromisoformat(
-                created_at_str.replace("Z", "+00:00")
+        # A short page means we reached the start of the window
+        reached_end = len(transactions) < PAGINATION_SIZE
+        next_cursor = batch.oldest
+        page_start = window_start if reached_end else next_cursor
+
+        if archive:
+            archive.append_page(
+                transactions,
+                page_start,
+                page_end,
+                params={"end_timestamp": end_timestamp, "start_timestamp": window_start},
             )
 
-            page += 1
+        if stop_after_known and is_page_known(db, batch):
+            # Nothing to store, but the page still extends the covered ranges
+            metrics.ROWS_DEDUPLICATED.inc(len(batch))
+            metrics.KNOWN_PAGES.inc()
+            record_checkpoint(db, page_start, page_end, len(transactions), None if reached_end else next_cursor)
+            db.commit()
+            known_pages += 1
+            print(f"  All transactions already stored ({known_pages} known page(s) in a row)")
+            if reached_end:
+                result["complete"] = True
+                break
+            if known_pages >= stop_after_known:
+                # Anything older that is still uncovered is left to backfill and gap repair
+                print("  Reached already-ingested data, stopping")
+                break
+            end_timestamp = next_cursor
+            continue
+        known_pages = 0
+
+        # Commit the page and its checkpoint together so a crash never
+        # leaves a window marked complete without its rows (or vice versa)
+        stored = store_batch(db, batch, commit=False)
+        record_checkpoint(
+            db,
+            page_start,
+            page_end,
+            len(transactions),
+            None if reached_end else next_cursor,
+        )
+        commit_started = time.perf_counter()
+        db.commit()
+        metrics.COMMIT_SECONDS.observe(time.perf_counter() - commit_started)
+
+        result["stored"] += stored
+        print(f"  Stored {stored} new transactions (total stored: {result['stored']})")
+
+        if reached_end:
+            print("  Reached end of data")
+            result["complete"] = True
+            break
+
+        # Pacing between pages is handled by the API client's rate controller
+        end_timestamp = next_cursor
+
+    return result
+
+
+def sync_forward(db, covered: list[tuple[datetime, datetime]]) -> dict | None:
+    """Collect the newest shard, from now back to where it is already covered.
+
+    Exactly one node runs this at a time. Returns None if another node holds the lease.
+    """
+    shard_start, _ = get_shards(datetime.utcnow())[-1]
+    with acquire_lease("forward") as lease:
+        if lease is None:
+            print("Forward sync is running on another node, skipping")
+            return None
+        print(f"\nForward sync from now back to {shard_start}")
+        return collect_window(
+            db, shard_start, None, covered, lease=lease, stop_after_known=EARLY_STOP_KNOWN_PAGES
+        )
+
+
+def sync_backfill(db, covered: list[tuple[datetime, datetime]], max_shards: int | None = None) -> dict:
+    """Collect older shards that are not fully covered, newest first.
+
+    Shards held by other nodes are skipped, so several nodes can split the
+    backfill between them.
+    """
+    result = {"fetched": 0, "stored": 0, "pages": 0, "shards": 0}
+    backfill_shards = get_shards(datetime.utcnow())[:-1]
+
+    for shard_start, shard_end in reversed(backfill_shards):
+        if max_shards is not None and result["shards"] >= max_shards:
+            break
+        if is_window_covered(shard_start, shard_end, covered):
+            continue
+
+        with acquire_lease(f"backfill:{shard_start:%Y-%m-%d}") as lease:
+            if lease is None:
+                print(f"Backfill shard {shard_start:%Y-%m-%d} is held by another node, skipping")
+                continue
+
+            # Re-read coverage now that we hold the shard; another node may have just finished it
+            covered = get_covered_ranges(db)
+            if is_window_covered(shard_start, shard_end, covered):
+                continue
 
-            time.sleep(API_RATE_LIMIT_DELAY)
+            print(f"\nBackfilling shard {shard_start} -> {shard_end}")
+            shard_result = collect_window(db, shard_start, shard_end, covered, lease=lease)
+            result["shards"] += 1
+            for field in ("fetched", "stored", "pages"):
+                result[field] += shard_result[field]
+
+    return result
+
+
+def _refresh_cache(db) -> None:
+    print("\nUpdating slippage cache...")
+    cache_started = time.perf_counter()
+    update_slippage_cache(db)
+    metrics.CACHE_REFRESH_SECONDS.set(time.perf_counter() - cache_started)
+
+    newest = get_newest_transaction_timestamp(db)
+    if newest:
+        metrics.NEWEST_TRANSACTION_LAG_SECONDS.set(
+            (datetime.utcnow() - newest).total_seconds()
+        )
+
+
+def refresh_cache() -> None:
+    """Refresh the slippage cache and freshness metrics without collecting."""
+    print(f"[{datetime.now()}] Starting cache refresh...")
+    db = SessionLocal()
+
+    try:
+        init_db()
+        _refresh_cache(db)
+        print(f"[{datetime.now()}] Cache refresh completed")
+    except Exception as e:
+        print(f"Error during cache refresh: {e}")
+        import traceback
+
+        traceback.print_exc()
+    finally:
+        db.close()
+        metrics.write_textfile()
+
+
+def collect_data(mode: str = "all", max_shards: int | None = None, update_cache: bool = True) -> None:
+    """Main collection function - fetches all transactions from start date.
+
+    mode is "forward" (newest shard only), "backfill" (older shards only) or
+    "all" (both). Each unit of work runs under an advisory lock, so any
+    number of nodes can run this concurrently without fetching the same pages.
+    With update_cache=False the slippage cache is left to a separate job.
+    """
+    print(f"[{datetime.now()}] Starting data collection ({mode})...")
+    print(f"Collecting all transactions since {DATA_START_DATE}")
+    db = SessionLocal()
+    run_started = time.perf_counter()
+
+    try:
+        init_db()
+        get_mapping_registry().ensure_current(db, force=True)
+        token_count = get_token_id_cache().preload(db)
+        print(f"Token id cache preloaded with {token_count} token(s)")
+        if mode in ("forward", "all"):
+            key_count = preload_recent_keys(db)
+            print(f"Recent deposit key filter preloaded with {key_count} key(s)")
+
+        covered = get_covered_ranges(db)
+        if covered:
+            print(f"Found {len(covered)} completed window(s), newest ends at {covered[-1][1]}")
+        else:
+            # No checkpoints yet: treat data collected before checkpointing as covered
+            oldest = get_oldest_transaction_timestamp(db)
+            if oldest:
+                newest = get_newest_transaction_timestamp(db)
+                print(f"Marking existing transactions {oldest} -> {newest} as covered")
+                record_checkpoint(db, oldest, newest, 0, None)
+                db.commit()
+                covered = get_covered_ranges(db)
+            else:
+                print("No existing transactions, starting from scratch")
+
+        result = {"fetched": 0, "stored": 0}
+        runs = []
+        if mode in ("forward", "all"):
+            runs.append(sync_forward(db, covered))
+        if mode in ("backfill", "all"):
+            runs.append(sync_backfill(db, get_covered_ranges(db), max_shards))
+        for run in runs:
+            if run:
+                result["fetched"] += run["fetched"]
+                result["stored"] += run["stored"]
 
         print(f"\n{'=' * 60}")
-        print(f"Total fetched: {total_fetched}")
-        print(f"Total stored: {total_stored}")
+        print(f"Total fetched: {result['fetched']}")
+        print(f"Total stored: {result['stored']}")
 
-        print("\nUpdating slippage cache...")
-        update_slippage_cache(db)
+        if update_cache:
+            _refresh_cache(db)
+
+        run_seconds = time.perf_counter() - run_started
+        metrics.LAST_RUN_SECONDS.set(run_seconds)
+        metrics.LAST_RUN_ROWS_PER_SECOND.set(result["fetched"] / run_seconds if run_seconds else 0)
+        metrics.LAST_RUN_TIMESTAMP.set(time.time())
 
         print(f"[{datetime.now()}] Data collection completed")
 
@@ -95,7 +329,24 @@ def collect_data() -> None:
         traceback.print_exc()
     finally:
         db.close()
+        metrics.write_textfile()
 
 
 if __name__ == "__main__":
-    collect_data()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Collect Near Intents transactions")
+    parser.add_argument(
+        "--mode",
+        choices=["all", "forward", "backfill"],
+        default="all",
+        help="forward: newest shard only, backfill: older shards only, all: both",
+    )
+    parser.add_argument(
+        "--max-shards",
+        type=int,
+        help="Maximum number of backfill shards to collect in this run",
+    )
+    args = parser.parse_args()
+
+    collect_data(mode=args.mode, max_shards=args.max_shards)
@@ -0,0 +1,31 @@
+"""
+Script to build indexes that init_db does not add to existing tables.
+"""
+
+import sys
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.database import init_db, create_created_at_index
+
+
+def create_indexes() -> None:
+    """Build missing or invalid indexes without blocking writes."""
+    init_db()
+
+    print(f"[{datetime.now()}] Building bridge_transactions.created_at index...")
+    if create_created_at_index():
+        print(f"[{datetime.now()}] Index built")
+    else:
+        print("Index already exists, nothing to do")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build indexes missing from existing databases")
+    parser.parse_args()
+
+    create_indexes()
@@ -0,0 +1,46 @@
+"""
+Script to export bridge transactions to day-partitioned Parquet files for the DuckDB query engine.
+"""
+
+import sys
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.database import init_db
+from src.parquet_export import export_parquet, get_export_dir
+
+
+def run_export(full: bool = False, export_dir: str | None = None) -> None:
+    """Export new and changed days to Parquet."""
+    print(f"[{datetime.now()}] Starting Parquet export to {export_dir or get_export_dir()}...")
+    init_db()
+
+    try:
+        result = export_parquet(export_dir, full=full)
+        kind = "Full" if result["full"] else "Incremental"
+        print(
+            f"{kind} export complete: {result['rows']} rows in {result['days']} days "
+            f"(up to id {result['max_id']}, {result['relabeled_tokens']} relabeled token(s))"
+        )
+    except Exception as e:
+        print(f"Error during Parquet export: {e}")
+        import traceback
+
+        traceback.print_exc()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export bridge transactions to Parquet")
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Re-export every day instead of only days with new transactions",
+    )
+    parser.add_argument("--export-dir", help="Export directory (defaults to EXPORT_DIR)")
+    args = parser.parse_args()
+
+    run_export(full=args.full, export_dir=args.export_dir)
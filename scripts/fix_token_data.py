@@ -7,61 +7,82 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from src.database import SessionLocal, Token, init_db
-from src.parser import parse_asset_id
-
-
-def fix_token_data(dry_run: bool = False) -> None:
-    """Re-parse all tokens and update chain, address, and symbol fields."""
+from sqlalchemy import select
+from src.database import SessionLocal, Token, engine, init_db
+from src.parser import parse_asset_ids
+from src.mapping_service import apply_token_updates, get_mapping_registry
+from src.const import FIX_TOKEN_BATCH_SIZE
+
+
+def fix_token_data(dry_run: bool = False, batch_size: int = FIX_TOKEN_BATCH_SIZE) -> None:
+    """Re-parse all tokens and update chain, address, and symbol fields.
+
+    Tokens are streamed with a server-side cursor and processed in batches:
+    each batch is re-parsed at once and written with one UPDATE, which also
+    recomputes is_stablecoin. The slippage cache is keyed by token id and
+    needs no refresh; the Parquet export rewrites only the days that use
+    the changed tokens on its next run.
+    For a single mapping change, scripts/mappings.py re-parses only the
+    affected tokens.
+    """
     init_db()
     db = SessionLocal()
 
+    updated_count = 0
+    unchanged_count = 0
+
     try:
-        tokens = db.query(Token).all()
-
-        updated_count = 0
-        unchanged_count = 0
-
-        for token in tokens:
-            parsed = parse_asset_id(token.asset_id)
-
-            new_chain = parsed["chain"]
-            new_address = parsed["address"]
-            new_symbol = parsed["symbol"]
-
-            changes = []
-            if token.chain != new_chain:
-                changes.append(f"chain: {token.chain} -> {new_chain}")
-            if token.address != new_address:
-                changes.append(f"address: {token.address} -> {new_address}")
-            if token.symbol != new_symbol:
-                changes.append(f"symbol: {token.symbol} -> {new_symbol}")
-
-            if changes:
-                print(
-                    f"{'[DRY RUN] ' if dry_run else ''}"
-                    f"Token {token.id} ({token.asset_id[:60]}...):"
-                )
-                for change in changes:
-                    print(f"    {change}")
-
-                if not dry_run:
-                    token.chain = new_chain
-                    token.address = new_address
-                    token.symbol = new_symbol
-
-                updated_count += 1
-            else:
-                unchanged_count += 1
-
-        if not dry_run:
-            db.commit()
+        # Parse with the live mappings from the database, not the const.py seeds
+        get_mapping_registry().ensure_current(db, force=True)
+
+        with engine.connect() as read_conn:
+            result = read_conn.execution_options(stream_results=True, yield_per=batch_size).execute(
+                select(Token.id, Token.asset_id, Token.chain, Token.address, Token.symbol).order_by(Token.id)
+            )
+
+            for batch in result.partitions():
+                parsed_assets = parse_asset_ids(token.asset_id for token in batch)
+                updates = []
+
+                for token in batch:
+                    parsed = parsed_assets[token.asset_id]
+
+                    changes = []
+                    if token.chain != parsed.chain:
+                        changes.append(f"chain: {token.chain} -> {parsed.chain}")
+                    if token.address != parsed.address:
+                        changes.append(f"address: {token.address} -> {parsed.address}")
+                    if token.symbol != parsed.symbol:
+                        changes.append(f"symbol: {token.symbol} -> {parsed.symbol}")
+
+                    if not changes:
+                        unchanged_count += 1
+                        continue
+
+                    print(
+                        f"{'[DRY RUN] ' if dry_run else ''}"
+                        f"Token {token.id} ({token.asset_id[:60]}...):"
+                    )
+                    for change in changes:
+                        print(f"    {change}")
+
+                    updates.append({
+                        "id": token.id,
+                        "chain": parsed.chain,
+                        "address": parsed.address,
+                        "symbol": parsed.symbol,
+                    })
+                    updated_count += 1
+
+                if updates and not dry_run:
+                    apply_token_updates(db, updates)
+                    db.commit()
 
         print(f"\n{'=' * 60}")
         print(f"{'[DRY RUN] ' if dry_run else ''}Summary:")
         print(f"  Updated: {updated_count}")
         print(f"  Unchanged: {unchanged_count}")
-        print(f"  Total tokens: {len(tokens)}")
+        print(f"  Total tokens: {updated_count + unchanged_count}")
 
     except Exception as e:
         print(f"Error: {e}")
@@ -82,6 +103,12 @@ if __name__ == "__main__":
         action="store_true",
         help="Show what would be updated without making changes",
     )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=FIX_TOKEN_BATCH_SIZE,
+        help="Tokens re-parsed and updated per batch",
+    )
     args = parser.parse_args()
 
-    fix_token_data(dry_run=args.dry_run)
+    fix_token_data(dry_run=args.dry_run, batch_size=args.batch_size)
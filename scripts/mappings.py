@@ -0,0 +1,117 @@
+"""
+Script to view and edit token and chain id mappings without a code change.
+
+Each change bumps the mapping version (running collectors reload within
+MAPPING_RELOAD_SECONDS) and re-parses only the tokens it affects. The
+Parquet export then rewrites only the days that use those tokens.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.database import SessionLocal, init_db
+from src.parser import set_mappings
+from src.mapping_service import (
+    bump_mapping_version,
+    get_mapping_version,
+    load_mappings,
+    reclassify_tokens,
+    remove_token_mapping,
+    set_chain_id_mapping,
+    set_token_mapping,
+)
+
+
+def list_mappings() -> None:
+    """Print the current mappings."""
+    init_db()
+    db = SessionLocal()
+
+    try:
+        token_lookup, chain_id_map = load_mappings(db)
+        print(f"Mapping version {get_mapping_version(db)}")
+        print(f"\nToken mappings ({len(token_lookup)}):")
+        for (chain, address), symbol in sorted(token_lookup.items()):
+            print(f"  {chain:<10} {address:<70} {symbol}")
+        print(f"\nChain id mappings ({len(chain_id_map)}):")
+        for chain_id, chain in sorted(chain_id_map.items(), key=lambda item: int(item[0])):
+            print(f"  {chain_id:<10} {chain}")
+    finally:
+        db.close()
+
+
+def apply_change(change, description: str) -> None:
+    """Apply a mapping change, bump the version and reclassify affected tokens in one transaction."""
+    init_db()
+    db = SessionLocal()
+
+    try:
+        old = load_mappings(db)
+        change(db)
+        new = load_mappings(db)
+
+        if new == old:
+            print(f"No change: {description}")
+            db.rollback()
+            return
+
+        version = bump_mapping_version(db)
+        set_mappings(*new)
+        changed_ids = reclassify_tokens(db, old, new)
+        db.commit()
+
+        print(f"{description} (mapping version {version})")
+        print(f"Reclassified {len(changed_ids)} token(s)")
+
+    except Exception as e:
+        print(f"Error: {e}")
+        import traceback
+
+        traceback.print_exc()
+        db.rollback()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="View and edit token mappings")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("list", help="Show all mappings")
+
+    set_token = subparsers.add_parser("set-token", help="Add or change a (chain, address) -> symbol mapping")
+    set_token.add_argument("chain", help="Chain as parsed from asset ids, e.g. ETH, NEAR, SOL")
+    set_token.add_argument("address", help='Token address, or "native"')
+    set_token.add_argument("symbol")
+
+    remove_token = subparsers.add_parser("remove-token", help="Remove a (chain, address) mapping")
+    remove_token.add_argument("chain")
+    remove_token.add_argument("address")
+
+    set_chain_id = subparsers.add_parser("set-chain-id", help="Add or change a nep245 chain id mapping")
+    set_chain_id.add_argument("chain_id")
+    set_chain_id.add_argument("chain")
+
+    args = parser.parse_args()
+
+    if args.command == "list":
+        list_mappings()
+    elif args.command == "set-token":
+        apply_change(
+            lambda db: set_token_mapping(db, args.chain, args.address, args.symbol),
+            f"Mapped {args.chain.upper()} {args.address.lower()} -> {args.symbol}",
+        )
+    elif args.command == "remove-token":
+        apply_change(
+            lambda db: remove_token_mapping(db, args.chain, args.address),
+            f"Removed mapping for {args.chain.upper()} {args.address.lower()}",
+        )
+    elif args.command == "set-chain-id":
+        apply_change(
+            lambda db: set_chain_id_mapping(db, args.chain_id, args.chain),
+            f"Mapped chain id {args.chain_id} -> {args.chain}",
+        )
@@ -0,0 +1,104 @@
+"""
+Script to detect holes in collected data and refetch just those time windows.
+"""
+
+import sys
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.database import SessionLocal, init_db
+from src.checkpoint_service import get_data_start
+from src.gap_service import scan_for_gaps, get_pending_gaps, mark_gap_done, mark_gap_failed
+from src.cache_service import update_slippage_cache
+from src.lease_service import LeaseLost, acquire_lease
+from src.const import GAP_REPAIR_BATCH_SIZE, GAP_REPAIR_MAX_PAGES
+from scripts.collector import collect_window
+
+
+def repair_gaps(max_windows: int = GAP_REPAIR_BATCH_SIZE, scan_only: bool = False) -> None:
+    """Scan for gaps, queue repair windows and refetch up to max_windows of them.
+
+    Runs on one node at a time; other nodes skip the run while the lease is held.
+    """
+    print(f"[{datetime.now()}] Starting gap repair...")
+    init_db()
+
+    with acquire_lease("gap_repair") as lease:
+        if lease is None:
+            print("Gap repair is running on another node, skipping")
+            return
+        _repair_gaps(lease, max_windows, scan_only)
+
+
+def _repair_gaps(lease, max_windows: int, scan_only: bool) -> None:
+    db = SessionLocal()
+
+    try:
+        # Exclude the current hour, which is still filling up
+        scan_end = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+        queued = scan_for_gaps(db, get_data_start(), scan_end)
+        print(f"Queued {queued['uncovered']} uncovered and {queued['sparse']} sparse window(s)")
+
+        if scan_only:
+            return
+
+        total_stored = 0
+        for gap in get_pending_gaps(db, max_windows):
+            print(f"\nRepairing {gap.reason} window {gap.window_start} -> {gap.window_end}")
+            try:
+                result = collect_window(
+                    db, gap.window_start, gap.window_end, max_pages=GAP_REPAIR_MAX_PAGES, lease=lease
+                )
+            except LeaseLost:
+                db.rollback()
+                raise
+            except Exception as e:
+                db.rollback()
+                mark_gap_failed(db, gap, str(e))
+                print(f"  Error repairing window: {e}")
+                continue
+
+            total_stored += result["stored"]
+            if result["complete"]:
+                mark_gap_done(db, gap)
+            else:
+                mark_gap_failed(db, gap, f"incomplete after {result['pages']} page(s)")
+
+        print(f"\n{'=' * 60}")
+        print(f"Total stored: {total_stored}")
+
+        if total_stored:
+            print("\nUpdating slippage cache...")
+            update_slippage_cache(db)
+
+        print(f"[{datetime.now()}] Gap repair completed")
+
+    except Exception as e:
+        print(f"Error during gap repair: {e}")
+        import traceback
+
+        traceback.print_exc()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Detect and refill gaps in collected data")
+    parser.add_argument(
+        "--max-windows",
+        type=int,
+        default=GAP_REPAIR_BATCH_SIZE,
+        help="Maximum number of queued windows to refetch",
+    )
+    parser.add_argument(
+        "--scan-only",
+        action="store_true",
+        help="Only queue repair windows without fetching them",
+    )
+    args = parser.parse_args()
+
+    repair_gaps(max_windows=args.max_windows, scan_only=args.scan_only)
@@ -0,0 +1,108 @@
+"""
+Script to re-ingest archived API pages from local disk without calling the API.
+"""
+
+import sys
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.database import SessionLocal, init_db
+from src.archive import PageArchive, get_page_archive
+from src.transaction_service import store_transactions
+from src.checkpoint_service import record_checkpoint
+from src.cache_service import update_slippage_cache
+
+
+def replay(
+    start: datetime | None = None,
+    end: datetime | None = None,
+    archive_dir: str | None = None,
+    update_cache: bool = True,
+) -> None:
+    """Re-ingest archived pages whose window overlaps [start, end]."""
+    print(f"[{datetime.now()}] Starting archive replay...")
+    archive = PageArchive(archive_dir) if archive_dir else get_page_archive()
+    if archive is None:
+        print("Archive is disabled (ARCHIVE_DIR is empty), nothing to replay")
+        return
+
+    init_db()
+    db = SessionLocal()
+
+    try:
+        total_replayed = 0
+        total_stored = 0
+        pages = 0
+
+        for entry, record in archive.iter_pages(start, end):
+            transactions = record["transactions"]
+            stored = store_transactions(db, transactions, commit=False)
+            record_checkpoint(
+                db,
+                datetime.fromisoformat(entry["window_start"]),
+                datetime.fromisoformat(entry["window_end"]),
+                len(transactions),
+                None,
+            )
+            db.commit()
+
+            pages += 1
+            total_replayed += len(transactions)
+            total_stored += stored
+            if pages % 100 == 0:
+                print(f"  Replayed {pages} pages ({total_replayed} transactions, {total_stored} stored)")
+
+        print(f"\n{'=' * 60}")
+        print(f"Pages replayed: {pages}")
+        print(f"Total replayed: {total_replayed}")
+        print(f"Total stored: {total_stored}")
+
+        if update_cache and total_stored:
+            print("\nUpdating slippage cache...")
+            update_slippage_cache(db)
+
+        print(f"[{datetime.now()}] Archive replay completed")
+
+    except Exception as e:
+        print(f"Error during replay: {e}")
+        import traceback
+
+        traceback.print_exc()
+        db.rollback()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Replay archived API pages into the database")
+    parser.add_argument(
+        "--start",
+        type=datetime.fromisoformat,
+        help="Only replay pages covering times after this (ISO format, UTC)",
+    )
+    parser.add_argument(
+        "--end",
+        type=datetime.fromisoformat,
+        help="Only replay pages covering times before this (ISO format, UTC)",
+    )
+    parser.add_argument(
+        "--archive-dir",
+        help="Archive directory (defaults to ARCHIVE_DIR)",
+    )
+    parser.add_argument(
+        "--skip-cache",
+        action="store_true",
+        help="Don't refresh the slippage cache after replaying",
+    )
+    args = parser.parse_args()
+
+    replay(
+        start=args.start,
+        end=args.end,
+        archive_dir=args.archive_dir,
+        update_cache=not args.skip_cache,
+    )
@@ -1,28 +1,273 @@
+"""
+Background scheduler for collection, cache refresh and gap repair.
+
+Each job runs in a fresh worker process, so a slow backfill cannot delay the
+forward sync and a crash only loses that run. Runs that exceed their timeout
+are terminated. A job that is due while its previous run is still going is
+coalesced into one follow-up run instead of piling up.
+"""
+
+import multiprocessing
+import os
 import sys
 import time
+from dataclasses import dataclass, field
+from datetime import datetime
 from pathlib import Path
+from typing import Callable
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 import schedule
-from scripts.collector import collect_data
-from src.const import COLLECTION_INTERVAL_HOURS, SCHEDULER_SLEEP_SECONDS
+from scripts.collector import collect_data, refresh_cache
+from scripts.repair_gaps import repair_gaps
+from scripts.export_parquet import run_export
+from src.database import SessionLocal, init_db
+from src.cadence_service import get_arrival_rate, get_forward_sync_interval
+from src.duckdb_service import require_duckdb
+from src import metrics
+from src.const import (
+    BACKFILL_TIMEOUT_MINUTES,
+    CACHE_REFRESH_INTERVAL_MINUTES,
+    CACHE_REFRESH_TIMEOUT_MINUTES,
+    COLLECTION_INTERVAL_HOURS,
+    FORWARD_SYNC_INTERVAL_MINUTES,
+    FORWARD_SYNC_TIMEOUT_MINUTES,
+    GAP_REPAIR_INTERVAL_MINUTES,
+    GAP_REPAIR_TIMEOUT_MINUTES,
+    PARQUET_EXPORT_INTERVAL_MINUTES,
+    PARQUET_EXPORT_TIMEOUT_MINUTES,
+    QUERY_ENGINE,
+    SCHEDULER_JITTER_RATIO,
+    SCHEDULER_KILL_GRACE_SECONDS,
+    SCHEDULER_SLEEP_SECONDS,
+)
+
+# Workers start from a clean interpreter: no inherited DB connections or metric values
+_mp = multiprocessing.get_context("spawn")
+
+
+def _run_job(target: Callable, kwargs: dict, connection) -> None:
+    """Worker process entry point. Sends the run's metrics back to the scheduler."""
+    # The scheduler writes the merged textfile; a worker would overwrite it with its own values
+    os.environ.pop("METRICS_TEXTFILE", None)
+    try:
+        target(**kwargs)
+    finally:
+        connection.send(metrics.REGISTRY.snapshot())
+        connection.close()
+
+
+@dataclass
+class Job:
+    """A scheduled job and the state of its current run."""
+
+    name: str
+    target: Callable
+    interval_seconds: float
+    timeout_seconds: float
+    kwargs: dict = field(default_factory=dict)
+    # Recomputes interval_seconds after every run, for adaptive cadences
+    next_interval: Callable[[], float] | None = None
+    scheduled: schedule.Job | None = None
+    process: multiprocessing.Process | None = None
+    connection: object = None
+    started_at: float = 0.0
+    terminated: bool = False
+    rerun: bool = False
+
+    @property
+    def running(self) -> bool:
+        return self.process is not None
+
+
+class JobRunner:
+    """Starts jobs in worker processes and reaps, times out or coalesces them."""
+
+    def __init__(self, jobs: list[Job]):
+        self.jobs = jobs
+
+    def reschedule(self, job: Job) -> None:
+        """(Re)register job with schedule at its current interval, randomized by the jitter ratio."""
+        if job.scheduled is not None:
+            schedule.cancel_job(job.scheduled)
+        # Jitter keeps several schedulers (and jobs sharing a cadence) from firing in lockstep
+        earliest = max(1, int(job.interval_seconds * (1 - SCHEDULER_JITTER_RATIO)))
+        latest = max(earliest, int(job.interval_seconds * (1 + SCHEDULER_JITTER_RATIO)))
+        job.scheduled = schedule.every(earliest).to(latest).seconds.do(self.submit, job)
+
+    def submit(self, job: Job) -> None:
+        """Start a run of job unless one is already going, in which case queue one follow-up."""
+        if job.running:
+            if not job.rerun:
+                print(f"[{datetime.now()}] {job.name} still running, coalescing into one follow-up run")
+            job.rerun = True
+            metrics.SCHEDULER_JOB_SKIPPED.inc(job=job.name)
+            return
+
+        receiver, sender = _mp.Pipe(duplex=False)
+        process = _mp.Process(
+            target=_run_job, args=(job.target, job.kwargs, sender), name=job.name, daemon=True
+        )
+        try:
+            process.start()
+        except Exception as e:
+            print(f"[{datetime.now()}] Failed to start {job.name}: {e}")
+            receiver.close()
+            return
+        finally:
+            sender.close()
+
+        print(f"[{datetime.now()}] Started {job.name} (pid {process.pid})")
+        job.process = process
+        job.connection = receiver
+        job.started_at = time.monotonic()
+        job.terminated = False
+
+    def poll(self) -> None:
+        """Collect finished runs, terminate overdue ones and start coalesced follow-ups."""
+        for job in self.jobs:
+            if not job.running:
+                continue
+
+            snapshot = None
+            if job.connection.poll():
+                try:
+                    snapshot = job.connection.recv()
+                except EOFError:
+                    pass
+
+            elapsed = time.monotonic() - job.started_at
+            if job.process.is_alive():
+                if elapsed > job.timeout_seconds + SCHEDULER_KILL_GRACE_SECONDS and job.terminated:
+                    job.process.kill()
+                elif elapsed > job.timeout_seconds and not job.terminated:
+                    print(f"[{datetime.now()}] {job.name} exceeded {job.timeout_seconds:.0f}s, terminating")
+                    job.process.terminate()
+                    job.terminated = True
+                if snapshot is not None:
+                    metrics.REGISTRY.merge(snapshot)
+                continue
+
+            job.process.join()
+            # The worker may have sent its metrics between poll() and exiting
+            if snapshot is None and job.connection.poll():
+                try:
+                    snapshot = job.connection.recv()
+                except EOFError:
+                    pass
+            if snapshot is not None:
+                metrics.REGISTRY.merge(snapshot)
+            if job.terminated:
+                status = "timeout"
+            elif job.process.exitcode == 0:
+                status = "ok"
+            else:
+                status = "failed"
+            print(f"[{datetime.now()}] {job.name} finished: {status} after {elapsed:.0f}s")
+
+            metrics.SCHEDULER_JOB_RUNS.inc(job=job.name, status=status)
+            metrics.SCHEDULER_JOB_SECONDS.set(elapsed, job=job.name)
+            metrics.write_textfile()
+
+            job.connection.close()
+            job.process = None
+            job.connection = None
+            if job.next_interval is not None:
+                job.interval_seconds = job.next_interval()
+                self.reschedule(job)
+                print(f"[{datetime.now()}] Next {job.name} in ~{job.interval_seconds:.0f}s")
+            if job.rerun:
+                job.rerun = False
+                self.submit(job)
+
+    def shutdown(self) -> None:
+        """Stop all running workers."""
+        for job in self.jobs:
+            if job.running:
+                job.process.terminate()
+        for job in self.jobs:
+            if job.running:
+                job.process.join(SCHEDULER_KILL_GRACE_SECONDS)
+                if job.process.is_alive():
+                    job.process.kill()
+
+
+def next_forward_sync_interval() -> float:
+    """Pick the delay before the next forward sync from the recent arrival rate."""
+    db = SessionLocal()
+    try:
+        rate = get_arrival_rate(db)
+    except Exception as e:
+        print(f"  Error estimating arrival rate: {e}")
+        rate = None
+    finally:
+        db.close()
+
+    interval = get_forward_sync_interval(rate)
+    metrics.ARRIVAL_RATE.set(rate or 0)
+    metrics.FORWARD_SYNC_INTERVAL_SECONDS.set(interval)
+    return interval
+
+
+def get_jobs() -> list[Job]:
+    """Jobs run by the scheduler, with their cadence and timeout."""
+    jobs = [
+        Job(
+            "forward_sync",
+            collect_data,
+            FORWARD_SYNC_INTERVAL_MINUTES * 60,
+            FORWARD_SYNC_TIMEOUT_MINUTES * 60,
+            {"mode": "forward", "update_cache": False},
+            next_interval=next_forward_sync_interval,
+        ),
+        Job(
+            "backfill",
+            collect_data,
+            COLLECTION_INTERVAL_HOURS * 3600,
+            BACKFILL_TIMEOUT_MINUTES * 60,
+            {"mode": "backfill", "update_cache": False},
+        ),
+        Job("cache_refresh", refresh_cache, CACHE_REFRESH_INTERVAL_MINUTES * 60, CACHE_REFRESH_TIMEOUT_MINUTES * 60),
+        Job("gap_repair", repair_gaps, GAP_REPAIR_INTERVAL_MINUTES * 60, GAP_REPAIR_TIMEOUT_MINUTES * 60),
+    ]
+    if (os.getenv("QUERY_ENGINE") or QUERY_ENGINE).lower() == "duckdb":
+        # Fail at startup rather than in every export worker
+        require_duckdb()
+        jobs.append(
+            Job("parquet_export", run_export, PARQUET_EXPORT_INTERVAL_MINUTES * 60, PARQUET_EXPORT_TIMEOUT_MINUTES * 60)
+        )
+    return jobs
 
 
 def main() -> None:
     """Run the scheduler."""
-    schedule.every(COLLECTION_INTERVAL_HOURS).hours.do(collect_data)
-
-    print(
-        f"Scheduler started. Will run data collection every {COLLECTION_INTERVAL_HOURS} hours."
-    )
-    print("Running initial collection...")
-    collect_data()
-
-    print("Waiting for next scheduled run...")
-    while True:
-        schedule.run_pending()
-        time.sleep(SCHEDULER_SLEEP_SECONDS)
+    metrics_port = os.getenv("METRICS_PORT")
+    if metrics_port:
+        metrics.start_http_server(int(metrics_port))
+        print(f"Serving collector metrics on :{metrics_port}/metrics")
+
+    # Create and seed the schema once here, not concurrently in every first worker
+    init_db()
+
+    jobs = get_jobs()
+    runner = JobRunner(jobs)
+    for job in jobs:
+        runner.reschedule(job)
+        print(f"Scheduled {job.name} every {job.interval_seconds / 60:.0f} minutes (timeout {job.timeout_seconds / 60:.0f} minutes)")
+
+    print("Scheduler started. Running initial jobs...")
+    for job in jobs:
+        runner.submit(job)
+
+    try:
+        while True:
+            runner.poll()
+            schedule.run_pending()
+            time.sleep(SCHEDULER_SLEEP_SECONDS)
+    except KeyboardInterrupt:
+        print("Stopping scheduler...")
+        runner.shutdown()
 
 
 if __name__ == "__main__":
@@ -1,48 +1,217 @@
 import os
+import random
+import time
 import requests
-from datetime import datetime
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
-from src.const import API_URL, DATA_START_DATE, PAGINATION_SIZE
+from src.metrics import API_REQUEST_SECONDS, API_REQUESTS, API_BYTES
+from src.const import (
+    API_URL,
+    DATA_START_DATE,
+    PAGINATION_SIZE,
+    API_CONNECT_TIMEOUT,
+    API_READ_TIMEOUT,
+    API_POOL_SIZE,
+    API_MAX_RETRIES,
+    API_RETRY_STATUSES,
+    API_BACKOFF_BASE,
+    API_BACKOFF_MAX,
+    API_RATE_LIMIT_DELAY,
+    API_MIN_DELAY,
+    API_MAX_DELAY,
+    API_DELAY_STEP,
+    API_THROTTLE_FACTOR,
+)
 
 load_dotenv()
 
 API_KEY = os.getenv("API_KEY")
 
 
-def fetch_transactions_page(
-    per_page: int = PAGINATION_SIZE,
-    end_timestamp: datetime | None = None,
-) -> list | None:
-    """Fetch transactions from the API using timestamp-based pagination.
+def parse_retry_after(value: str | None) -> float | None:
+    """Parse a Retry-After header given in seconds or as an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
 
-    Args:
-        per_page: Number of transactions to fetch (1-1000)
-        end_timestamp: Fetch transactions older than this timestamp
 
-    Returns:
-        API response list or None on error
+class AdaptiveRateController:
+    """Paces requests, speeding up on success and backing off when throttled.
+
+    The delay between requests shrinks by a fixed step after every successful
+    response and is multiplied after a 429 or server error, so the client
+    settles just under the rate the API accepts.
     """
-    headers = {"Authorization": f"Bearer {API_KEY}"}
 
-    params = {
-        "numberOfTransactions": per_page,
-        "startTimestamp": f"{DATA_START_DATE}T00:00:00Z",
-        "statuses": "SUCCESS",
-        "direction": "next",
-    }
+    def __init__(
+        self,
+        initial_delay: float = API_RATE_LIMIT_DELAY,
+        min_delay: float = API_MIN_DELAY,
+        max_delay: float = API_MAX_DELAY,
+        step: float = API_DELAY_STEP,
+        factor: float = API_THROTTLE_FACTOR,
+    ):
+        self.delay = initial_delay
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.step = step
+        self.factor = factor
+        self._last_request = None
 
-    if end_timestamp:
-        params["endTimestamp"] = end_timestamp.strftime("%Y-%m-%dT%H:%M:%SZ")
+    def wait(self) -> None:
+        """Sleep until the current delay has passed since the previous request."""
+        if self._last_request is not None:
+            remaining = self._last_request + self.delay - time.monotonic()
+            if remaining > 0:
+                time.sleep(remaining)
+        self._last_request = time.monotonic()
 
-    try:
-        response = requests.get(API_URL, headers=headers, params=params)
+    def on_success(self) -> None:
+        self.delay = max(self.min_delay, self.delay - self.step)
 
-        if response.status_code == 200:
-            return response.json()
-        else:
-            print(f"  API error: {response.status_code} - {response.text[:200]}")
-            return None
+    def on_throttle(self, retry_after: float | None = None) -> None:
+        self.delay = min(self.max_delay, max(self.delay * self.factor, retry_after or 0))
+
+
+class ApiClient:
+    """Near Intents API client with a pooled keep-alive session and retries."""
+
+    def __init__(
+        self,
+        url: str | None = None,
+        api_key: str | None = None,
+        timeout: tuple[float, float] = (API_CONNECT_TIMEOUT, API_READ_TIMEOUT),
+        max_retries: int = API_MAX_RETRIES,
+        rate_controller: AdaptiveRateController | None = None,
+    ):
+        self.url = url or os.getenv("API_URL") or API_URL
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.rate_controller = rate_controller or AdaptiveRateController()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=API_POOL_SIZE)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "Authorization": f"Bearer {api_key or API_KEY}",
+            "Accept": "application/json",
+            "Accept-Encoding": "gzip",
+        })
+
+    def _backoff(self, attempt: int, retry_after: float | None) -> float:
+        """Jittered exponential backoff, never shorter than Retry-After."""
+        backoff = min(API_BACKOFF_MAX, API_BACKOFF_BASE * 2 ** attempt)
+        backoff = random.uniform(backoff / 2, backoff)
+        return max(backoff, retry_after or 0)
+
+    def get(self, params: dict) -> requests.Response | None:
+        """GET the API with pacing and retries. Returns the final response or None."""
+        for attempt in range(self.max_retries + 1):
+            self.rate_controller.wait()
+            retry_after = None
+
+            started = time.perf_counter()
+            try:
+                response = self.session.get(self.url, params=params, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                API_REQUEST_SECONDS.observe(time.perf_counter() - started)
+                API_REQUESTS.inc(status=e.__class__.__name__)
+                print(f"  Request failed ({e.__class__.__name__}): {e}")
+                response = None
+            else:
+                API_REQUEST_SECONDS.observe(time.perf_counter() - started)
+                API_REQUESTS.inc(status=response.status_code)
+                # Wire size when the server reports it (compressed), else decoded size
+                API_BYTES.inc(int(response.headers.get("Content-Length") or len(response.content)))
+                if response.status_code not in API_RETRY_STATUSES:
+                    if response.ok:
+                        self.rate_controller.on_success()
+                    return response
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                print(f"  API error: {response.status_code} - {response.text[:200]}")
+
+            self.rate_controller.on_throttle(retry_after)
+            if attempt == self.max_retries:
+                return response
+
+            backoff = self._backoff(attempt, retry_after)
+            print(f"  Retrying in {backoff:.1f}s (attempt {attempt + 1}/{self.max_retries})")
+            time.sleep(backoff)
 
-    except Exception as e:
-        print(f"  Error fetching transactions: {e}")
         return None
+
+    def fetch_transactions_page(
+        self,
+        per_page: int = PAGINATION_SIZE,
+        end_timestamp: datetime | None = None,
+        start_timestamp: datetime | None = None,
+    ) -> list | None:
+        """Fetch transactions from the API using timestamp-based pagination.
+
+        Args:
+            per_page: Number of transactions to fetch (1-1000)
+            end_timestamp: Fetch transactions older than this timestamp
+            start_timestamp: Fetch transactions newer than this timestamp
+                (defaults to DATA_START_DATE)
+
+        Returns:
+            API response list or None on error
+        """
+        params = {
+            "numberOfTransactions": per_page,
+            "startTimestamp": f"{DATA_START_DATE}T00:00:00Z",
+            "statuses": "SUCCESS",
+            "direction": "next",
+        }
+
+        if start_timestamp:
+            params["startTimestamp"] = start_timestamp.strftime("%Y-%m-%dT%H:%M:%SZ")
+        if end_timestamp:
+            params["endTimestamp"] = end_timestamp.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+        try:
+            response = self.get(params)
+
+            if response is not None and response.status_code == 200:
+                return response.json()
+            elif response is not None and response.status_code not in API_RETRY_STATUSES:
+                print(f"  API error: {response.status_code} - {response.text[:200]}")
+            return None
+
+        except Exception as e:
+            print(f"  Error fetching transactions: {e}")
+            return None
+
+    def close(self) -> None:
+        self.session.close()
+
+
+_client: ApiClient | None = None
+
+
+def get_api_client() -> ApiClient:
+    """Get the process-wide API client so pages reuse pooled connections."""
+    global _client
+    if _client is None:
+        _client = ApiClient()
+    return _client
+
+
+def fetch_transactions_page(
+    per_page: int = PAGINATION_SIZE,
+    end_timestamp: datetime | None = None,
+    start_timestamp: datetime | None = None,
+) -> list | None:
+    """Fetch a page of transactions with the shared client (see ApiClient.fetch_transactions_page)."""
+    return get_api_client().fetch_transactions_page(per_page, end_timestamp, start_timestamp)
@@ -0,0 +1,237 @@
+"""Append-only archive of raw API pages as compressed, segmented NDJSON.
+
+Every page is written as its own compressed frame (zstd or gzip member) so any
+page can be read back by seeking to its offset. An NDJSON index records the
+segment, byte range and time window of each page, which lets replays select
+pages by time without decompressing whole segments.
+
+Several processes may share one archive (the scheduler runs each job in its
+own worker). Each writer appends to segments it created itself, and segment
+creation, page writes, index appends and crash recovery all hold an exclusive
+lock on the archive, so recovery never sees a write in progress.
+"""
+import fcntl
+import gzip
+import json
+import os
+import re
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from dotenv import load_dotenv
+from src.const import ARCHIVE_DIR, ARCHIVE_COMPRESSION, ARCHIVE_SEGMENT_PAGES
+
+try:
+    import zstandard
+except ImportError:  # Optional dependency, gzip is used without it
+    zstandard = None
+
+load_dotenv()
+
+INDEX_FILE = "index.ndjson"
+LOCK_FILE = ".lock"
+SEGMENTS_DIR = "segments"
+EXTENSIONS = {"zstd": ".ndjson.zst", "gzip": ".ndjson.gz"}
+SEGMENT_PATTERN = re.compile(r"segment-(\d+)\.ndjson\.(?:zst|gz)$")
+
+
+def _resolve_codec(compression: str) -> str:
+    """Pick the codec for new segments."""
+    if compression == "auto":
+        return "zstd" if zstandard else "gzip"
+    if compression == "zstd" and not zstandard:
+        raise RuntimeError("zstd archive compression requires the 'zstandard' package")
+    if compression not in EXTENSIONS:
+        raise ValueError(f"Unknown archive compression: {compression}")
+    return compression
+
+
+def _codec_for_segment(segment: str) -> str:
+    return "zstd" if segment.endswith(EXTENSIONS["zstd"]) else "gzip"
+
+
+def _compress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        return zstandard.ZstdCompressor().compress(data)
+    return gzip.compress(data)
+
+
+def _decompress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        if not zstandard:
+            raise RuntimeError("Reading zstd archive segments requires the 'zstandard' package")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+class PageArchive:
+    """Segmented on-disk archive of raw transaction pages."""
+
+    def __init__(
+        self,
+        root: str | Path,
+        compression: str = ARCHIVE_COMPRESSION,
+        segment_pages: int = ARCHIVE_SEGMENT_PAGES,
+    ):
+        self.root = Path(root)
+        self.segments_dir = self.root / SEGMENTS_DIR
+        self.index_path = self.root / INDEX_FILE
+        self.codec = _resolve_codec(compression)
+        self.segment_pages = segment_pages
+
+        self.segments_dir.mkdir(parents=True, exist_ok=True)
+        # Segments this writer created; other processes never append to them
+        self._segment = None
+        self._segment_count = 0
+        with self._locked():
+            self._recover()
+
+    @contextmanager
+    def _locked(self):
+        """Hold the archive-wide exclusive lock shared by all writer processes."""
+        with open(self.root / LOCK_FILE, "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _recover(self) -> None:
+        """Drop any segment tail written without an index entry. Call with the lock held.
+
+        Writers hold the lock from the segment write until the index entry is
+        written, so an unindexed tail can only be left by a crashed writer.
+        """
+        if self.index_path.exists():
+            # Drop a torn final index line so later appends start on a fresh line
+            data = self.index_path.read_bytes()
+            valid_length = data.rfind(b"\n") + 1
+            if valid_length < len(data):
+                with open(self.index_path, "r+b") as f:
+                    f.truncate(valid_length)
+
+        indexed_end = {}
+        for entry in self.read_index():
+            indexed_end[entry["segment"]] = entry["offset"] + entry["length"]
+
+        for path in self.segments_dir.iterdir():
+            if not SEGMENT_PATTERN.match(path.name):
+                # Not ours: editor swap files, .DS_Store, partial copies
+                continue
+            end = indexed_end.get(path.name, 0)
+            if path.stat().st_size > end:
+                # A crash between the segment write and the index write
+                with open(path, "r+b") as f:
+                    f.truncate(end)
+
+    def _new_segment(self) -> str:
+        """Create a segment owned by this writer. Call with the lock held."""
+        segment_number = 0
+        for path in self.segments_dir.iterdir():
+            match = SEGMENT_PATTERN.match(path.name)
+            if match:
+                segment_number = max(segment_number, int(match.group(1)))
+        segment = f"segment-{segment_number + 1:06d}{EXTENSIONS[self.codec]}"
+        (self.segments_dir / segment).touch(exist_ok=False)
+        return segment
+
+    def append_page(
+        self,
+        transactions: list,
+        window_start: datetime,
+        window_end: datetime,
+        params: dict | None = None,
+    ) -> dict:
+        """Append a fetched page and index it by its time window. Returns the index entry."""
+        record = {
+            "fetched_at": datetime.utcnow().isoformat(),
+            "params": params or {},
+            "transactions": transactions,
+        }
+        payload = _compress(
+            (json.dumps(record, separators=(",", ":"), default=str) + "\n").encode(),
+            self.codec,
+        )
+
+        with self._locked():
+            if self._segment is None or self._segment_count >= self.segment_pages:
+                self._segment = self._new_segment()
+                self._segment_count = 0
+
+            segment_path = self.segments_dir / self._segment
+            with open(segment_path, "ab") as f:
+                # tell() right after opening is not where O_APPEND writes land
+                offset = f.seek(0, os.SEEK_END)
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+
+            entry = {
+                "segment": self._segment,
+                "offset": offset,
+                "length": len(payload),
+                "count": len(transactions),
+                "window_start": window_start.isoformat(),
+                "window_end": window_end.isoformat(),
+            }
+            with open(self.index_path, "a") as f:
+                f.write(json.dumps(entry) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+            self._segment_count += 1
+        return entry
+
+    def read_index(self) -> list[dict]:
+        """Read all index entries in archive order."""
+        if not self.index_path.exists():
+            return []
+        entries = []
+        with open(self.index_path) as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # Torn final line from a crash
+                    break
+        return entries
+
+    def find_pages(self, start: datetime | None = None, end: datetime | None = None) -> list[dict]:
+        """Get index entries whose window overlaps [start, end]."""
+        entries = []
+        for entry in self.read_index():
+            if start and datetime.fromisoformat(entry["window_end"]) < start:
+                continue
+            if end and datetime.fromisoformat(entry["window_start"]) > end:
+                continue
+            entries.append(entry)
+        return entries
+
+    def read_page(self, entry: dict) -> dict:
+        """Read one archived page record for an index entry."""
+        with open(self.segments_dir / entry["segment"], "rb") as f:
+            f.seek(entry["offset"])
+            payload = f.read(entry["length"])
+        return json.loads(_decompress(payload, _codec_for_segment(entry["segment"])))
+
+    def iter_pages(self, start: datetime | None = None, end: datetime | None = None):
+        """Yield (index entry, page record) pairs overlapping [start, end]."""
+        for entry in self.find_pages(start, end):
+            yield entry, self.read_page(entry)
+
+
+_archive: PageArchive | None = None
+
+
+def get_page_archive() -> PageArchive | None:
+    """Get the process-wide archive, or None when archiving is disabled."""
+    global _archive
+    if _archive is None:
+        root = os.getenv("ARCHIVE_DIR", ARCHIVE_DIR)
+        if not root:
+            return None
+        _archive = PageArchive(root)
+    return _archive
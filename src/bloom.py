@@ -0,0 +1,79 @@
+"""Bloom filter for cheap "definitely new" checks on deposit keys.
+
+A miss means the key was never added, so no database lookup is needed. A hit
+may be a false positive (at roughly error_rate once capacity keys have been
+added) and must be confirmed against the database before acting on it.
+"""
+import hashlib
+import math
+import threading
+from typing import Iterable
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings using double hashing."""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str) -> Iterable[int]:
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, key: str) -> None:
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    def __len__(self) -> int:
+        return self.count
+
+
+class RecentKeysFilter:
+    """Thread-safe Bloom filter over recently seen keys that does not saturate.
+
+    Keys go into the current generation. Once it reaches capacity it becomes
+    the previous generation and a fresh one is started, so the oldest keys
+    age out instead of saturating the filter.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._current = BloomFilter(capacity, error_rate)
+        self._previous = None
+        self._lock = threading.Lock()
+
+    def update(self, keys: Iterable[str]) -> None:
+        with self._lock:
+            for key in keys:
+                if self._current.count >= self.capacity:
+                    self._previous = self._current
+                    self._current = BloomFilter(self.capacity, self.error_rate)
+                self._current.add(key)
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._current or (self._previous is not None and key in self._previous)
+
+    def contains_all(self, keys: Iterable[str]) -> bool:
+        with self._lock:
+            return all(
+                key in self._current or (self._previous is not None and key in self._previous)
+                for key in keys
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._current = BloomFilter(self.capacity, self.error_rate)
+            self._previous = None
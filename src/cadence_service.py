@@ -0,0 +1,51 @@
+from datetime import timedelta
+from sqlalchemy import func
+from src.database import BridgeTransaction, SyncCheckpoint
+from src.const import (
+    ARRIVAL_RATE_MIN_SAMPLES,
+    ARRIVAL_RATE_WINDOW_MINUTES,
+    FORWARD_SYNC_INTERVAL_MINUTES,
+    FORWARD_SYNC_MAX_INTERVAL_MINUTES,
+    FORWARD_SYNC_MIN_INTERVAL_SECONDS,
+    FORWARD_SYNC_TARGET_FILL,
+    FRESHNESS_SLO_MINUTES,
+    PAGINATION_SIZE,
+)
+
+
+def get_arrival_rate(db, window_minutes: int = ARRIVAL_RATE_WINDOW_MINUTES) -> float | None:
+    """Estimate transactions per second from recent created_at density.
+
+    The window ends at the newest checkpoint, so it only spans data that is
+    fully ingested. Returns None when there are too few transactions to tell.
+    """
+    window_end = db.query(func.max(SyncCheckpoint.window_end)).scalar()
+    if window_end is None:
+        return None
+
+    window = timedelta(minutes=window_minutes)
+    count = (
+        db.query(func.count(BridgeTransaction.id))
+        .filter(
+            BridgeTransaction.created_at > window_end - window,
+            BridgeTransaction.created_at <= window_end,
+        )
+        .scalar()
+    )
+    if count < ARRIVAL_RATE_MIN_SAMPLES:
+        return None
+    return count / window.total_seconds()
+
+
+def get_forward_sync_interval(rate: float | None) -> float:
+    """Seconds until the next forward sync for an arrival rate in transactions per second.
+
+    Polls once about FORWARD_SYNC_TARGET_FILL of a page has arrived, but never
+    less often than the freshness SLO, clamped to the configured bounds.
+    """
+    if not rate:
+        return FORWARD_SYNC_INTERVAL_MINUTES * 60
+
+    fill_seconds = PAGINATION_SIZE * FORWARD_SYNC_TARGET_FILL / rate
+    interval = min(fill_seconds, FRESHNESS_SLO_MINUTES * 60, FORWARD_SYNC_MAX_INTERVAL_MINUTES * 60)
+    return max(interval, FORWARD_SYNC_MIN_INTERVAL_SECONDS)
@@ -0,0 +1,81 @@
+from datetime import datetime, timedelta
+from src.database import SyncCheckpoint
+from src.const import DATA_START_DATE, BACKFILL_SHARD_DAYS
+
+
+def get_data_start() -> datetime:
+    """Get the configured collection start as a naive UTC datetime."""
+    return datetime.fromisoformat(DATA_START_DATE)
+
+
+def record_checkpoint(
+    db,
+    window_start: datetime,
+    window_end: datetime,
+    rows: int,
+    last_cursor: datetime | None,
+) -> SyncCheckpoint:
+    """Record a fully ingested time window.
+
+    The checkpoint is only added to the session; the caller commits it together
+    with the page's transactions so both are persisted atomically.
+    """
+    checkpoint = SyncCheckpoint(
+        window_start=window_start,
+        window_end=window_end,
+        rows=rows,
+        last_cursor=last_cursor,
+        completed_at=datetime.utcnow(),
+    )
+    db.add(checkpoint)
+    return checkpoint
+
+
+def get_covered_ranges(db) -> list[tuple[datetime, datetime]]:
+    """Get completed windows merged into sorted, non-overlapping ranges."""
+    rows = (
+        db.query(SyncCheckpoint.window_start, SyncCheckpoint.window_end)
+        .order_by(SyncCheckpoint.window_start.asc())
+        .all()
+    )
+
+    ranges = []
+    for window_start, window_end in rows:
+        if ranges and window_start <= ranges[-1][1]:
+            if window_end > ranges[-1][1]:
+                ranges[-1] = (ranges[-1][0], window_end)
+        else:
+            ranges.append((window_start, window_end))
+    return ranges
+
+
+def skip_covered(cursor: datetime, ranges: list[tuple[datetime, datetime]]) -> datetime:
+    """Move a backward-paging cursor past any completed window it falls into.
+
+    Paging requests transactions older than the cursor, so a cursor inside a
+    covered range can jump straight to that range's start.
+    """
+    for window_start, window_end in ranges:
+        if window_start < cursor <= window_end:
+            return window_start
+    return cursor
+
+
+def is_window_covered(window_start: datetime, window_end: datetime, ranges: list[tuple[datetime, datetime]]) -> bool:
+    """Check if a single completed range contains the whole window."""
+    return any(start <= window_start and window_end <= end for start, end in ranges)
+
+
+def get_shards(now: datetime, shard_days: int = BACKFILL_SHARD_DAYS) -> list[tuple[datetime, datetime]]:
+    """Split [data start, now) into windows of shard_days, oldest first.
+
+    Boundaries are aligned to DATA_START_DATE so every node derives the same
+    shards (and lock names). The last shard is the one still filling up.
+    """
+    shard_length = timedelta(days=shard_days)
+    shards = []
+    shard_start = get_data_start()
+    while shard_start < now:
+        shards.append((shard_start, min(shard_start + shard_length, now)))
+        shard_start += shard_length
+    return shards
@@ -16,6 +16,7 @@ CHAIN_ID_MAP = {
 
 # =============================================================================
 # TOKEN MAPPINGS (chain, address) -> symbol
+# Seeds for the token_mappings table; edit live mappings with scripts/mappings.py
 # =============================================================================
 TOKEN_MAPPINGS = [
     {"chain": "BNB", "symbol": "BNB", "address": "native"},
@@ -134,6 +135,9 @@ def _build_token_lookup() -> dict:
 
 
 TOKEN_LOOKUP = _build_token_lookup()
+PARSER_CACHE_SIZE = 4096  # Distinct asset IDs memoized by parse_asset_id
+FIX_TOKEN_BATCH_SIZE = 1000  # Tokens re-parsed per UPDATE by fix_token_data
+MAPPING_RELOAD_SECONDS = 60  # How often ingestion checks the mapping version
 
 # =============================================================================
 # SUPPORTED CHAINS (for UI display)
@@ -157,6 +161,12 @@ STABLECOINS = {
     "FDUSD", "PYUSD", "EURC", "EURT", "EURS", "SDAI", "CUSD", "CEUR",
 }
 
+# Route filter options (applied in SQL via tokens.is_stablecoin)
+STABLECOIN_FILTER_ALL = "All Routes"
+STABLECOIN_FILTER_ONLY = "Stablecoins Only"
+STABLECOIN_FILTER_INCLUDE = "Include Stablecoins"
+STABLECOIN_FILTERS = [STABLECOIN_FILTER_ALL, STABLECOIN_FILTER_ONLY, STABLECOIN_FILTER_INCLUDE]
+
 # =============================================================================
 # TRANSACTION SIZE FILTERS (label -> (min, max) or None for no limit)
 # =============================================================================
@@ -172,19 +182,93 @@ TRANSACTION_SIZE_FILTERS = {
 # API SETTINGS
 # =============================================================================
 API_URL = "https://explorer.near-intents.org/api/v0/transactions"
+API_CONNECT_TIMEOUT = 10  # seconds
+API_READ_TIMEOUT = 60  # seconds
+API_POOL_SIZE = 4  # Keep-alive connections per host
+API_MAX_RETRIES = 5
+API_RETRY_STATUSES = {429, 500, 502, 503, 504}
+API_BACKOFF_BASE = 1.0  # seconds, doubled on every retry
+API_BACKOFF_MAX = 120.0  # seconds
 
 # =============================================================================
 # DATA COLLECTION SETTINGS
 # =============================================================================
 DATA_START_DATE = "2025-10-01"
 PAGINATION_SIZE = 1000
-API_RATE_LIMIT_DELAY = 5.1
+API_RATE_LIMIT_DELAY = 5.1  # Initial delay between requests
+API_MIN_DELAY = 1.0  # Fastest pacing the rate controller speeds up to
+API_MAX_DELAY = 60.0  # Slowest pacing the rate controller backs off to
+API_DELAY_STEP = 0.1  # Delay removed after each successful request
+API_THROTTLE_FACTOR = 2.0  # Delay multiplier after a 429 or server error
+
+# =============================================================================
+# OVERLAP DETECTION (early termination once ingested data is reached)
+# =============================================================================
+EARLY_STOP_KNOWN_PAGES = 1  # Consecutive fully-known pages before forward sync stops
+RECENT_KEYS_HOURS = 6  # Deposit keys preloaded into the Bloom filter by each forward sync
+RECENT_KEYS_CAPACITY = 1_000_000  # Keys per Bloom filter generation
+RECENT_KEYS_ERROR_RATE = 0.001
+
+# =============================================================================
+# RAW PAGE ARCHIVE SETTINGS
+# =============================================================================
+ARCHIVE_DIR = "data/archive"  # Override with ARCHIVE_DIR env var, empty to disable
+ARCHIVE_COMPRESSION = "auto"  # auto (zstd if installed, else gzip), zstd, gzip
+ARCHIVE_SEGMENT_PAGES = 500  # Pages per segment file before rolling over
+
+# =============================================================================
+# GAP DETECTION SETTINGS
+# =============================================================================
+GAP_BASELINE_HOURS = 24  # Neighbouring hours used for the expected hourly count
+GAP_MIN_BASELINE = 20  # Ignore quiet periods with fewer expected txs per hour
+GAP_MIN_FILL_RATIO = 0.2  # Flag hours below this fraction of the baseline
+GAP_MAX_WINDOW_HOURS = 6  # Longest window refetched by a single repair
+GAP_REPAIR_MAX_PAGES = 20  # Page budget per repair window
+GAP_REPAIR_MAX_ATTEMPTS = 3
+GAP_REPAIR_BATCH_SIZE = 10  # Windows repaired per run
+
+# =============================================================================
+# PARQUET EXPORT AND QUERY ENGINE
+# =============================================================================
+EXPORT_DIR = "data/parquet"  # Override with EXPORT_DIR env var
+EXPORT_ID_OVERLAP = 10_000  # Ids below the last export re-checked for late commits
+QUERY_ENGINE = "postgres"  # Override with QUERY_ENGINE env var: postgres or duckdb
+
+# =============================================================================
+# COLLECTOR COORDINATION (advisory locks and leases)
+# =============================================================================
+BACKFILL_SHARD_DAYS = 7  # Backfill shard size, aligned to DATA_START_DATE
+LEASE_HEARTBEAT_SECONDS = 15
+LEASE_TTL_SECONDS = 60  # Lease shown as expired after this long without a heartbeat
 
 # =============================================================================
 # SCHEDULER SETTINGS
 # =============================================================================
-COLLECTION_INTERVAL_HOURS = 6
-SCHEDULER_SLEEP_SECONDS = 60
+# Every job runs in its own worker process; a run that is still going when the
+# next one is due is coalesced into a single follow-up run
+FORWARD_SYNC_INTERVAL_MINUTES = 5
+COLLECTION_INTERVAL_HOURS = 6  # Backfill of older shards
+CACHE_REFRESH_INTERVAL_MINUTES = 15
+GAP_REPAIR_INTERVAL_MINUTES = 60
+FORWARD_SYNC_TIMEOUT_MINUTES = 30
+BACKFILL_TIMEOUT_MINUTES = 6 * 60
+CACHE_REFRESH_TIMEOUT_MINUTES = 30
+GAP_REPAIR_TIMEOUT_MINUTES = 60
+PARQUET_EXPORT_INTERVAL_MINUTES = 15  # Only scheduled with QUERY_ENGINE=duckdb
+PARQUET_EXPORT_TIMEOUT_MINUTES = 60
+SCHEDULER_JITTER_RATIO = 0.1  # Each interval is randomized by +/- this fraction
+SCHEDULER_KILL_GRACE_SECONDS = 30  # Wait after SIGTERM before killing a timed-out job
+SCHEDULER_SLEEP_SECONDS = 5
+
+# Adaptive forward sync: poll when about FORWARD_SYNC_TARGET_FILL of a page has
+# arrived, but at least every FRESHNESS_SLO_MINUTES. FORWARD_SYNC_INTERVAL_MINUTES
+# is used until there is enough recent data to estimate the arrival rate.
+FORWARD_SYNC_TARGET_FILL = 0.5  # Fraction of PAGINATION_SIZE expected per poll
+FRESHNESS_SLO_MINUTES = 15  # Longest acceptable gap between polls
+FORWARD_SYNC_MIN_INTERVAL_SECONDS = 60
+FORWARD_SYNC_MAX_INTERVAL_MINUTES = 60  # Upper bound if FRESHNESS_SLO_MINUTES is raised past it
+ARRIVAL_RATE_WINDOW_MINUTES = 60  # Recent created_at span used to estimate the rate
+ARRIVAL_RATE_MIN_SAMPLES = 10  # Fewer transactions than this falls back to the fixed interval
 
 # =============================================================================
 # CACHE TTL (seconds)
@@ -192,6 +276,14 @@ SCHEDULER_SLEEP_SECONDS = 60
 CACHE_TTL_SHORT = 60
 CACHE_TTL_LONG = 300
 
+# =============================================================================
+# QUERY INSTRUMENTATION
+# =============================================================================
+QUERY_STATS_BUFFER_SIZE = 1000  # Recent statements kept in memory per process
+QUERY_LOG_FLUSH_SIZE = 50  # Statements buffered before writing to query_log
+QUERY_STATS_MAX_PARAMETERS = 100  # Larger parameter sets (bulk inserts) are recorded as a count only
+QUERY_STATS_TOP_N = 20  # Rows shown in each admin table
+
 # =============================================================================
 # UI DISPLAY SETTINGS
 # =============================================================================
@@ -199,6 +291,11 @@ ASSET_ID_DISPLAY_LONG = 70
 ASSET_ID_DISPLAY_SHORT = 50
 MATRIX_TABLE_HEIGHT = 300
 ROUTES_TABLE_HEIGHT = 600
+ROUTES_PAGE_SIZE = 100  # Routes fetched per table page
+ROUTES_SORT_OPTIONS = ["Volume", "Transactions", "Slippage %"]  # Sorted descending
+# Float sort keys are summed exactly and rounded so page cursors compare equal across requests
+ROUTES_VOLUME_SORT_DECIMALS = 2
+ROUTES_SLIPPAGE_SORT_DECIMALS = 6
 DECIMAL_PLACES = 4
 
 # =============================================================================
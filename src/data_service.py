@@ -1,13 +1,19 @@
 import numpy as np
 import pandas as pd
 from datetime import datetime, date
-from sqlalchemy import func
+from decimal import Decimal
+from sqlalchemy import Numeric, cast, func, and_, or_, select, tuple_
 from sqlalchemy.orm import aliased
-from src.database import SessionLocal, Token, BridgeTransaction
+from src.database import SessionLocal, Token, BridgeTransaction, engine, get_recent_queries
 from src.const import (
     SAME_CHAIN_SLIPPAGE,
     UNKNOWN_SYMBOL,
     NA_PLACEHOLDER,
+    QUERY_STATS_TOP_N,
+    STABLECOIN_FILTER_ONLY,
+    STABLECOIN_FILTER_INCLUDE,
+    ROUTES_VOLUME_SORT_DECIMALS,
+    ROUTES_SLIPPAGE_SORT_DECIMALS,
 )
 
 
@@ -31,6 +37,23 @@ def _apply_date_filter(query, start_date: date | None, end_date: date | None):
     return query
 
 
+def _apply_stablecoin_filter(query, stablecoin_filter: str | None):
+    """Filter transactions by the stablecoin flag of their tokens.
+
+    Matches token ids against the small set of stablecoin tokens so the
+    predicate can use the token_in_id/token_out_id indexes.
+    """
+    if stablecoin_filter not in (STABLECOIN_FILTER_ONLY, STABLECOIN_FILTER_INCLUDE):
+        return query
+
+    stablecoin_ids = select(Token.id).where(Token.is_stablecoin.is_(True))
+    token_in_match = BridgeTransaction.token_in_id.in_(stablecoin_ids)
+    token_out_match = BridgeTransaction.token_out_id.in_(stablecoin_ids)
+    if stablecoin_filter == STABLECOIN_FILTER_ONLY:
+        return query.filter(token_in_match, token_out_match)
+    return query.filter(or_(token_in_match, token_out_match))
+
+
 def get_earliest_transaction_date() -> date | None:
     """Get the earliest transaction date from the database."""
     db = SessionLocal()
@@ -230,67 +253,133 @@ def get_volume_matrix(
         db.close()
 
 
+def _build_routes_query(
+    db,
+    start_date: date | None,
+    end_date: date | None,
+    min_amount: float | None,
+    max_amount: float | None,
+    stablecoin_filter: str | None,
+):
+    """Build the grouped routes query. Returns (query, sort expressions by column name)."""
+    # Create aliases for source and destination tokens
+    token_in_alias = aliased(Token, name="token_in")
+    token_out_alias = aliased(Token, name="token_out")
+
+    # Float sums depend on aggregation order, so keyset cursors on them would not
+    # compare equal on the next request. Sum as numeric (exact) and round instead.
+    sort_expressions = {
+        "Volume": func.round(
+            func.sum(cast(BridgeTransaction.amount_in, Numeric)), ROUTES_VOLUME_SORT_DECIMALS
+        ),
+        "Slippage %": func.round(
+            func.avg(cast(BridgeTransaction.slippage, Numeric)), ROUTES_SLIPPAGE_SORT_DECIMALS
+        ),
+        "Transactions": func.count(BridgeTransaction.id),
+    }
+
+    # Use outer joins so transactions with missing token_in/token_out are still
+    # included; otherwise routes total volume would be less than DB total.
+    query = db.query(
+        BridgeTransaction.token_in_id,
+        BridgeTransaction.token_out_id,
+        func.coalesce(token_in_alias.symbol, UNKNOWN_SYMBOL).label("source_token"),
+        func.coalesce(token_in_alias.chain, NA_PLACEHOLDER).label("source_chain"),
+        func.coalesce(token_out_alias.symbol, UNKNOWN_SYMBOL).label("dest_token"),
+        func.coalesce(token_out_alias.chain, NA_PLACEHOLDER).label("dest_chain"),
+        sort_expressions["Volume"].label("volume"),
+        sort_expressions["Slippage %"].label("avg_slippage"),
+        sort_expressions["Transactions"].label("tx_count"),
+        func.avg(BridgeTransaction.amount_in).label("avg_tx_size"),
+    ).outerjoin(
+        token_in_alias, BridgeTransaction.token_in_id == token_in_alias.id
+    ).outerjoin(
+        token_out_alias, BridgeTransaction.token_out_id == token_out_alias.id
+    )
+
+    # Apply date filter before grouping
+    if start_date:
+        start_datetime = datetime.combine(start_date, datetime.min.time())
+        query = query.filter(BridgeTransaction.created_at >= start_datetime)
+    if end_date:
+        end_datetime = datetime.combine(end_date, datetime.max.time())
+        query = query.filter(BridgeTransaction.created_at <= end_datetime)
+
+    # Apply amount filter
+    if min_amount is not None:
+        query = query.filter(BridgeTransaction.amount_in >= min_amount)
+    if max_amount is not None:
+        query = query.filter(BridgeTransaction.amount_in < max_amount)
+
+    query = _apply_stablecoin_filter(query, stablecoin_filter)
+
+    query = query.group_by(
+        BridgeTransaction.token_in_id,
+        BridgeTransaction.token_out_id,
+        func.coalesce(token_in_alias.symbol, UNKNOWN_SYMBOL),
+        func.coalesce(token_in_alias.chain, NA_PLACEHOLDER),
+        func.coalesce(token_out_alias.symbol, UNKNOWN_SYMBOL),
+        func.coalesce(token_out_alias.chain, NA_PLACEHOLDER),
+    )
+    return query, sort_expressions
+
+
 def get_routes_data(
     start_date: date = None,
     end_date: date = None,
     min_amount: float = None,
     max_amount: float = None,
+    stablecoin_filter: str = None,
+    order_by: str = "Volume",
+    limit: int = None,
+    offset: int = None,
+    after: tuple = None,
 ) -> pd.DataFrame:
-    """Get all routes with their volume, average slippage, and avg tx size."""
+    """Get routes with their volume, average slippage, and avg tx size.
+
+    stablecoin_filter is one of STABLECOIN_FILTERS; "Stablecoins Only" keeps
+    routes where both tokens are stablecoins, "Include Stablecoins" routes
+    where at least one is.
+
+    Routes are sorted by order_by (one of ROUTES_SORT_OPTIONS) descending, with
+    token ids as a tiebreaker. Pass limit/offset for a page, or `after`
+    (sort value, token_in_id, token_out_id) of the previous page's last route
+    for keyset pagination.
+    """
     db = SessionLocal()
 
     try:
-        # Create aliases for source and destination tokens
-        token_in_alias = aliased(Token, name="token_in")
-        token_out_alias = aliased(Token, name="token_out")
-
-        # Use outer joins so transactions with missing token_in/token_out are still
-        # included; otherwise routes total volume would be less than DB total.
-        query = db.query(
-            BridgeTransaction.token_in_id,
-            BridgeTransaction.token_out_id,
-            func.coalesce(token_in_alias.symbol, UNKNOWN_SYMBOL).label("source_token"),
-            func.coalesce(token_in_alias.chain, NA_PLACEHOLDER).label("source_chain"),
-            func.coalesce(token_out_alias.symbol, UNKNOWN_SYMBOL).label("dest_token"),
-            func.coalesce(token_out_alias.chain, NA_PLACEHOLDER).label("dest_chain"),
-            func.sum(BridgeTransaction.amount_in).label("volume"),
-            func.avg(BridgeTransaction.slippage).label("avg_slippage"),
-            func.count(BridgeTransaction.id).label("tx_count"),
-            func.avg(BridgeTransaction.amount_in).label("avg_tx_size"),
-        ).outerjoin(
-            token_in_alias, BridgeTransaction.token_in_id == token_in_alias.id
-        ).outerjoin(
-            token_out_alias, BridgeTransaction.token_out_id == token_out_alias.id
+        query, sort_expressions = _build_routes_query(
+            db, start_date, end_date, min_amount, max_amount, stablecoin_filter
         )
-
-        # Apply date filter before grouping
-        if start_date:
-            start_datetime = datetime.combine(start_date, datetime.min.time())
-            query = query.filter(BridgeTransaction.created_at >= start_datetime)
-        if end_date:
-            end_datetime = datetime.combine(end_date, datetime.max.time())
-            query = query.filter(BridgeTransaction.created_at <= end_datetime)
-
-        # Apply amount filter
-        if min_amount is not None:
-            query = query.filter(BridgeTransaction.amount_in >= min_amount)
-        if max_amount is not None:
-            query = query.filter(BridgeTransaction.amount_in < max_amount)
-
-        query = query.group_by(
+        sort_column = sort_expressions[order_by]
+        route_key = tuple_(BridgeTransaction.token_in_id, BridgeTransaction.token_out_id)
+
+        if after is not None:
+            sort_value, token_in_id, token_out_id = after
+            if isinstance(sort_value, float):
+                # Compare as the exact rounded numeric the page was sorted by
+                sort_value = Decimal(str(sort_value))
+            query = query.having(or_(
+                sort_column < sort_value,
+                and_(sort_column == sort_value, route_key > tuple_(token_in_id, token_out_id)),
+            ))
+
+        query = query.order_by(
+            sort_column.desc(),
             BridgeTransaction.token_in_id,
             BridgeTransaction.token_out_id,
-            func.coalesce(token_in_alias.symbol, UNKNOWN_SYMBOL),
-            func.coalesce(token_in_alias.chain, NA_PLACEHOLDER),
-            func.coalesce(token_out_alias.symbol, UNKNOWN_SYMBOL),
-            func.coalesce(token_out_alias.chain, NA_PLACEHOLDER),
         )
+        if offset:
+            query = query.offset(offset)
+        if limit is not None:
+            query = query.limit(limit)
 
         results = query.all()
 
         routes = []
         for row in results:
-            slippage_value = row.avg_slippage if row.avg_slippage is not None else 0
+            slippage_value = float(row.avg_slippage) if row.avg_slippage is not None else 0
             avg_tx_size = row.avg_tx_size if row.avg_tx_size is not None else 0
 
             routes.append({
@@ -298,18 +387,48 @@ def get_routes_data(
                 "Source Chain": row.source_chain or NA_PLACEHOLDER,
                 "Dest Token": row.dest_token,
                 "Dest Chain": row.dest_chain or NA_PLACEHOLDER,
-                "Volume": row.volume or 0,
+                "Volume": float(row.volume or 0),
                 "Slippage %": slippage_value,
                 "Transactions": row.tx_count,
                 "Avg Tx Size": avg_tx_size,
+                "Token In ID": row.token_in_id,
+                "Token Out ID": row.token_out_id,
             })
 
-        df = pd.DataFrame(routes)
+        return pd.DataFrame(routes)
 
-        if not df.empty:
-            df = df.sort_values("Volume", ascending=False).reset_index(drop=True)
+    finally:
+        db.close()
 
-        return df
+
+def get_routes_summary(
+    start_date: date = None,
+    end_date: date = None,
+    min_amount: float = None,
+    max_amount: float = None,
+    stablecoin_filter: str = None,
+) -> dict:
+    """Get route count and totals for the routes matching the filters, in one aggregate."""
+    db = SessionLocal()
+
+    try:
+        query, _ = _build_routes_query(
+            db, start_date, end_date, min_amount, max_amount, stablecoin_filter
+        )
+        routes = query.subquery()
+        row = db.query(
+            func.count().label("routes"),
+            func.sum(routes.c.tx_count).label("transactions"),
+            func.sum(routes.c.volume).label("volume"),
+            func.avg(routes.c.avg_slippage).label("avg_slippage"),
+        ).one()
+
+        return {
+            "routes": row.routes,
+            "transactions": int(row.transactions or 0),
+            "volume": float(row.volume or 0),
+            "avg_slippage": float(row.avg_slippage) if row.avg_slippage is not None else None,
+        }
 
     finally:
         db.close()
@@ -533,3 +652,65 @@ def get_route_slippage_percentile(
 
     finally:
         db.close()
+
+
+def get_query_stats(top_n: int = QUERY_STATS_TOP_N) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Summarize recently executed statements.
+
+    Returns:
+        (slowest, most_frequent) DataFrames. Slowest lists individual executions;
+        most frequent groups executions by statement text, keeping the
+        parameters of the latest execution.
+    """
+    queries = get_recent_queries()
+    if not queries:
+        return pd.DataFrame(), pd.DataFrame()
+
+    df = pd.DataFrame(queries)
+    df["caller"] = df["caller"].fillna(NA_PLACEHOLDER)
+
+    slowest = df.sort_values("duration_ms", ascending=False).head(top_n)
+    slowest = slowest[["statement", "parameters", "caller", "duration_ms", "row_count", "created_at"]]
+
+    most_frequent = (
+        df.groupby("statement")
+        .agg(
+            calls=("duration_ms", "size"),
+            total_ms=("duration_ms", "sum"),
+            avg_ms=("duration_ms", "mean"),
+            max_ms=("duration_ms", "max"),
+            avg_rows=("row_count", "mean"),
+            callers=("caller", lambda c: ", ".join(sorted(set(c)))),
+            parameters=("parameters", "last"),
+        )
+        .sort_values(["calls", "total_ms"], ascending=False)
+        .head(top_n)
+        .reset_index()
+    )
+
+    return slowest.reset_index(drop=True), most_frequent
+
+
+def explain_query(statement: str, parameters=None, analyze: bool = False) -> str:
+    """Get the Postgres plan for a recorded statement.
+
+    ANALYZE executes the statement, so it is only allowed for SELECTs and runs
+    in a transaction that is rolled back.
+    """
+    if analyze and not statement.lstrip().upper().startswith("SELECT"):
+        raise ValueError("EXPLAIN ANALYZE is only allowed for SELECT statements")
+
+    # executemany statements record a list of parameter sets; explain the first
+    if isinstance(parameters, list):
+        parameters = parameters[0] if parameters else None
+
+    prefix = "EXPLAIN (ANALYZE, BUFFERS)" if analyze else "EXPLAIN"
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        cursor.execute(f"{prefix} {statement}", parameters or None)
+        plan = "\n".join(row[0] for row in cursor.fetchall())
+        connection.rollback()
+        return plan
+    finally:
+        connection.close()
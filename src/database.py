@@ -1,13 +1,21 @@
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, Text, UniqueConstraint
+from sqlalchemy import create_engine, event, inspect, text, Boolean, Column, Integer, String, Float, DateTime, Text, UniqueConstraint
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from collections import deque
 from datetime import datetime
 import os
+import sys
+import threading
+import time
 from dotenv import load_dotenv
+from src.const import QUERY_STATS_BUFFER_SIZE, QUERY_LOG_FLUSH_SIZE, QUERY_STATS_MAX_PARAMETERS, STABLECOINS, TOKEN_MAPPINGS, CHAIN_ID_MAP
 
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
+QUERY_LOG_ENABLED = os.getenv("QUERY_LOG_ENABLED", "").lower() in ("1", "true", "yes")
+# Off by default; the dashboard turns it on with enable_query_stats()
+QUERY_STATS_ENABLED = os.getenv("QUERY_STATS_ENABLED", "").lower() in ("1", "true", "yes")
 
 engine = create_engine(
     DATABASE_URL,
@@ -27,6 +35,7 @@ class Token(Base):
     asset_id = Column(String, unique=True, nullable=False, index=True)  # Full nep141 asset ID
     chain = Column(String, nullable=True, index=True)  # eth, arb, base, etc.
     address = Column(String, nullable=True, index=True)  # Contract address
+    is_stablecoin = Column(Boolean, nullable=False, default=False, index=True)  # symbol in STABLECOINS
     
     __table_args__ = (
         UniqueConstraint('asset_id', name='uq_asset_id'),
@@ -45,7 +54,7 @@ class BridgeTransaction(Base):
     deposit_address_and_memo = Column(String, unique=True, index=True, nullable=False)
     status = Column(String, index=True)
     intent_hash = Column(Text)  # No index - can be very long (multiple hashes concatenated)
-    created_at = Column(DateTime, nullable=False)
+    created_at = Column(DateTime, nullable=False, index=True)
     fetched_at = Column(DateTime, default=datetime.utcnow)
     
     __table_args__ = (
@@ -66,8 +75,261 @@ class SlippageCache(Base):
         UniqueConstraint('token_in_id', 'token_out_id', name='uq_token_pair'),
     )
 
-def init_db():
-    Base.metadata.create_all(bind=engine)
+class SyncCheckpoint(Base):
+    __tablename__ = "sync_checkpoints"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    window_start = Column(DateTime, nullable=False, index=True)  # Oldest point covered (UTC)
+    window_end = Column(DateTime, nullable=False, index=True)    # Newest point covered (UTC)
+    rows = Column(Integer, nullable=False, default=0)            # Transactions fetched in window
+    last_cursor = Column(DateTime, nullable=True)                # endTimestamp for the next page
+    completed_at = Column(DateTime, default=datetime.utcnow)
+
+class GapRepair(Base):
+    __tablename__ = "gap_repairs"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    window_start = Column(DateTime, nullable=False)
+    window_end = Column(DateTime, nullable=False)
+    reason = Column(String, nullable=False)  # uncovered, sparse
+    status = Column(String, nullable=False, default="pending", index=True)  # pending, done, failed
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        UniqueConstraint('window_start', 'window_end', name='uq_gap_window'),
+    )
+
+class QueryLog(Base):
+    __tablename__ = "query_log"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    statement = Column(Text, nullable=False)
+    parameters = Column(Text)
+    duration_ms = Column(Float, nullable=False)
+    row_count = Column(Integer)
+    caller = Column(String, index=True)  # module.function that issued the query
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+class CollectorLease(Base):
+    __tablename__ = "collector_leases"
+    
+    name = Column(String, primary_key=True)  # forward, backfill:YYYY-MM-DD, gap_repair
+    holder = Column(String, nullable=False)  # hostname:pid
+    acquired_at = Column(DateTime, nullable=False)
+    heartbeat_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+class TokenMapping(Base):
+    __tablename__ = "token_mappings"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    chain = Column(String, nullable=False)    # Uppercase, e.g. ETH, NEAR
+    address = Column(String, nullable=False)  # Lowercase, or "native"
+    symbol = Column(String, nullable=False)
+    
+    __table_args__ = (
+        UniqueConstraint('chain', 'address', name='uq_token_mapping'),
+    )
+
+class ChainIdMapping(Base):
+    __tablename__ = "chain_id_mappings"
+    
+    chain_id = Column(String, primary_key=True)  # nep245 numeric chain id
+    chain = Column(String, nullable=False)
+
+class MappingVersion(Base):
+    __tablename__ = "mapping_version"
+    
+    id = Column(Integer, primary_key=True)  # Single row, id = 1
+    version = Column(Integer, nullable=False, default=1)  # Bumped on every mapping change
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+# =============================================================================
+# STABLECOIN CLASSIFICATION
+# tokens.is_stablecoin mirrors STABLECOINS so route filters run in SQL
+# =============================================================================
+def is_stablecoin_symbol(symbol: str | None) -> bool:
+    """Check if a symbol is a stablecoin (case-insensitive)."""
+    return bool(symbol) and symbol.upper() in STABLECOINS
+
+
+@event.listens_for(Token, "before_insert")
+@event.listens_for(Token, "before_update")
+def _set_stablecoin_flag(mapper, connection, token):
+    token.is_stablecoin = is_stablecoin_symbol(token.symbol)
+
+
+# =============================================================================
+# QUERY INSTRUMENTATION
+# Per-statement timing kept in a bounded in-memory ring buffer and, with
+# QUERY_LOG_ENABLED, persisted to the query_log table in batches. Only
+# collected once enabled, so the collector does not pay for it.
+# =============================================================================
+recent_queries = deque(maxlen=QUERY_STATS_BUFFER_SIZE)
+_pending_query_log = []
+_query_log_lock = threading.Lock()
+_instrumentation = threading.local()
+_query_stats_enabled = QUERY_STATS_ENABLED
+
+
+def enable_query_stats() -> None:
+    """Start recording statement timings in this process."""
+    global _query_stats_enabled
+    _query_stats_enabled = True
+
+
+def _find_caller() -> str | None:
+    """Find the first application function (outside this module) on the stack."""
+    frame = sys._getframe(2)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if module.startswith("src.") and module != __name__:
+            return f"{module}.{frame.f_code.co_name}"
+        frame = frame.f_back
+    return None
+
+
+def _capture_parameters(parameters, executemany: bool):
+    """Parameters kept for EXPLAIN: the first set of an executemany, None for bulk sets."""
+    if executemany and isinstance(parameters, (list, tuple)):
+        parameters = parameters[0] if parameters else None
+    if parameters is not None and len(parameters) > QUERY_STATS_MAX_PARAMETERS:
+        return None
+    return parameters
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Kept on the execution context, so a statement that raises leaves nothing behind
+    if _query_stats_enabled:
+        context._query_started = time.perf_counter()
+
+
+@event.listens_for(engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_query_started", None)
+    if started is None or getattr(_instrumentation, "flushing", False):
+        return
+
+    entry = {
+        "statement": statement,
+        "parameters": _capture_parameters(parameters, executemany),
+        "duration_ms": (time.perf_counter() - started) * 1000,
+        "row_count": cursor.rowcount,
+        "caller": _find_caller(),
+        "created_at": datetime.utcnow(),
+    }
+    recent_queries.append(entry)
+
+    if QUERY_LOG_ENABLED:
+        with _query_log_lock:
+            _pending_query_log.append(entry)
+            if len(_pending_query_log) < QUERY_LOG_FLUSH_SIZE:
+                return
+            batch = _pending_query_log[:]
+            _pending_query_log.clear()
+        _write_query_log(batch)
+
+
+def _write_query_log(batch: list[dict]) -> None:
+    """Persist instrumented statements without instrumenting the insert itself."""
+    _instrumentation.flushing = True
+    try:
+        with engine.begin() as conn:
+            conn.execute(QueryLog.__table__.insert(), [
+                {**entry, "parameters": repr(entry["parameters"])} for entry in batch
+            ])
+    except Exception as e:
+        print(f"  Error writing query log: {e}")
+    finally:
+        _instrumentation.flushing = False
+
+
+def get_recent_queries() -> list[dict]:
+    """Get a snapshot of the in-memory query ring buffer, oldest first."""
+    return list(recent_queries)
+
+def _migrate_token_stablecoin_flag():
+    """Add tokens.is_stablecoin to existing databases and sync it with STABLECOINS."""
+    columns = {column["name"] for column in inspect(engine).get_columns("tokens")}
+    with engine.begin() as conn:
+        if "is_stablecoin" not in columns:
+            conn.execute(text(
+                "ALTER TABLE tokens ADD COLUMN is_stablecoin BOOLEAN NOT NULL DEFAULT FALSE"
+            ))
+            conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_tokens_is_stablecoin ON tokens (is_stablecoin)"
+            ))
+        # No-op unless STABLECOINS changed or rows were written outside the ORM
+        conn.execute(
+            text(
+                "UPDATE tokens SET is_stablecoin = (UPPER(symbol) = ANY(:symbols)) "
+                "WHERE is_stablecoin IS DISTINCT FROM (UPPER(symbol) = ANY(:symbols))"
+            ),
+            {"symbols": sorted(STABLECOINS)},
+        )
+
+def create_created_at_index():
+    """Index bridge_transactions.created_at on databases created before it was declared.
+
+    Run once by hand (scripts/create_indexes.py), not from init_db: on a large
+    table the build takes a while. An INVALID index left by an interrupted
+    build is dropped and rebuilt. Returns True if an index was built.
+    """
+    # CONCURRENTLY keeps the collector writing while a large table is indexed
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        valid = conn.execute(text(
+            "SELECT i.indisvalid FROM pg_index i "
+            "JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE c.relname = 'ix_bridge_transactions_created_at'"
+        )).scalar()
+        if valid:
+            return False
+        if valid is not None:
+            conn.execute(text("DROP INDEX CONCURRENTLY ix_bridge_transactions_created_at"))
+        conn.execute(text(
+            "CREATE INDEX CONCURRENTLY ix_bridge_transactions_created_at "
+            "ON bridge_transactions (created_at)"
+        ))
+        return True
+
+def _seed_mappings():
+    """Seed token and chain id mappings from const.py the first time."""
+    from src.lease_service import lock_key
+
+    with engine.begin() as conn:
+        # Serialize concurrent first starts so only one process seeds
+        conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": lock_key("seed_mappings")})
+        if conn.execute(MappingVersion.__table__.select()).first():
+            return
+        conn.execute(TokenMapping.__table__.insert(), [
+            {"chain": chain, "address": address, "symbol": symbol}
+            for (chain, address), symbol in {
+                (mapping["chain"].upper(), mapping["address"].lower()): mapping["symbol"]
+                for mapping in TOKEN_MAPPINGS
+            }.items()
+        ])
+        conn.execute(ChainIdMapping.__table__.insert(), [
+            {"chain_id": chain_id, "chain": chain} for chain_id, chain in CHAIN_ID_MAP.items()
+        ])
+        conn.execute(MappingVersion.__table__.insert(), {"id": 1, "version": 1})
+
+_schema_ready = False
+_schema_lock = threading.Lock()
+
+def init_db(force: bool = False):
+    """Create missing tables and columns. Runs once per process unless forced."""
+    global _schema_ready
+    with _schema_lock:
+        if _schema_ready and not force:
+            return
+        Base.metadata.create_all(bind=engine)
+        _migrate_token_stablecoin_flag()
+        _seed_mappings()
+        _schema_ready = True
 
 def get_db():
     db = SessionLocal()
@@ -0,0 +1,463 @@
+"""DuckDB query engine over the Parquet export.
+
+Answers the dashboard's analytical queries with the same signatures and
+return shapes as data_service, but reads the day-partitioned files written
+by parquet_export instead of Postgres. Select it with QUERY_ENGINE=duckdb.
+Results are as fresh as the last export.
+"""
+import threading
+from datetime import datetime, date
+from decimal import Decimal
+import numpy as np
+import pandas as pd
+from src import parquet_export
+from src.parquet_export import get_export_dir, TRANSACTIONS_DIR, TOKENS_FILE, PARTITION_FILE
+from src.const import (
+    SAME_CHAIN_SLIPPAGE,
+    UNKNOWN_SYMBOL,
+    STABLECOIN_FILTER_ONLY,
+    STABLECOIN_FILTER_INCLUDE,
+    ROUTES_VOLUME_SORT_DECIMALS,
+    ROUTES_SLIPPAGE_SORT_DECIMALS,
+)
+
+try:
+    import duckdb
+except ImportError:  # Optional dependency, only needed with QUERY_ENGINE=duckdb
+    duckdb = None
+
+# Sort columns of the routes query by ROUTES_SORT_OPTIONS name. Float keys are
+# summed as decimals (exact in any aggregation order) and rounded, as in data_service.
+ROUTE_SORT_EXPRESSIONS = {
+    "Volume": f"round(sum(amount_in::DECIMAL(38, 6)), {ROUTES_VOLUME_SORT_DECIMALS})",
+    "Slippage %": f"round(avg(slippage::DECIMAL(38, 10)), {ROUTES_SLIPPAGE_SORT_DECIMALS})",
+    "Transactions": "count(*)",
+}
+
+_connection = None
+_connection_lock = threading.Lock()
+
+
+def require_duckdb() -> None:
+    """Raise unless the optional duckdb extra (duckdb and pyarrow) is installed."""
+    missing = [
+        name for name, module in (("duckdb", duckdb), ("pyarrow", parquet_export.pyarrow))
+        if module is None
+    ]
+    if missing:
+        raise RuntimeError(
+            f"QUERY_ENGINE=duckdb requires {', '.join(missing)}: "
+            "install the duckdb extra with `uv sync --extra duckdb`"
+        )
+
+
+def _sql_string(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _get_connection():
+    """Get the process-wide in-memory DuckDB database with views over the export."""
+    global _connection
+    with _connection_lock:
+        if _connection is None:
+            if duckdb is None:
+                raise RuntimeError("QUERY_ENGINE=duckdb requires the 'duckdb' package")
+            root = get_export_dir()
+            partitions = list((root / TRANSACTIONS_DIR).glob(f"date=*/{PARTITION_FILE}"))
+            if not (root / TOKENS_FILE).exists() or not partitions:
+                raise RuntimeError(f"No Parquet export in {root}, run scripts/export_parquet.py first")
+
+            connection = duckdb.connect()
+            # The glob is expanded on every query, so new partitions show up without reconnecting
+            transactions_glob = str(root / TRANSACTIONS_DIR / "date=*" / PARTITION_FILE)
+            connection.execute(
+                f"CREATE VIEW transactions AS SELECT * FROM read_parquet({_sql_string(transactions_glob)})"
+            )
+            connection.execute(
+                f"CREATE VIEW tokens AS SELECT * FROM read_parquet({_sql_string(str(root / TOKENS_FILE))})"
+            )
+            _connection = connection
+    return _connection
+
+
+def _query(sql: str, params: list | None = None) -> pd.DataFrame:
+    # Cursors share the database but are safe to use from separate Streamlit threads
+    cursor = _get_connection().cursor()
+    try:
+        return cursor.execute(sql, params or []).df()
+    finally:
+        cursor.close()
+
+
+def _scalar(sql: str, params: list | None = None):
+    df = _query(sql, params)
+    if df.empty or pd.isna(df.iat[0, 0]):
+        return None
+    return df.iat[0, 0]
+
+
+def _date_conditions(start_date: date | None, end_date: date | None) -> tuple[list[str], list]:
+    """created_at bounds matching data_service's inclusive date filter."""
+    conditions, params = [], []
+    if start_date:
+        conditions.append("created_at >= ?")
+        params.append(datetime.combine(start_date, datetime.min.time()))
+    if end_date:
+        conditions.append("created_at <= ?")
+        params.append(datetime.combine(end_date, datetime.max.time()))
+    return conditions, params
+
+
+def _where(conditions: list[str]) -> str:
+    return f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+
+def _slippage_aggregate(percentile_type: str | int) -> tuple[str, list]:
+    """SQL aggregate matching calculate_percentile (linear interpolation)."""
+    if percentile_type == "avg":
+        return "avg(slippage)", []
+    return "quantile_cont(slippage, ?)", [percentile_type / 100]
+
+
+def get_earliest_transaction_date() -> date | None:
+    """Get the earliest exported transaction date."""
+    result = _scalar("SELECT min(created_at) FROM transactions")
+    return pd.Timestamp(result).date() if result is not None else None
+
+
+def get_available_symbols() -> list[str]:
+    """Get list of unique token symbols (case-insensitive grouping)."""
+    df = _query(
+        "SELECT DISTINCT upper(symbol) AS symbol FROM tokens WHERE symbol != ? ORDER BY symbol",
+        [UNKNOWN_SYMBOL],
+    )
+    return df["symbol"].tolist()
+
+
+def _get_chain_tokens(symbol: str) -> tuple[list[str], dict[str, int]]:
+    """Get the chains of a symbol and a chain -> token id map."""
+    df = _query(
+        "SELECT id, chain FROM tokens WHERE upper(symbol) = ? AND chain IS NOT NULL ORDER BY id",
+        [symbol.upper()],
+    )
+    chain_to_token = dict(zip(df["chain"], df["id"].astype(int)))
+    return sorted(chain_to_token), chain_to_token
+
+
+def _route_matrix(
+    symbol: str,
+    aggregate: str,
+    aggregate_params: list,
+    start_date: date | None,
+    end_date: date | None,
+    diagonal: float,
+    missing: float,
+    dtype,
+) -> pd.DataFrame:
+    """Aggregate every chain pair of a symbol in one grouped query and lay it out as a matrix."""
+    chains, chain_to_token = _get_chain_tokens(symbol)
+    if not chains:
+        return pd.DataFrame()
+
+    conditions, params = _date_conditions(start_date, end_date)
+    token_ids = list(chain_to_token.values())
+    conditions += ["list_contains(?, token_in_id)", "list_contains(?, token_out_id)"]
+    df = _query(
+        f"SELECT token_in_id, token_out_id, {aggregate} AS value FROM transactions "
+        f"{_where(conditions)} GROUP BY token_in_id, token_out_id",
+        aggregate_params + params + [token_ids, token_ids],
+    )
+    values = {
+        (int(row.token_in_id), int(row.token_out_id)): row.value
+        for row in df.itertuples(index=False)
+    }
+
+    matrix = pd.DataFrame(index=chains, columns=chains, dtype=dtype)
+    for from_chain in chains:
+        for to_chain in chains:
+            if from_chain == to_chain:
+                matrix.loc[from_chain, to_chain] = diagonal
+            else:
+                key = (chain_to_token[from_chain], chain_to_token[to_chain])
+                matrix.loc[from_chain, to_chain] = values.get(key, missing)
+    return matrix
+
+
+def load_slippage_matrix(
+    symbol: str,
+    start_date: date = None,
+    end_date: date = None,
+    percentile_type: str | int = "avg",
+) -> pd.DataFrame:
+    """Load slippage matrix for a token across all its available chains."""
+    aggregate, aggregate_params = _slippage_aggregate(percentile_type)
+    return _route_matrix(
+        symbol, aggregate, aggregate_params, start_date, end_date,
+        diagonal=SAME_CHAIN_SLIPPAGE, missing=np.nan, dtype=float,
+    )
+
+
+def get_transaction_counts(
+    symbol: str,
+    start_date: date = None,
+    end_date: date = None,
+) -> pd.DataFrame:
+    """Get transaction counts matrix for a token across all its available chains."""
+    return _route_matrix(
+        symbol, "count(*)", [], start_date, end_date, diagonal=0, missing=0, dtype=int,
+    )
+
+
+def get_volume_matrix(
+    symbol: str,
+    start_date: date = None,
+    end_date: date = None,
+) -> pd.DataFrame:
+    """Get volume matrix for a token across all its available chains."""
+    return _route_matrix(
+        symbol, "sum(amount_in)", [], start_date, end_date,
+        diagonal=SAME_CHAIN_SLIPPAGE, missing=0, dtype=float,
+    )
+
+
+def _routes_conditions(
+    start_date: date | None,
+    end_date: date | None,
+    min_amount: float | None,
+    max_amount: float | None,
+    stablecoin_filter: str | None,
+) -> tuple[list[str], list]:
+    conditions, params = _date_conditions(start_date, end_date)
+    if min_amount is not None:
+        conditions.append("amount_in >= ?")
+        params.append(min_amount)
+    if max_amount is not None:
+        conditions.append("amount_in < ?")
+        params.append(max_amount)
+    if stablecoin_filter == STABLECOIN_FILTER_ONLY:
+        conditions.append("source_is_stablecoin AND dest_is_stablecoin")
+    elif stablecoin_filter == STABLECOIN_FILTER_INCLUDE:
+        conditions.append("(source_is_stablecoin OR dest_is_stablecoin)")
+    return conditions, params
+
+
+ROUTES_GROUP_BY = "token_in_id, token_out_id, source_token, source_chain, dest_token, dest_chain"
+
+
+def get_routes_data(
+    start_date: date = None,
+    end_date: date = None,
+    min_amount: float = None,
+    max_amount: float = None,
+    stablecoin_filter: str = None,
+    order_by: str = "Volume",
+    limit: int = None,
+    offset: int = None,
+    after: tuple = None,
+) -> pd.DataFrame:
+    """Get routes with their volume, average slippage, and avg tx size.
+
+    Same filters, ordering and keyset pagination as data_service.get_routes_data.
+    """
+    conditions, params = _routes_conditions(start_date, end_date, min_amount, max_amount, stablecoin_filter)
+    sort_column = ROUTE_SORT_EXPRESSIONS[order_by]
+
+    having = ""
+    if after is not None:
+        # Cursors are taken from result frames, so unwrap NumPy scalars for binding
+        sort_value, token_in_id, token_out_id = (
+            value.item() if isinstance(value, np.generic) else value for value in after
+        )
+        if isinstance(sort_value, float):
+            sort_value = Decimal(str(sort_value))
+        having = (
+            f"HAVING {sort_column} < ? OR ({sort_column} = ? AND "
+            "(token_in_id > ? OR (token_in_id = ? AND token_out_id > ?)))"
+        )
+        params += [sort_value, sort_value, token_in_id, token_in_id, token_out_id]
+
+    sql = (
+        "SELECT token_in_id, token_out_id, source_token, source_chain, dest_token, dest_chain, "
+        f"{ROUTE_SORT_EXPRESSIONS['Volume']} AS volume, {ROUTE_SORT_EXPRESSIONS['Slippage %']} AS avg_slippage, "
+        "count(*) AS tx_count, avg(amount_in) AS avg_tx_size "
+        f"FROM transactions {_where(conditions)} GROUP BY {ROUTES_GROUP_BY} {having} "
+        f"ORDER BY {sort_column} DESC, token_in_id, token_out_id"
+    )
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(limit)
+    if offset:
+        sql += " OFFSET ?"
+        params.append(offset)
+
+    df = _query(sql, params)
+    if df.empty:
+        return pd.DataFrame()
+
+    return pd.DataFrame({
+        "Source Token": df["source_token"],
+        "Source Chain": df["source_chain"],
+        "Dest Token": df["dest_token"],
+        "Dest Chain": df["dest_chain"],
+        "Volume": df["volume"].astype(float).fillna(0),
+        "Slippage %": df["avg_slippage"].astype(float).fillna(0),
+        "Transactions": df["tx_count"].astype(int),
+        "Avg Tx Size": df["avg_tx_size"].fillna(0),
+        "Token In ID": df["token_in_id"].astype(int),
+        "Token Out ID": df["token_out_id"].astype(int),
+    })
+
+
+def get_routes_summary(
+    start_date: date = None,
+    end_date: date = None,
+    min_amount: float = None,
+    max_amount: float = None,
+    stablecoin_filter: str = None,
+) -> dict:
+    """Get route count and totals for the routes matching the filters, in one aggregate."""
+    conditions, params = _routes_conditions(start_date, end_date, min_amount, max_amount, stablecoin_filter)
+    df = _query(
+        "SELECT count(*) AS routes, sum(tx_count) AS transactions, sum(volume) AS volume, "
+        "avg(avg_slippage) AS avg_slippage FROM ("
+        f"SELECT count(*) AS tx_count, {ROUTE_SORT_EXPRESSIONS['Volume']} AS volume, "
+        f"{ROUTE_SORT_EXPRESSIONS['Slippage %']} AS avg_slippage "
+        f"FROM transactions {_where(conditions)} GROUP BY {ROUTES_GROUP_BY})",
+        params,
+    )
+    row = df.iloc[0]
+    return {
+        "routes": int(row["routes"]),
+        "transactions": int(row["transactions"]) if pd.notna(row["transactions"]) else 0,
+        "volume": float(row["volume"]) if pd.notna(row["volume"]) else 0,
+        "avg_slippage": float(row["avg_slippage"]) if pd.notna(row["avg_slippage"]) else None,
+    }
+
+
+def get_overall_stats(start_date: date = None, end_date: date = None) -> dict:
+    """Get overall statistics with optional date range filter."""
+    conditions, params = _date_conditions(start_date, end_date)
+    df = _query(
+        f"SELECT count(*) AS transactions, sum(amount_in) AS volume FROM transactions {_where(conditions)}",
+        params,
+    )
+    volume = df.at[0, "volume"]
+    return {
+        "transactions": int(df.at[0, "transactions"]),
+        "volume": volume if pd.notna(volume) else 0,
+    }
+
+
+def _symbol_token_ids(symbol: str) -> list[int]:
+    df = _query("SELECT id FROM tokens WHERE upper(symbol) = ?", [symbol.upper()])
+    return df["id"].astype(int).tolist()
+
+
+def get_token_stats(
+    symbol: str,
+    start_date: date = None,
+    end_date: date = None,
+) -> dict:
+    """Get statistics for a token symbol (aggregated across all chains)."""
+    token_ids = _symbol_token_ids(symbol)
+    if not token_ids:
+        return {"transactions": 0, "volume": 0, "symbol": symbol}
+
+    conditions, params = _date_conditions(start_date, end_date)
+    conditions.append("(list_contains(?, token_in_id) OR list_contains(?, token_out_id))")
+    df = _query(
+        f"SELECT count(*) AS transactions, sum(amount_in) AS volume FROM transactions {_where(conditions)}",
+        params + [token_ids, token_ids],
+    )
+    volume = df.at[0, "volume"]
+    return {
+        "transactions": int(df.at[0, "transactions"]),
+        "volume": volume if pd.notna(volume) else 0,
+        "symbol": symbol,
+    }
+
+
+def _daily_stats(conditions: list[str], params: list) -> pd.DataFrame:
+    df = _query(
+        "SELECT CAST(created_at AS DATE) AS day, sum(amount_in) AS volume, count(*) AS transactions "
+        f"FROM transactions {_where(conditions)} GROUP BY day ORDER BY day",
+        params,
+    )
+    if df.empty:
+        return pd.DataFrame()
+    return pd.DataFrame({
+        "Date": pd.to_datetime(df["day"]).dt.date,
+        "Volume": df["volume"].fillna(0),
+        "Transactions": df["transactions"].astype(int),
+    })
+
+
+def get_token_daily_stats(
+    symbol: str,
+    start_date: date = None,
+    end_date: date = None,
+) -> pd.DataFrame:
+    """Get daily volume and transaction counts for a token."""
+    token_ids = _symbol_token_ids(symbol)
+    if not token_ids:
+        return pd.DataFrame()
+
+    conditions, params = _date_conditions(start_date, end_date)
+    conditions.append("(list_contains(?, token_in_id) OR list_contains(?, token_out_id))")
+    return _daily_stats(conditions, params + [token_ids, token_ids])
+
+
+def _route_token_ids(source_token: str, source_chain: str, dest_token: str, dest_chain: str) -> tuple | None:
+    """Find the (token_in_id, token_out_id) of a route, like data_service's first() lookups."""
+    ids = []
+    for symbol, chain in ((source_token, source_chain), (dest_token, dest_chain)):
+        token_id = _scalar(
+            "SELECT min(id) FROM tokens WHERE upper(symbol) = ? AND chain = ?",
+            [symbol.upper(), chain],
+        )
+        if token_id is None:
+            return None
+        ids.append(int(token_id))
+    return tuple(ids)
+
+
+def get_route_daily_stats(
+    source_token: str,
+    source_chain: str,
+    dest_token: str,
+    dest_chain: str,
+    start_date: date = None,
+    end_date: date = None,
+) -> pd.DataFrame:
+    """Get daily volume and transaction counts for a specific route."""
+    route = _route_token_ids(source_token, source_chain, dest_token, dest_chain)
+    if route is None:
+        return pd.DataFrame()
+
+    conditions, params = _date_conditions(start_date, end_date)
+    conditions += ["token_in_id = ?", "token_out_id = ?"]
+    return _daily_stats(conditions, params + list(route))
+
+
+def get_route_slippage_percentile(
+    source_token: str,
+    source_chain: str,
+    dest_token: str,
+    dest_chain: str,
+    percentile_type: str | int,
+    start_date: date = None,
+    end_date: date = None,
+) -> float | None:
+    """Get slippage percentile for a specific route."""
+    route = _route_token_ids(source_token, source_chain, dest_token, dest_chain)
+    if route is None:
+        return None
+
+    aggregate, aggregate_params = _slippage_aggregate(percentile_type)
+    conditions, params = _date_conditions(start_date, end_date)
+    conditions += ["token_in_id = ?", "token_out_id = ?", "slippage IS NOT NULL"]
+    result = _scalar(
+        f"SELECT {aggregate} FROM transactions {_where(conditions)}",
+        aggregate_params + params + list(route),
+    )
+    return float(result) if result is not None else None
@@ -0,0 +1,168 @@
+from datetime import datetime, timedelta
+from statistics import median
+from sqlalchemy import func
+from src.database import BridgeTransaction, GapRepair
+from src.checkpoint_service import get_covered_ranges
+from src.const import (
+    GAP_BASELINE_HOURS,
+    GAP_MIN_BASELINE,
+    GAP_MIN_FILL_RATIO,
+    GAP_MAX_WINDOW_HOURS,
+    GAP_REPAIR_MAX_ATTEMPTS,
+)
+
+HOUR = timedelta(hours=1)
+
+
+def _merge_ranges(ranges: list[tuple[datetime, datetime]]) -> list[tuple[datetime, datetime]]:
+    """Merge touching or overlapping ranges."""
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(end, merged[-1][1]))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def find_uncovered_ranges(db) -> list[tuple[datetime, datetime]]:
+    """Find holes between completed checkpoint windows.
+
+    Only interior holes are reported: history older than the oldest checkpoint
+    is still the collector's backfill work, not a gap.
+    """
+    covered = get_covered_ranges(db)
+    return [
+        (previous_end, next_start)
+        for (_, previous_end), (next_start, _) in zip(covered, covered[1:])
+    ]
+
+
+def get_hourly_counts(db, start: datetime, end: datetime) -> dict[datetime, int]:
+    """Get transaction counts per hour bucket in [start, end)."""
+    bucket = func.date_trunc("hour", BridgeTransaction.created_at)
+    rows = (
+        db.query(bucket, func.count(BridgeTransaction.id))
+        .filter(
+            BridgeTransaction.created_at >= start,
+            BridgeTransaction.created_at < end,
+        )
+        .group_by(bucket)
+        .all()
+    )
+    return {hour: count for hour, count in rows}
+
+
+def find_sparse_hours(db, start: datetime, end: datetime) -> list[tuple[datetime, datetime]]:
+    """Find empty or under-filled hour buckets compared to their neighbours.
+
+    An hour is suspicious when it holds less than GAP_MIN_FILL_RATIO of the
+    median count of the surrounding GAP_BASELINE_HOURS hours. Quiet periods
+    whose baseline is below GAP_MIN_BASELINE are never flagged.
+    """
+    first_hour = start.replace(minute=0, second=0, microsecond=0)
+    counts = get_hourly_counts(db, first_hour, end)
+
+    hours = []
+    hour = first_hour
+    while hour + HOUR <= end:
+        hours.append(hour)
+        hour += HOUR
+
+    series = [counts.get(h, 0) for h in hours]
+    half_window = GAP_BASELINE_HOURS // 2
+
+    sparse = []
+    for i, hour in enumerate(hours):
+        neighbours = series[max(0, i - half_window):i] + series[i + 1:i + 1 + half_window]
+        if not neighbours:
+            continue
+        baseline = median(neighbours)
+        if baseline >= GAP_MIN_BASELINE and series[i] < baseline * GAP_MIN_FILL_RATIO:
+            sparse.append((hour, hour + HOUR))
+
+    return _merge_ranges(sparse)
+
+
+def split_window(
+    start: datetime,
+    end: datetime,
+    max_span: timedelta = timedelta(hours=GAP_MAX_WINDOW_HOURS),
+) -> list[tuple[datetime, datetime]]:
+    """Split a range into windows no longer than max_span."""
+    windows = []
+    window_start = start
+    while window_start < end:
+        window_end = min(window_start + max_span, end)
+        windows.append((window_start, window_end))
+        window_start = window_end
+    return windows
+
+
+def enqueue_gaps(db, ranges: list[tuple[datetime, datetime]], reason: str) -> int:
+    """Queue bounded repair windows for the given ranges. Returns count of new windows."""
+    windows = [w for start, end in ranges for w in split_window(start, end)]
+    if not windows:
+        return 0
+
+    existing = {
+        (row.window_start, row.window_end)
+        for row in db.query(GapRepair.window_start, GapRepair.window_end).filter(
+            GapRepair.window_start.in_({start for start, _ in windows})
+        )
+    }
+
+    added = 0
+    for window_start, window_end in windows:
+        if (window_start, window_end) in existing:
+            continue
+        db.add(GapRepair(
+            window_start=window_start,
+            window_end=window_end,
+            reason=reason,
+            status="pending",
+        ))
+        existing.add((window_start, window_end))
+        added += 1
+
+    db.commit()
+    return added
+
+
+def scan_for_gaps(db, start: datetime, end: datetime) -> dict:
+    """Scan checkpoints and hourly density, queueing repairs. Returns counts per reason."""
+    uncovered = find_uncovered_ranges(db)
+    sparse = find_sparse_hours(db, start, end)
+    return {
+        "uncovered": enqueue_gaps(db, uncovered, "uncovered"),
+        "sparse": enqueue_gaps(db, sparse, "sparse"),
+    }
+
+
+def get_pending_gaps(db, limit: int) -> list[GapRepair]:
+    """Get queued repair windows, newest first."""
+    return (
+        db.query(GapRepair)
+        .filter(GapRepair.status == "pending")
+        .order_by(GapRepair.window_end.desc())
+        .limit(limit)
+        .all()
+    )
+
+
+def mark_gap_done(db, gap: GapRepair) -> None:
+    """Mark a repair window as refilled."""
+    gap.status = "done"
+    gap.attempts += 1
+    gap.last_error = None
+    gap.updated_at = datetime.utcnow()
+    db.commit()
+
+
+def mark_gap_failed(db, gap: GapRepair, error: str) -> None:
+    """Record a failed attempt, giving up after GAP_REPAIR_MAX_ATTEMPTS."""
+    gap.attempts += 1
+    gap.last_error = error
+    gap.status = "failed" if gap.attempts >= GAP_REPAIR_MAX_ATTEMPTS else "pending"
+    gap.updated_at = datetime.utcnow()
+    db.commit()
@@ -0,0 +1,137 @@
+"""Postgres advisory locks with lease heartbeats for coordinating collectors.
+
+Each unit of work (forward sync, one backfill shard, gap repair) is guarded by
+a session-level advisory lock held on a dedicated connection, so at most one
+node works on it and the lock is released automatically if that node dies.
+While the lock is held a background thread heartbeats the matching
+collector_leases row, which shows who holds what. If a heartbeat fails the
+lock may be gone, so the lease is marked lost and the worker stops at its
+next check.
+"""
+import hashlib
+import os
+import socket
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Iterator
+from sqlalchemy import delete, select, text
+from sqlalchemy.dialects.postgresql import insert
+from src.database import engine, CollectorLease
+from src.const import LEASE_HEARTBEAT_SECONDS, LEASE_TTL_SECONDS
+
+LOCK_NAMESPACE = "stablecoins-collector"
+
+
+class LeaseLost(Exception):
+    """Raised when a lease's heartbeat fails and its lock can no longer be trusted."""
+
+
+def lock_key(name: str) -> int:
+    """Stable signed 64-bit advisory lock key for a lease name."""
+    digest = hashlib.blake2b(f"{LOCK_NAMESPACE}:{name}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+def get_holder_id() -> str:
+    """Identify this process in lease rows."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class Lease:
+    """A held advisory lock plus its heartbeat thread."""
+
+    def __init__(self, name: str, connection, heartbeat_seconds: float = LEASE_HEARTBEAT_SECONDS):
+        self.name = name
+        self.holder = get_holder_id()
+        self.heartbeat_seconds = heartbeat_seconds
+        self.lost = threading.Event()
+        self._connection = connection
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._heartbeat_loop, daemon=True)
+
+    def check(self) -> None:
+        """Raise LeaseLost if the lock may have been lost."""
+        if self.lost.is_set():
+            raise LeaseLost(f"Lost lease {self.name}")
+
+    def _write(self, acquired: bool = False) -> None:
+        now = datetime.utcnow()
+        values = {
+            "name": self.name,
+            "holder": self.holder,
+            "heartbeat_at": now,
+            "expires_at": now + timedelta(seconds=LEASE_TTL_SECONDS),
+        }
+        # A row left by a crashed holder is taken over; heartbeats keep acquired_at
+        set_ = {**values, "acquired_at": now} if acquired else values
+        statement = insert(CollectorLease).values(acquired_at=now, **values)
+        self._connection.execute(statement.on_conflict_do_update(index_elements=["name"], set_=set_))
+        self._connection.commit()
+
+    def _heartbeat_loop(self) -> None:
+        while not self._stopped.wait(self.heartbeat_seconds):
+            try:
+                self._write()
+            except Exception as e:
+                print(f"  Lease {self.name} heartbeat failed: {e}")
+                self.lost.set()
+                return
+
+    def start(self) -> None:
+        self._write(acquired=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+
+@contextmanager
+def acquire_lease(name: str) -> Iterator[Lease | None]:
+    """Try to take the named lock without waiting. Yields the Lease, or None if another node holds it."""
+    connection = engine.connect()
+    key = lock_key(name)
+    try:
+        acquired = connection.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": key}).scalar()
+        connection.commit()
+    except Exception:
+        connection.close()
+        raise
+
+    if not acquired:
+        connection.close()
+        yield None
+        return
+
+    lease = Lease(name, connection)
+    try:
+        lease.start()
+        yield lease
+    finally:
+        lease.stop()
+        try:
+            connection.execute(delete(CollectorLease).where(
+                CollectorLease.name == name, CollectorLease.holder == lease.holder
+            ))
+            connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": key})
+            connection.commit()
+            connection.close()
+        except Exception as e:
+            # Never hand a connection that may still hold the lock back to the pool
+            print(f"  Error releasing lease {name}: {e}")
+            connection.invalidate()
+
+
+def get_active_leases(db) -> list[CollectorLease]:
+    """Get leases whose heartbeat has not expired."""
+    return (
+        db.execute(
+            select(CollectorLease)
+            .where(CollectorLease.expires_at > datetime.utcnow())
+            .order_by(CollectorLease.name)
+        )
+        .scalars()
+        .all()
+    )
@@ -0,0 +1,204 @@
+"""Token and chain id mappings stored in the database.
+
+token_mappings and chain_id_mappings are seeded from const.py by init_db.
+Every change bumps mapping_version, and long-running ingestion processes
+check that version every MAPPING_RELOAD_SECONDS and install the new maps in
+the parser without a restart. Only tokens whose (chain, address) key or
+nep245 chain id changed are re-parsed.
+"""
+import threading
+import time
+from datetime import datetime
+from sqlalchemy import Boolean, Integer, String, column, delete, func, select, tuple_, update, values
+from sqlalchemy.dialects.postgresql import insert
+from src.database import Token, TokenMapping, ChainIdMapping, MappingVersion, is_stablecoin_symbol
+from src import parser
+from src.const import MAPPING_RELOAD_SECONDS
+
+
+def get_mapping_version(db) -> int:
+    """Get the current mapping version, 0 if the mappings were never seeded."""
+    return db.execute(select(MappingVersion.version).where(MappingVersion.id == 1)).scalar() or 0
+
+
+def load_mappings(db) -> tuple[dict, dict]:
+    """Load (chain_upper, address_lower) -> symbol and chain id -> chain maps."""
+    token_lookup = {
+        (chain.upper(), address.lower()): symbol
+        for chain, address, symbol in db.execute(
+            select(TokenMapping.chain, TokenMapping.address, TokenMapping.symbol)
+        )
+    }
+    chain_id_map = dict(db.execute(select(ChainIdMapping.chain_id, ChainIdMapping.chain)).all())
+    return token_lookup, chain_id_map
+
+
+def bump_mapping_version(db) -> int:
+    """Increment the mapping version so other processes reload. Returns the new version."""
+    return db.execute(
+        update(MappingVersion)
+        .where(MappingVersion.id == 1)
+        .values(version=MappingVersion.version + 1, updated_at=datetime.utcnow())
+        .returning(MappingVersion.version)
+    ).scalar()
+
+
+def set_token_mapping(db, chain: str, address: str, symbol: str) -> None:
+    """Add or change the symbol for a (chain, address) key."""
+    db.execute(
+        insert(TokenMapping)
+        .values(chain=chain.upper(), address=address.lower(), symbol=symbol)
+        .on_conflict_do_update(constraint="uq_token_mapping", set_={"symbol": symbol})
+    )
+
+
+def remove_token_mapping(db, chain: str, address: str) -> bool:
+    """Remove a (chain, address) key. Returns False if it did not exist."""
+    result = db.execute(
+        delete(TokenMapping).where(
+            TokenMapping.chain == chain.upper(),
+            TokenMapping.address == address.lower(),
+        )
+    )
+    return result.rowcount > 0
+
+
+def set_chain_id_mapping(db, chain_id: str, chain: str) -> None:
+    """Add or change the chain name for a nep245 chain id."""
+    db.execute(
+        insert(ChainIdMapping)
+        .values(chain_id=chain_id, chain=chain)
+        .on_conflict_do_update(index_elements=["chain_id"], set_={"chain": chain})
+    )
+
+
+def apply_token_updates(db, rows: list[dict]) -> None:
+    """Write re-parsed token fields with a single UPDATE ... FROM (VALUES ...).
+
+    Rows need id, chain, address and symbol. is_stablecoin is derived here
+    because Core updates skip the ORM hook that normally sets it.
+    """
+    if not rows:
+        return
+    parsed = values(
+        column("id", Integer),
+        column("chain", String),
+        column("address", String),
+        column("symbol", String),
+        column("is_stablecoin", Boolean),
+        name="parsed",
+    ).data([
+        (row["id"], row["chain"], row["address"], row["symbol"], is_stablecoin_symbol(row["symbol"]))
+        for row in rows
+    ])
+    db.execute(
+        update(Token)
+        .where(Token.id == parsed.c.id)
+        .values(
+            chain=parsed.c.chain,
+            address=parsed.c.address,
+            symbol=parsed.c.symbol,
+            is_stablecoin=parsed.c.is_stablecoin,
+        )
+    )
+
+
+def diff_mappings(old: tuple[dict, dict], new: tuple[dict, dict]) -> tuple[set, set]:
+    """Get the (chain, address) keys and chain ids whose mapping differs between old and new."""
+    old_lookup, old_chain_ids = old
+    new_lookup, new_chain_ids = new
+    token_keys = {
+        key for key in old_lookup.keys() | new_lookup.keys()
+        if old_lookup.get(key) != new_lookup.get(key)
+    }
+    chain_ids = {
+        chain_id for chain_id in old_chain_ids.keys() | new_chain_ids.keys()
+        if old_chain_ids.get(chain_id) != new_chain_ids.get(chain_id)
+    }
+    return token_keys, chain_ids
+
+
+def _nep245_chain_id(asset_id: str) -> str | None:
+    chain_id, separator, _ = asset_id.rpartition(":")[2].partition("_")
+    return chain_id if separator else None
+
+
+def find_affected_tokens(db, token_keys: set, chain_ids: set) -> list:
+    """Get (id, asset_id, chain, address, symbol) of tokens touched by changed keys or chain ids."""
+    columns = (Token.id, Token.asset_id, Token.chain, Token.address, Token.symbol)
+    affected = {}
+
+    if token_keys:
+        token_key = tuple_(func.upper(Token.chain), func.lower(func.coalesce(Token.address, "native")))
+        for row in db.execute(select(*columns).where(token_key.in_(list(token_keys)))):
+            affected[row.id] = row
+
+    if chain_ids:
+        for row in db.execute(select(*columns).where(Token.asset_id.like("nep245:%"))):
+            if _nep245_chain_id(row.asset_id) in chain_ids:
+                affected[row.id] = row
+
+    return list(affected.values())
+
+
+def reclassify_tokens(db, old: tuple[dict, dict], new: tuple[dict, dict]) -> set[int]:
+    """Re-parse only the tokens affected by a mapping change. Returns ids of updated tokens.
+
+    The new mappings must already be installed in the parser.
+    """
+    token_keys, chain_ids = diff_mappings(old, new)
+    rows = find_affected_tokens(db, token_keys, chain_ids)
+    parsed_assets = parser.parse_asset_ids(row.asset_id for row in rows)
+
+    updates = []
+    for row in rows:
+        parsed = parsed_assets[row.asset_id]
+        if (row.chain, row.address, row.symbol) != (parsed.chain, parsed.address, parsed.symbol):
+            updates.append({
+                "id": row.id,
+                "chain": parsed.chain,
+                "address": parsed.address,
+                "symbol": parsed.symbol,
+            })
+
+    apply_token_updates(db, updates)
+    return {row["id"] for row in updates}
+
+
+class MappingRegistry:
+    """Keeps the parser's mappings in step with the database version."""
+
+    def __init__(self, reload_seconds: float = MAPPING_RELOAD_SECONDS):
+        self.reload_seconds = reload_seconds
+        self.version = None
+        self._last_checked = 0.0
+        self._lock = threading.Lock()
+
+    def ensure_current(self, db, force: bool = False) -> bool:
+        """Reload the mappings if their version changed. Returns True if reloaded.
+
+        The version is only queried every reload_seconds unless forced.
+        """
+        now = time.monotonic()
+        if not force and now - self._last_checked < self.reload_seconds:
+            return False
+
+        with self._lock:
+            self._last_checked = now
+            version = get_mapping_version(db)
+            if not version or version == self.version:
+                return False
+            parser.set_mappings(*load_mappings(db))
+            self.version = version
+            return True
+
+
+_registry: MappingRegistry | None = None
+
+
+def get_mapping_registry() -> MappingRegistry:
+    """Get the process-wide mapping registry."""
+    global _registry
+    if _registry is None:
+        _registry = MappingRegistry()
+    return _registry
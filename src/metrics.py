@@ -0,0 +1,249 @@
+"""Collector metrics in the Prometheus text exposition format.
+
+Metrics live in a process-wide registry and can be written to a textfile
+(for node_exporter's textfile collector) or served over HTTP on /metrics.
+Counters are cumulative, so per-second throughput is rate() over them.
+Jobs run by the scheduler in worker processes send a snapshot back, which the
+scheduler merges into its own registry.
+"""
+import os
+import threading
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _format_labels(labels: tuple) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(f'{name}="{value}"' for name, value in labels)
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """Base class for a named metric with optional labels."""
+
+    type = "untyped"
+
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(sorted(labels.items()))
+
+    def samples(self) -> list[tuple[str, tuple, float]]:
+        with self._lock:
+            return [(self.name, key, value) for key, value in self._values.items()]
+
+    def snapshot(self) -> dict:
+        """Copy of the current values, e.g. to send from a worker process."""
+        with self._lock:
+            return dict(self._values)
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        for name, labels, value in self.samples():
+            lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def merge(self, values: dict) -> None:
+        """Add counts snapshotted from another process."""
+        with self._lock:
+            for key, value in values.items():
+                self._values[key] = self._values.get(key, 0) + value
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def merge(self, values: dict) -> None:
+        """Take the latest values from another process."""
+        with self._lock:
+            self._values.update(values)
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, buckets: tuple = LATENCY_BUCKETS):
+        super().__init__(name, help)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * len(self.buckets), 0.0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self._values[key] = (counts, total + value)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {key: (list(counts), total) for key, (counts, total) in self._values.items()}
+
+    def merge(self, values: dict) -> None:
+        """Add bucket counts and sums from another process."""
+        with self._lock:
+            for key, (counts, total) in values.items():
+                current, current_total = self._values.get(key, ([0] * len(self.buckets), 0.0))
+                self._values[key] = ([a + b for a, b in zip(current, counts)], current_total + total)
+
+    def samples(self) -> list[tuple[str, tuple, float]]:
+        samples = []
+        with self._lock:
+            for key, (counts, total) in self._values.items():
+                for bound, count in zip(self.buckets, counts):
+                    samples.append((f"{self.name}_bucket", key + (("le", _format_value(bound)),), count))
+                samples.append((f"{self.name}_sum", key, total))
+                samples.append((f"{self.name}_count", key, counts[-1]))
+        return samples
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self.metrics) + "\n"
+
+    def snapshot(self) -> dict:
+        return {metric.name: metric.snapshot() for metric in self.metrics}
+
+    def merge(self, snapshot: dict) -> None:
+        for metric in self.metrics:
+            if metric.name in snapshot:
+                metric.merge(snapshot[metric.name])
+
+
+REGISTRY = MetricsRegistry()
+
+# =============================================================================
+# COLLECTOR METRICS
+# =============================================================================
+API_REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "collector_api_request_seconds", "Near Intents API request latency"
+))
+API_REQUESTS = REGISTRY.register(Counter(
+    "collector_api_requests_total", "Near Intents API requests by HTTP status"
+))
+API_BYTES = REGISTRY.register(Counter(
+    "collector_api_bytes_total", "Response bytes downloaded from the API"
+))
+ROWS_PARSED = REGISTRY.register(Counter(
+    "collector_rows_parsed_total", "Transactions received from the API"
+))
+ROWS_INSERTED = REGISTRY.register(Counter(
+    "collector_rows_inserted_total", "Transactions inserted into bridge_transactions"
+))
+ROWS_DEDUPLICATED = REGISTRY.register(Counter(
+    "collector_rows_deduplicated_total", "Transactions skipped because they were already stored"
+))
+KNOWN_PAGES = REGISTRY.register(Counter(
+    "collector_known_pages_total", "Pages whose transactions were all stored already"
+))
+TOKEN_CACHE_HITS = REGISTRY.register(Counter(
+    "collector_token_cache_hits_total", "Asset ids resolved from the in-process token id cache"
+))
+TOKEN_CACHE_MISSES = REGISTRY.register(Counter(
+    "collector_token_cache_misses_total", "Asset ids that needed a token insert or lookup"
+))
+COMMIT_SECONDS = REGISTRY.register(Histogram(
+    "collector_commit_seconds", "Database commit latency per page"
+))
+CACHE_REFRESH_SECONDS = REGISTRY.register(Gauge(
+    "collector_slippage_cache_refresh_seconds", "Duration of the last slippage cache refresh"
+))
+NEWEST_TRANSACTION_LAG_SECONDS = REGISTRY.register(Gauge(
+    "collector_newest_transaction_lag_seconds", "Seconds between now and the newest stored created_at"
+))
+LAST_RUN_TIMESTAMP = REGISTRY.register(Gauge(
+    "collector_last_run_timestamp_seconds", "Unix time the last collection run finished"
+))
+LAST_RUN_SECONDS = REGISTRY.register(Gauge(
+    "collector_last_run_seconds", "Duration of the last collection run"
+))
+LAST_RUN_ROWS_PER_SECOND = REGISTRY.register(Gauge(
+    "collector_last_run_rows_per_second", "Rows fetched per second during the last run"
+))
+
+# =============================================================================
+# SCHEDULER METRICS
+# =============================================================================
+SCHEDULER_JOB_RUNS = REGISTRY.register(Counter(
+    "scheduler_job_runs_total", "Scheduled job runs by job and outcome (ok, failed, timeout)"
+))
+SCHEDULER_JOB_SKIPPED = REGISTRY.register(Counter(
+    "scheduler_job_skipped_total", "Scheduled runs coalesced because the previous run was still going"
+))
+SCHEDULER_JOB_SECONDS = REGISTRY.register(Gauge(
+    "scheduler_job_last_run_seconds", "Duration of the last run of each scheduled job"
+))
+ARRIVAL_RATE = REGISTRY.register(Gauge(
+    "scheduler_arrival_rate_per_second", "Estimated transaction arrival rate from recent created_at density"
+))
+FORWARD_SYNC_INTERVAL_SECONDS = REGISTRY.register(Gauge(
+    "scheduler_forward_sync_interval_seconds", "Delay chosen before the next forward sync"
+))
+
+
+def write_textfile(path: str | None = None) -> None:
+    """Atomically write all metrics to a Prometheus textfile (METRICS_TEXTFILE by default)."""
+    path = path or os.getenv("METRICS_TEXTFILE")
+    if not path:
+        return
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(REGISTRY.render())
+    os.replace(tmp_path, path)
+
+
+def start_http_server(port: int, host: str = "0.0.0.0"):
+    """Serve /metrics from a daemon thread."""
+    # Imported here: http.server is slow to import and only the scheduler serves metrics
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            payload = REGISTRY.render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
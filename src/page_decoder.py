@@ -0,0 +1,143 @@
+"""Decode an API page into columnar arrays for the bulk writer.
+
+The page's dicts are walked once to pull out raw field values. Everything
+after that (number and timestamp parsing, slippage, validation, asset id
+encoding) runs vectorized over whole columns.
+"""
+import warnings
+from dataclasses import dataclass
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from src.const import (
+    FIELD_DEPOSIT_KEY,
+    FIELD_ORIGIN_ASSET,
+    FIELD_DEST_ASSET,
+    FIELD_AMOUNT_IN,
+    FIELD_AMOUNT_OUT,
+    FIELD_CREATED_AT,
+    FIELD_DEPOSIT_ADDRESS,
+    FIELD_STATUS,
+    FIELD_INTENT_HASHES,
+)
+
+
+@dataclass(slots=True)
+class PageBatch:
+    """Valid, de-duplicated transactions of one page as parallel column arrays.
+
+    Asset ids are dictionary-encoded: asset_ids holds each distinct id once and
+    origin_codes/dest_codes index into it.
+    """
+
+    deposit_keys: np.ndarray  # object (str)
+    deposit_addresses: np.ndarray  # object (str)
+    statuses: np.ndarray  # object (str)
+    intent_hashes: np.ndarray  # object
+    amount_in: np.ndarray  # float64
+    amount_out: np.ndarray  # float64
+    slippage: np.ndarray  # float64, percent
+    created_at: np.ndarray  # int64, microseconds since the epoch (UTC)
+    asset_ids: np.ndarray  # object (str), distinct
+    origin_codes: np.ndarray  # intp
+    dest_codes: np.ndarray  # intp
+    oldest: datetime | None  # Oldest timestamp on the page, including rows dropped as invalid
+
+    def __len__(self) -> int:
+        return len(self.deposit_keys)
+
+    def created_at_datetimes(self) -> list[datetime]:
+        """created_at as naive UTC datetimes."""
+        return self.created_at.astype("datetime64[us]").tolist()
+
+
+def compute_slippage(amount_in: np.ndarray, amount_out: np.ndarray) -> np.ndarray:
+    """Slippage percentage for each row; 0 where amount_in is not positive."""
+    positive = amount_in > 0
+    safe_in = np.where(positive, amount_in, 1.0)
+    return np.where(positive, (amount_in - amount_out) / safe_in * 100, 0.0)
+
+
+def _to_float64(values: list) -> np.ndarray:
+    """Convert numbers or numeric strings to float64, NaN where missing or invalid."""
+    try:
+        return np.array(values, dtype=object).astype(np.float64)
+    except (TypeError, ValueError):
+        return pd.to_numeric(pd.Series(values, dtype=object), errors="coerce").to_numpy(np.float64)
+
+
+def parse_created_at(values: list) -> np.ndarray:
+    """Parse ISO-8601 timestamps into datetime64[us] (naive UTC), NaT where missing or invalid."""
+    stripped = [value[:-1] if isinstance(value, str) and value.endswith("Z") else value for value in values]
+    try:
+        # The API sends UTC with a Z suffix, which NumPy parses directly once the Z is gone.
+        # NumPy only warns about other offsets, so treat the warning as a failure.
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            return np.array(stripped, dtype="datetime64[us]")
+    except (TypeError, ValueError, UserWarning):
+        # Offsets or malformed values: let pandas handle them row by row
+        parsed = pd.to_datetime(pd.Series(values, dtype=object), utc=True, errors="coerce", format="ISO8601")
+        return parsed.dt.tz_localize(None).dt.as_unit("us").to_numpy()
+
+
+def decode_page(transactions: list) -> PageBatch:
+    """Decode API transactions into a PageBatch.
+
+    Rows without a deposit key, either asset id, a numeric amount or a
+    parseable timestamp are dropped, as are repeats of a deposit key.
+    """
+    deposit_keys, origins, dests = [], [], []
+    amounts_in, amounts_out, created = [], [], []
+    addresses, statuses, hashes = [], [], []
+    for tx in transactions:
+        deposit_keys.append(tx.get(FIELD_DEPOSIT_KEY) or "")
+        origins.append(tx.get(FIELD_ORIGIN_ASSET) or "")
+        dests.append(tx.get(FIELD_DEST_ASSET) or "")
+        amounts_in.append(tx.get(FIELD_AMOUNT_IN, 0))
+        amounts_out.append(tx.get(FIELD_AMOUNT_OUT, 0))
+        created.append(tx.get(FIELD_CREATED_AT))
+        addresses.append(tx.get(FIELD_DEPOSIT_ADDRESS, ""))
+        statuses.append(tx.get(FIELD_STATUS, ""))
+        hashes.append(tx.get(FIELD_INTENT_HASHES, ""))
+
+    amount_in = _to_float64(amounts_in)
+    amount_out = _to_float64(amounts_out)
+    timestamps = parse_created_at(created)
+    has_timestamp = ~np.isnat(timestamps)
+    created_at = timestamps.astype(np.int64)
+
+    keys = np.array(deposit_keys, dtype=object)
+    origins = np.array(origins, dtype=object)
+    dests = np.array(dests, dtype=object)
+    valid = (
+        (keys != "")
+        & (origins != "")
+        & (dests != "")
+        & ~np.isnan(amount_in)
+        & ~np.isnan(amount_out)
+        & has_timestamp
+    )
+    rows = np.flatnonzero(valid)
+    rows = rows[~pd.Series(keys[rows]).duplicated().to_numpy()]
+
+    oldest = None
+    if has_timestamp.any():
+        oldest = created_at[has_timestamp].min().astype("datetime64[us]").item()
+
+    codes, asset_ids = pd.factorize(np.concatenate([origins[rows], dests[rows]]))
+    amount_in, amount_out = amount_in[rows], amount_out[rows]
+    return PageBatch(
+        deposit_keys=keys[rows],
+        deposit_addresses=np.array(addresses, dtype=object)[rows],
+        statuses=np.array(statuses, dtype=object)[rows],
+        intent_hashes=np.array(hashes, dtype=object)[rows],
+        amount_in=amount_in,
+        amount_out=amount_out,
+        slippage=compute_slippage(amount_in, amount_out),
+        created_at=created_at[rows],
+        asset_ids=np.asarray(asset_ids, dtype=object),
+        origin_codes=codes[: len(rows)],
+        dest_codes=codes[len(rows):],
+        oldest=oldest,
+    )
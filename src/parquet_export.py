@@ -0,0 +1,186 @@
+"""Incremental export of bridge_transactions to day-partitioned Parquet files.
+
+Each day is one file under transactions/date=YYYY-MM-DD/, holding the fact
+rows joined with the symbol, chain and stablecoin flag of both tokens, plus a
+tokens.parquet snapshot of the dimension. A state file records the highest
+exported transaction id. Later runs rewrite only the days that received rows
+since then. Token symbols are copied into every file, so each run also
+compares the tokens table with the previous tokens.parquet and rewrites the
+days that use a token whose symbol, chain or stablecoin flag changed.
+"""
+import json
+import os
+import shutil
+from datetime import datetime, timedelta
+from pathlib import Path
+import pandas as pd
+from dotenv import load_dotenv
+from sqlalchemy import func, or_, select
+from sqlalchemy.orm import aliased
+from src.database import SessionLocal, BridgeTransaction, Token, engine
+from src.const import EXPORT_DIR, EXPORT_ID_OVERLAP, UNKNOWN_SYMBOL, NA_PLACEHOLDER
+
+try:
+    import pyarrow
+except ImportError:  # Optional dependency, only needed for the DuckDB query engine
+    pyarrow = None
+
+load_dotenv()
+
+STATE_FILE = "_export_state.json"
+TRANSACTIONS_DIR = "transactions"
+TOKENS_FILE = "tokens.parquet"
+PARTITION_FILE = "data.parquet"
+
+
+def get_export_dir() -> Path:
+    """Get the export root (EXPORT_DIR env var, or the const default)."""
+    return Path(os.getenv("EXPORT_DIR") or EXPORT_DIR)
+
+
+def _partition_path(root: Path, day: datetime) -> Path:
+    return root / TRANSACTIONS_DIR / f"date={day:%Y-%m-%d}" / PARTITION_FILE
+
+
+def _load_state(root: Path) -> dict:
+    path = root / STATE_FILE
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text())
+
+
+def _write_atomic(path: Path, write) -> None:
+    """Write through a temporary file so readers never see a partial file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _day_statement(day: datetime):
+    """Transactions created on day, joined with both tokens."""
+    token_in = aliased(Token, name="token_in")
+    token_out = aliased(Token, name="token_out")
+    return (
+        select(
+            BridgeTransaction.id,
+            BridgeTransaction.token_in_id,
+            BridgeTransaction.token_out_id,
+            BridgeTransaction.amount_in,
+            BridgeTransaction.amount_out,
+            BridgeTransaction.slippage,
+            BridgeTransaction.status,
+            BridgeTransaction.created_at,
+            func.coalesce(token_in.symbol, UNKNOWN_SYMBOL).label("source_token"),
+            func.coalesce(token_in.chain, NA_PLACEHOLDER).label("source_chain"),
+            func.coalesce(token_in.is_stablecoin, False).label("source_is_stablecoin"),
+            func.coalesce(token_out.symbol, UNKNOWN_SYMBOL).label("dest_token"),
+            func.coalesce(token_out.chain, NA_PLACEHOLDER).label("dest_chain"),
+            func.coalesce(token_out.is_stablecoin, False).label("dest_is_stablecoin"),
+        )
+        .outerjoin(token_in, BridgeTransaction.token_in_id == token_in.id)
+        .outerjoin(token_out, BridgeTransaction.token_out_id == token_out.id)
+        .where(
+            BridgeTransaction.created_at >= day,
+            BridgeTransaction.created_at < day + timedelta(days=1),
+        )
+        .order_by(BridgeTransaction.created_at)
+    )
+
+
+def _get_days(db, after_id: int | None = None, token_ids: set[int] | None = None) -> set[datetime]:
+    """Days with transactions, optionally only those with ids above after_id or using token_ids."""
+    day = func.date_trunc("day", BridgeTransaction.created_at)
+    query = db.query(day).distinct()
+    if after_id is not None:
+        query = query.filter(BridgeTransaction.id > after_id)
+    if token_ids is not None:
+        query = query.filter(or_(
+            BridgeTransaction.token_in_id.in_(token_ids),
+            BridgeTransaction.token_out_id.in_(token_ids),
+        ))
+    return {row[0] for row in query.all()}
+
+
+def get_relabeled_token_ids(previous: pd.DataFrame, current: pd.DataFrame) -> set[int]:
+    """Ids of tokens whose exported labels differ between two tokens.parquet snapshots.
+
+    Tokens new since the previous snapshot are left out: their rows are new too
+    and already picked up by id.
+    """
+    columns = ["symbol", "chain", "is_stablecoin"]
+    merged = previous.set_index("id")[columns].join(
+        current.set_index("id")[columns], how="inner", lsuffix="_old", rsuffix="_new"
+    )
+    changed = pd.Series(False, index=merged.index)
+    for column in columns:
+        old, new = merged[f"{column}_old"], merged[f"{column}_new"]
+        changed |= (old != new) & ~(old.isna() & new.isna())
+    return {int(token_id) for token_id in merged.index[changed]}
+
+
+def export_parquet(export_dir: str | None = None, full: bool = False) -> dict:
+    """Export new and changed days. Returns counts of days and rows written."""
+    if pyarrow is None:
+        raise RuntimeError("Parquet export requires the 'pyarrow' package")
+
+    root = Path(export_dir) if export_dir else get_export_dir()
+    state = _load_state(root)
+    db = SessionLocal()
+
+    try:
+        # Read before the day lists, so rows committed meanwhile are picked up next run
+        max_id = db.query(func.max(BridgeTransaction.id)).scalar() or 0
+        tokens_path = root / TOKENS_FILE
+        if max_id < state.get("max_id", 0) or not tokens_path.exists():
+            # The table was reset since the last export, or there is no previous export
+            full = True
+
+        tokens = pd.read_sql(
+            select(Token.id, Token.symbol, Token.chain, Token.address, Token.is_stablecoin),
+            engine,
+        )
+        relabeled = set()
+        if full:
+            days = _get_days(db)
+        else:
+            # Ids are assigned at insert but become visible at commit, so look a bit further back
+            days = _get_days(db, max(0, state.get("max_id", 0) - EXPORT_ID_OVERLAP))
+            relabeled = get_relabeled_token_ids(pd.read_parquet(tokens_path), tokens)
+            if relabeled:
+                days |= _get_days(db, token_ids=relabeled)
+        days = sorted(days)
+
+        rows = 0
+        for day in days:
+            df = pd.read_sql(_day_statement(day), engine)
+            path = _partition_path(root, day)
+            if df.empty:
+                path.unlink(missing_ok=True)
+                continue
+            _write_atomic(path, lambda tmp_path: df.to_parquet(tmp_path, index=False))
+            rows += len(df)
+
+        if full:
+            # Drop days that no longer have transactions, e.g. after a reset
+            keep = {_partition_path(root, day).parent for day in days}
+            for partition in (root / TRANSACTIONS_DIR).glob("date=*"):
+                if partition not in keep:
+                    shutil.rmtree(partition, ignore_errors=True)
+
+        # Written after the partitions, so an interrupted run compares against the old labels again
+        _write_atomic(tokens_path, lambda path: tokens.to_parquet(path, index=False))
+        _write_atomic(root / STATE_FILE, lambda path: path.write_text(json.dumps({
+            "max_id": max_id,
+            "exported_at": datetime.utcnow().isoformat(),
+        })))
+        return {
+            "days": len(days),
+            "rows": rows,
+            "full": full,
+            "max_id": max_id,
+            "relabeled_tokens": len(relabeled),
+        }
+
+    finally:
+        db.close()
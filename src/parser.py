@@ -1,11 +1,43 @@
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Iterable
 from src.database import Token
 from src.const import (
     CHAIN_ID_MAP,
     TOKEN_LOOKUP,
     UNKNOWN_SYMBOL,
+    PARSER_CACHE_SIZE,
 )
 
 
+@dataclass(frozen=True, slots=True)
+class ParsedAsset:
+    """Chain, address and symbol parsed from an asset ID. Immutable, so safe to share from the cache."""
+    chain: str | None
+    address: str | None
+    symbol: str | None
+
+
+UNKNOWN_ASSET = ParsedAsset(None, None, UNKNOWN_SYMBOL)
+
+# Active mappings: the const.py seeds until set_mappings installs the database copy
+_token_lookup = TOKEN_LOOKUP
+_chain_id_map = CHAIN_ID_MAP
+
+
+def set_mappings(token_lookup: dict, chain_id_map: dict) -> None:
+    """Swap in new (chain, address) -> symbol and chain id -> chain maps and drop memoized parses."""
+    global _token_lookup, _chain_id_map
+    _token_lookup = token_lookup
+    _chain_id_map = chain_id_map
+    clear_parser_cache()
+
+
+def get_mappings() -> tuple[dict, dict]:
+    """Get the active (token lookup, chain id map)."""
+    return _token_lookup, _chain_id_map
+
+
 def normalize_address(address: str | None) -> str:
     """Normalize address, converting native token markers to 'native'."""
     if not address or address == "11111111111111111111":
@@ -14,17 +46,17 @@ def normalize_address(address: str | None) -> str:
 
 
 def lookup_symbol(chain: str | None, address: str | None) -> str:
-    """Look up symbol from chain and address using TOKEN_LOOKUP."""
+    """Look up symbol from chain and address using the active token lookup."""
     if not chain:
         return UNKNOWN_SYMBOL
 
     chain_upper = chain.upper()
     address_lower = normalize_address(address).lower()
 
-    return TOKEN_LOOKUP.get((chain_upper, address_lower), UNKNOWN_SYMBOL)
+    return _token_lookup.get((chain_upper, address_lower), UNKNOWN_SYMBOL)
 
 
-def parse_nep141_asset(asset_id: str) -> dict:
+def parse_nep141_asset(asset_id: str) -> ParsedAsset:
     """
     Parse nep141 asset IDs.
 
@@ -48,10 +80,10 @@ def parse_nep141_asset(asset_id: str) -> dict:
         address = content
 
     symbol = lookup_symbol(chain, address)
-    return {"chain": chain, "address": address, "symbol": symbol}
+    return ParsedAsset(chain, address, symbol)
 
 
-def parse_nep245_asset(asset_id: str) -> dict:
+def parse_nep245_asset(asset_id: str) -> ParsedAsset:
     """
     Parse nep245 (Omni protocol) asset IDs.
 
@@ -61,25 +93,25 @@ def parse_nep245_asset(asset_id: str) -> dict:
     # Find the last colon which separates the chain_id_address part
     last_colon = asset_id.rfind(":")
     if last_colon == -1:
-        return {"chain": None, "address": None, "symbol": UNKNOWN_SYMBOL}
+        return UNKNOWN_ASSET
 
     chain_id_address = asset_id[last_colon + 1:]
 
     if "_" not in chain_id_address:
-        return {"chain": None, "address": None, "symbol": UNKNOWN_SYMBOL}
+        return UNKNOWN_ASSET
 
     chain_id, address = chain_id_address.split("_", 1)
-    chain = CHAIN_ID_MAP.get(chain_id)
+    chain = _chain_id_map.get(chain_id)
 
     if not chain:
-        return {"chain": None, "address": address, "symbol": UNKNOWN_SYMBOL}
+        return ParsedAsset(None, address, UNKNOWN_SYMBOL)
 
     address = normalize_address(address)
     symbol = lookup_symbol(chain, address)
-    return {"chain": chain, "address": address, "symbol": symbol}
+    return ParsedAsset(chain, address, symbol)
 
 
-def parse_1cs_v1_asset(asset_id: str) -> dict:
+def parse_1cs_v1_asset(asset_id: str) -> ParsedAsset:
     """
     Parse 1cs_v1 (cross-chain swap) asset IDs.
 
@@ -91,17 +123,26 @@ def parse_1cs_v1_asset(asset_id: str) -> dict:
     """
     parts = asset_id.split(":")
     if len(parts) < 4:
-        return {"chain": None, "address": None, "symbol": UNKNOWN_SYMBOL}
+        return UNKNOWN_ASSET
 
     chain = parts[1].upper()
     # token_type = parts[2]  # spl, erc20, nep141 etc. (not used for lookup)
     address = ":".join(parts[3:])  # Rejoin in case address contains colons
 
     symbol = lookup_symbol(chain, address)
-    return {"chain": chain, "address": address, "symbol": symbol}
+    return ParsedAsset(chain, address, symbol)
 
 
-def parse_asset_id(asset_id: str) -> dict:
+# Protocol prefix (text before the first colon) -> parser
+PROTOCOL_PARSERS = {
+    "nep141": parse_nep141_asset,
+    "nep245": parse_nep245_asset,
+    "1cs_v1": parse_1cs_v1_asset,
+}
+
+
+@lru_cache(maxsize=PARSER_CACHE_SIZE)
+def parse_asset_id(asset_id: str) -> ParsedAsset:
     """
     Parse asset ID and return chain, address, and symbol.
 
@@ -109,19 +150,28 @@ def parse_asset_id(asset_id: str) -> dict:
     - nep141: NEAR tokens (OMFT and native)
     - nep245: Omni protocol tokens
     - 1cs_v1: Cross-chain swap tokens
+
+    Results are memoized: the same few hundred asset IDs recur on every page.
     """
     if not asset_id:
-        return {"chain": None, "address": None, "symbol": None}
-
-    if asset_id.startswith("nep245:"):
-        return parse_nep245_asset(asset_id)
-    elif asset_id.startswith("1cs_v1:"):
-        return parse_1cs_v1_asset(asset_id)
-    elif asset_id.startswith("nep141:"):
-        return parse_nep141_asset(asset_id)
-    else:
+        return ParsedAsset(None, None, None)
+
+    protocol, separator, _ = asset_id.partition(":")
+    parser = PROTOCOL_PARSERS.get(protocol) if separator else None
+    if parser is None:
         # Unknown protocol
-        return {"chain": None, "address": None, "symbol": UNKNOWN_SYMBOL}
+        return UNKNOWN_ASSET
+    return parser(asset_id)
+
+
+def parse_asset_ids(asset_ids: Iterable[str]) -> dict[str, ParsedAsset]:
+    """Parse many asset IDs at once, each distinct ID only once. Returns asset_id -> ParsedAsset."""
+    return {asset_id: parse_asset_id(asset_id) for asset_id in set(asset_ids)}
+
+
+def clear_parser_cache() -> None:
+    """Forget memoized parses, e.g. after the token mappings change."""
+    parse_asset_id.cache_clear()
 
 
 def get_or_create_token(db, asset_id: str) -> Token:
@@ -131,10 +181,10 @@ def get_or_create_token(db, asset_id: str) -> Token:
     if not token:
         parsed = parse_asset_id(asset_id)
         token = Token(
-            symbol=parsed["symbol"] or UNKNOWN_SYMBOL,
+            symbol=parsed.symbol or UNKNOWN_SYMBOL,
             asset_id=asset_id,
-            chain=parsed["chain"],
-            address=parsed["address"],
+            chain=parsed.chain,
+            address=parsed.address,
         )
         db.add(token)
         db.flush()
@@ -0,0 +1,49 @@
+"""Analytical query functions of the configured engine.
+
+QUERY_ENGINE=postgres (default) queries the database through data_service.
+QUERY_ENGINE=duckdb answers the same functions from the Parquet export via
+duckdb_service, keeping heavy analysis off the production database.
+"""
+import os
+from dotenv import load_dotenv
+from src.const import QUERY_ENGINE as DEFAULT_QUERY_ENGINE
+
+load_dotenv()
+
+QUERY_ENGINE = (os.getenv("QUERY_ENGINE") or DEFAULT_QUERY_ENGINE).lower()
+
+if QUERY_ENGINE == "duckdb":
+    from src.duckdb_service import require_duckdb
+
+    require_duckdb()
+    from src.duckdb_service import (
+        get_available_symbols,
+        get_earliest_transaction_date,
+        load_slippage_matrix,
+        get_transaction_counts,
+        get_volume_matrix,
+        get_routes_data,
+        get_routes_summary,
+        get_overall_stats,
+        get_token_stats,
+        get_token_daily_stats,
+        get_route_daily_stats,
+        get_route_slippage_percentile,
+    )
+elif QUERY_ENGINE == "postgres":
+    from src.data_service import (
+        get_available_symbols,
+        get_earliest_transaction_date,
+        load_slippage_matrix,
+        get_transaction_counts,
+        get_volume_matrix,
+        get_routes_data,
+        get_routes_summary,
+        get_overall_stats,
+        get_token_stats,
+        get_token_daily_stats,
+        get_route_daily_stats,
+        get_route_slippage_percentile,
+    )
+else:
+    raise ValueError(f"Unknown QUERY_ENGINE {QUERY_ENGINE!r}, expected postgres or duckdb")
@@ -0,0 +1,129 @@
+"""Process-wide asset_id -> token id cache for the ingestion path.
+
+After warm-up nearly every asset ID on a page is already known, so resolving
+token ids needs no queries. Unknown IDs are created with
+INSERT ... ON CONFLICT (asset_id) DO NOTHING RETURNING, which is safe when
+several collectors discover the same token at once. Rows that conflicted
+were committed by someone else and are read back with a plain SELECT.
+
+Ids created in a session only become visible to other sessions once it
+commits. If the session rolls back they are forgotten, so the cache never
+hands out ids of tokens that were never committed.
+"""
+import threading
+from sqlalchemy import event, select
+from sqlalchemy.dialects.postgresql import insert
+from src.database import SessionLocal, Token, is_stablecoin_symbol
+from src.parser import parse_asset_ids
+from src.mapping_service import get_mapping_registry
+from src.metrics import TOKEN_CACHE_HITS, TOKEN_CACHE_MISSES
+from src.const import UNKNOWN_SYMBOL
+
+PENDING_KEY = "pending_token_ids"
+
+
+class TokenIdCache:
+    """Thread-safe asset_id -> token id map shared by all sessions of a process."""
+
+    def __init__(self):
+        self._ids = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def preload(self, db) -> int:
+        """Load every known token id. Returns the number of cached ids."""
+        rows = db.execute(select(Token.asset_id, Token.id)).all()
+        with self._lock:
+            self._ids.update(rows)
+            return len(self._ids)
+
+    def clear(self) -> None:
+        """Forget all ids, e.g. after the tokens table was truncated."""
+        with self._lock:
+            self._ids.clear()
+
+    def promote(self, ids: dict[str, int]) -> None:
+        with self._lock:
+            self._ids.update(ids)
+
+    def get_ids(self, db, asset_ids: set[str]) -> dict[str, int]:
+        """Resolve asset ids to token ids, creating missing tokens in db's transaction."""
+        pending = db.info.setdefault(PENDING_KEY, {})
+        resolved = {}
+        missing = set()
+        for asset_id in asset_ids:
+            token_id = self._ids.get(asset_id) or pending.get(asset_id)
+            if token_id is None:
+                missing.add(asset_id)
+            else:
+                resolved[asset_id] = token_id
+
+        TOKEN_CACHE_HITS.inc(len(resolved))
+        if not missing:
+            return resolved
+
+        TOKEN_CACHE_MISSES.inc(len(missing))
+        # New tokens get their symbol from the parser, so pick up mapping changes first
+        get_mapping_registry().ensure_current(db)
+        created, existing = _insert_tokens(db, missing)
+        pending.update(created)
+        self.promote(existing)
+        resolved.update(created)
+        resolved.update(existing)
+        return resolved
+
+
+def _insert_tokens(db, asset_ids: set[str]) -> tuple[dict[str, int], dict[str, int]]:
+    """Insert tokens for asset_ids. Returns (ids created here, ids that already existed)."""
+    rows = []
+    for asset_id, parsed in parse_asset_ids(asset_ids).items():
+        symbol = parsed.symbol or UNKNOWN_SYMBOL
+        rows.append({
+            "symbol": symbol,
+            "asset_id": asset_id,
+            "chain": parsed.chain,
+            "address": parsed.address,
+            # Core inserts skip the ORM hook that normally sets this
+            "is_stablecoin": is_stablecoin_symbol(symbol),
+        })
+
+    statement = (
+        insert(Token)
+        .values(rows)
+        .on_conflict_do_nothing(index_elements=["asset_id"])
+        .returning(Token.asset_id, Token.id)
+    )
+    created = dict(db.execute(statement).all())
+
+    existing = {}
+    conflicted = asset_ids - created.keys()
+    if conflicted:
+        existing = dict(
+            db.execute(select(Token.asset_id, Token.id).where(Token.asset_id.in_(conflicted))).all()
+        )
+    return created, existing
+
+
+_cache: TokenIdCache | None = None
+
+
+def get_token_id_cache() -> TokenIdCache:
+    """Get the process-wide token id cache."""
+    global _cache
+    if _cache is None:
+        _cache = TokenIdCache()
+    return _cache
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _promote_pending_ids(session):
+    pending = session.info.pop(PENDING_KEY, None)
+    if pending:
+        get_token_id_cache().promote(pending)
+
+
+@event.listens_for(SessionLocal, "after_soft_rollback")
+def _discard_pending_ids(session, previous_transaction):
+    session.info.pop(PENDING_KEY, None)
@@ -1,20 +1,28 @@
-from datetime import datetime
-from src.database import BridgeTransaction, Token
-from src.parser import parse_asset_id
+from datetime import datetime, timedelta, timezone
+import numpy as np
+from sqlalchemy.dialects.postgresql import insert
+from src.database import BridgeTransaction
+from src.bloom import RecentKeysFilter
+from src.page_decoder import PageBatch, decode_page
+from src.token_cache import get_token_id_cache
+from src.metrics import ROWS_PARSED, ROWS_INSERTED, ROWS_DEDUPLICATED
 from src.const import (
-    FIELD_DEPOSIT_KEY,
-    FIELD_ORIGIN_ASSET,
-    FIELD_DEST_ASSET,
-    FIELD_AMOUNT_IN,
-    FIELD_AMOUNT_OUT,
-    FIELD_CREATED_AT,
-    FIELD_DEPOSIT_ADDRESS,
-    FIELD_STATUS,
-    FIELD_INTENT_HASHES,
-    UNKNOWN_SYMBOL,
+    RECENT_KEYS_CAPACITY,
+    RECENT_KEYS_ERROR_RATE,
+    RECENT_KEYS_HOURS,
 )
 
 
+def get_newest_transaction_timestamp(db) -> datetime | None:
+    """Get the timestamp of the newest transaction."""
+    newest = (
+        db.query(BridgeTransaction.created_at)
+        .order_by(BridgeTransaction.created_at.desc())
+        .first()
+    )
+    return newest[0] if newest else None
+
+
 def get_oldest_transaction_timestamp(db) -> datetime | None:
     """Get the timestamp of the oldest transaction.
 
@@ -29,11 +37,12 @@ def get_oldest_transaction_timestamp(db) -> datetime | None:
     return oldest[0] if oldest else None
 
 
-def calculate_slippage(amount_in: float, amount_out: float) -> float:
-    """Calculate slippage percentage."""
-    if amount_in > 0:
-        return ((amount_in - amount_out) / amount_in) * 100
-    return 0
+def parse_timestamp(value: str) -> datetime:
+    """Parse an API ISO-8601 timestamp into a naive UTC datetime."""
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
 
 
 def _get_existing_deposit_keys(db, deposit_keys: set[str]) -> set[str]:
@@ -47,123 +56,100 @@ def _get_existing_deposit_keys(db, deposit_keys: set[str]) -> set[str]:
     return {row[0] for row in existing}
 
 
-def _get_or_create_tokens_bulk(db, asset_ids: set[str]) -> dict[str, Token]:
-    """Bulk get or create tokens. Returns a dict mapping asset_id to Token."""
-    if not asset_ids:
-        return {}
-    
-    # Fetch all existing tokens in one query
-    existing_tokens = db.query(Token).filter(Token.asset_id.in_(asset_ids)).all()
-    token_cache = {token.asset_id: token for token in existing_tokens}
-    
-    # Find missing tokens and create them
-    missing_asset_ids = asset_ids - set(token_cache.keys())
-    if missing_asset_ids:
-        new_tokens = []
-        for asset_id in missing_asset_ids:
-            parsed = parse_asset_id(asset_id)
-            token = Token(
-                symbol=parsed["symbol"] or UNKNOWN_SYMBOL,
-                asset_id=asset_id,
-                chain=parsed["chain"],
-                address=parsed["address"],
-            )
-            new_tokens.append(token)
-        
-        # Bulk insert new tokens
-        db.add_all(new_tokens)
-        db.flush()  # Get IDs assigned
-        
-        # Add to cache
-        for token in new_tokens:
-            token_cache[token.asset_id] = token
-    
-    return token_cache
+_recent_keys: RecentKeysFilter | None = None
 
 
-def store_transactions(db, transactions: list) -> int:
-    """Store transactions in database using bulk operations. Returns count of stored transactions."""
-    if not transactions:
-        return 0
-    
-    # Step 1: Extract all deposit keys and filter out empty ones
-    tx_with_keys = []
-    for tx in transactions:
-        deposit_key = tx.get(FIELD_DEPOSIT_KEY, "")
-        if deposit_key:
-            tx_with_keys.append((tx, deposit_key))
-    
-    if not tx_with_keys:
-        return 0
-    
-    # Step 2: Batch check for existing transactions (single query)
-    all_deposit_keys = {dk for _, dk in tx_with_keys}
-    existing_keys = _get_existing_deposit_keys(db, all_deposit_keys)
-    
-    # Filter out already existing transactions
-    new_transactions = [(tx, dk) for tx, dk in tx_with_keys if dk not in existing_keys]
-    
-    if not new_transactions:
+def get_recent_keys() -> RecentKeysFilter:
+    """Get the process-wide Bloom filter of recently stored deposit keys."""
+    global _recent_keys
+    if _recent_keys is None:
+        _recent_keys = RecentKeysFilter(RECENT_KEYS_CAPACITY, RECENT_KEYS_ERROR_RATE)
+    return _recent_keys
+
+
+def preload_recent_keys(db, hours: int = RECENT_KEYS_HOURS) -> int:
+    """Load deposit keys of transactions created in the last hours. Returns the number loaded."""
+    since = datetime.utcnow() - timedelta(hours=hours)
+    rows = (
+        db.query(BridgeTransaction.deposit_address_and_memo)
+        .filter(BridgeTransaction.created_at >= since)
+        .yield_per(10000)
+    )
+    keys = [row[0] for row in rows]
+    get_recent_keys().update(keys)
+    return len(keys)
+
+
+def is_page_known(db, batch: PageBatch) -> bool:
+    """Check if every valid transaction on the page is already stored.
+
+    The Bloom filter answers "no" without a query for any page with a new
+    deposit key; a "yes" is confirmed with a single existence query.
+    """
+    deposit_keys = set(batch.deposit_keys)
+    if not deposit_keys or not get_recent_keys().contains_all(deposit_keys):
+        return False
+    return len(_get_existing_deposit_keys(db, deposit_keys)) == len(deposit_keys)
+
+
+def store_batch(db, batch: PageBatch, commit: bool = True) -> int:
+    """Bulk insert a decoded page. Returns the number of new transactions.
+
+    Rows go straight from the batch's columns into one multi-row
+    INSERT ... ON CONFLICT (deposit_address_and_memo) DO NOTHING, so
+    duplicates are skipped by the database instead of a separate lookup.
+    With commit=False the rows are only flushed, so the caller can commit them
+    in the same transaction as related bookkeeping (e.g. sync checkpoints).
+    """
+    if not len(batch):
         return 0
-    
-    # Step 3: Collect all unique asset IDs needed
-    asset_ids = set()
-    valid_transactions = []
-    for tx, deposit_key in new_transactions:
-        origin_asset = tx.get(FIELD_ORIGIN_ASSET, "")
-        dest_asset = tx.get(FIELD_DEST_ASSET, "")
-        if origin_asset and dest_asset:
-            asset_ids.add(origin_asset)
-            asset_ids.add(dest_asset)
-            valid_transactions.append((tx, deposit_key))
-    
-    if not valid_transactions:
+
+    # Keys of a page that later rolls back only cost an extra confirming query
+    get_recent_keys().update(batch.deposit_keys)
+
+    # Resolve each distinct asset id once, then map the encoded columns to token ids
+    token_ids = get_token_id_cache().get_ids(db, set(batch.asset_ids))
+    ids = np.array([token_ids.get(asset_id, 0) for asset_id in batch.asset_ids], dtype=np.int64)
+    token_in_ids = ids[batch.origin_codes]
+    token_out_ids = ids[batch.dest_codes]
+    resolved = (token_in_ids > 0) & (token_out_ids > 0)
+    if not resolved.any():
         return 0
-    
-    # Step 4: Bulk get/create all tokens (single query + bulk insert)
-    token_cache = _get_or_create_tokens_bulk(db, asset_ids)
-    
-    # Step 5: Build all BridgeTransaction objects
-    bridge_transactions = []
-    for tx, deposit_key in valid_transactions:
-        try:
-            origin_asset = tx.get(FIELD_ORIGIN_ASSET, "")
-            dest_asset = tx.get(FIELD_DEST_ASSET, "")
-            
-            token_in = token_cache.get(origin_asset)
-            token_out = token_cache.get(dest_asset)
-            
-            if not token_in or not token_out:
-                continue
-            
-            amount_in = float(tx.get(FIELD_AMOUNT_IN, 0))
-            amount_out = float(tx.get(FIELD_AMOUNT_OUT, 0))
-            slippage = calculate_slippage(amount_in, amount_out)
-            
-            created_at = datetime.fromisoformat(
-                tx.get(FIELD_CREATED_AT, "").replace("Z", "+00:00")
-            )
-            
-            bridge_tx = BridgeTransaction(
-                token_in_id=token_in.id,
-                token_out_id=token_out.id,
-                amount_in=amount_in,
-                amount_out=amount_out,
-                slippage=slippage,
-                deposit_address=tx.get(FIELD_DEPOSIT_ADDRESS, ""),
-                deposit_address_and_memo=deposit_key,
-                status=tx.get(FIELD_STATUS, ""),
-                intent_hash=tx.get(FIELD_INTENT_HASHES, ""),
-                created_at=created_at,
-            )
-            bridge_transactions.append(bridge_tx)
-        except Exception as e:
-            print(f"  Error parsing transaction: {e}")
-            continue
-    
-    # Step 6: Bulk insert all transactions
-    if bridge_transactions:
-        db.add_all(bridge_transactions)
+
+    columns = {
+        "token_in_id": token_in_ids[resolved].tolist(),
+        "token_out_id": token_out_ids[resolved].tolist(),
+        "amount_in": batch.amount_in[resolved].tolist(),
+        "amount_out": batch.amount_out[resolved].tolist(),
+        "slippage": batch.slippage[resolved].tolist(),
+        "deposit_address": batch.deposit_addresses[resolved].tolist(),
+        "deposit_address_and_memo": batch.deposit_keys[resolved].tolist(),
+        "status": batch.statuses[resolved].tolist(),
+        "intent_hash": batch.intent_hashes[resolved].tolist(),
+        "created_at": batch.created_at[resolved].astype("datetime64[us]").tolist(),
+    }
+    rows = [dict(zip(columns, values)) for values in zip(*columns.values())]
+
+    statement = (
+        insert(BridgeTransaction)
+        .on_conflict_do_nothing(index_elements=["deposit_address_and_memo"])
+        .returning(BridgeTransaction.id)
+    )
+    inserted = len(db.execute(statement, rows).all())
+    ROWS_INSERTED.inc(inserted)
+    ROWS_DEDUPLICATED.inc(len(rows) - inserted)
+
+    if commit:
         db.commit()
-    
-    return len(bridge_transactions)
+    else:
+        db.flush()
+    return inserted
+
+
+def store_transactions(db, transactions: list, commit: bool = True) -> int:
+    """Store raw API transactions. Returns count of stored transactions."""
+    if not transactions:
+        return 0
+
+    ROWS_PARSED.inc(len(transactions))
+    return store_batch(db, decode_page(transactions), commit=commit)
@@ -4,9 +4,10 @@ from datetime import date, timedelta
 from src.const import (
     MATRIX_TABLE_HEIGHT,
     ROUTES_TABLE_HEIGHT,
+    ROUTES_SORT_OPTIONS,
     DECIMAL_PLACES,
     NA_PLACEHOLDER,
-    STABLECOINS,
+    STABLECOIN_FILTERS,
     TRANSACTION_SIZE_FILTERS,
     USDC_ZERO_FEE_ROUTES,
     USDT_NATIVE_ZERO_FEE_ROUTES,
@@ -296,10 +297,9 @@ def render_percentile_slider(key: str) -> int | str:
 
 def render_stablecoin_filter(key: str) -> str:
     """Render stablecoin filter selector."""
-    options = ["All Routes", "Stablecoins Only", "Include Stablecoins"]
     return st.selectbox(
         "Route Filter:",
-        options,
+        STABLECOIN_FILTERS,
         key=key,
         help="All Routes: Show all routes. Stablecoins Only: Both tokens are stablecoins. Include Stablecoins: At least one token is a stablecoin.",
     )
@@ -400,60 +400,72 @@ def render_volume_matrix(matrix: pd.DataFrame) -> None:
     )
 
 
-def _is_stablecoin(symbol: str) -> bool:
-    """Check if a symbol is a stablecoin (case-insensitive)."""
-    return symbol.upper() in STABLECOINS
+def render_routes_stats(summary: dict) -> None:
+    """Render routes statistics metrics from a get_routes_summary result."""
+    col1, col2, col3, col4 = st.columns(4)
 
+    with col1:
+        st.metric("Total Routes", f"{summary['routes']:,}")
 
-def filter_routes_by_stablecoin(df: pd.DataFrame, filter_type: str) -> pd.DataFrame:
-    """Filter routes DataFrame based on stablecoin filter type."""
-    if df.empty or filter_type == "All Routes":
-        return df
+    with col2:
+        st.metric("Total Transactions", f"{summary['transactions']:,}")
 
-    df = df.copy()
+    with col3:
+        avg_slippage = summary["avg_slippage"]
+        if avg_slippage is None:
+            st.metric("Average Slippage", "N/A")
+        else:
+            st.metric("Average Slippage", f"{avg_slippage:.{DECIMAL_PLACES}f}%")
+
+    with col4:
+        st.metric("Total Volume", f"${summary['volume']:,.0f}")
 
-    if filter_type == "Stablecoins Only":
-        # Both source and dest are stablecoins
-        mask = df["Source Token"].apply(_is_stablecoin) & df["Dest Token"].apply(_is_stablecoin)
-    elif filter_type == "Include Stablecoins":
-        # At least one is a stablecoin
-        mask = df["Source Token"].apply(_is_stablecoin) | df["Dest Token"].apply(_is_stablecoin)
-    else:
-        return df
 
-    return df[mask].reset_index(drop=True)
+def render_routes_sort_selector(key: str) -> str:
+    """Render the routes sort column selector."""
+    return st.selectbox("Sort By:", ROUTES_SORT_OPTIONS, key=key, help="Routes are sorted descending")
 
 
-def render_routes_stats(df: pd.DataFrame) -> None:
-    """Render routes statistics metrics."""
+def get_route_cursor(df: pd.DataFrame, order_by: str = "Volume") -> tuple | None:
+    """Keyset cursor after the last route of a get_routes_data page, or None if empty."""
     if df.empty:
-        col1, col2, col3, col4 = st.columns(4)
-        with col1:
-            st.metric("Total Routes", 0)
-        with col2:
-            st.metric("Total Transactions", 0)
-        with col3:
-            st.metric("Average Slippage", "N/A")
-        with col4:
-            st.metric("Total Volume", "$0")
-        return
+        return None
+    last = df.iloc[-1]
+    return (float(last[order_by]), int(last["Token In ID"]), int(last["Token Out ID"]))
 
-    col1, col2, col3, col4 = st.columns(4)
 
-    with col1:
-        st.metric("Total Routes", len(df))
+def get_page_cursor(key: str, filters: tuple) -> tuple[object, int]:
+    """Get (cursor, page index) for a keyset-paginated table.
 
-    with col2:
-        total_transactions = df["Transactions"].sum()
-        st.metric("Total Transactions", f"{total_transactions:,}")
+    Cursors of the pages visited so far are kept in session state; any change
+    to `filters` starts over from the first page.
+    """
+    if st.session_state.get(f"{key}_filters") != filters:
+        st.session_state[f"{key}_filters"] = filters
+        st.session_state[f"{key}_cursors"] = [None]
+    cursors = st.session_state[f"{key}_cursors"]
+    return cursors[-1], len(cursors) - 1
 
-    with col3:
-        avg_slippage = df["Slippage %"].mean()
-        st.metric("Average Slippage", f"{avg_slippage:.{DECIMAL_PLACES}f}%")
 
-    with col4:
-        total_volume = df["Volume"].sum()
-        st.metric("Total Volume", f"${total_volume:,.0f}")
+def render_pager(key: str, page_index: int, total_rows: int, page_size: int, next_cursor) -> None:
+    """Render Previous/Next buttons for a table paginated with get_page_cursor."""
+    cursors = st.session_state[f"{key}_cursors"]
+    total_pages = max(1, -(-total_rows // page_size))
+    has_next = next_cursor is not None and page_index + 1 < total_pages
+
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col1:
+        st.button("← Previous", key=f"{key}_prev", disabled=page_index == 0, on_click=cursors.pop)
+    with col2:
+        st.caption(f"Page {page_index + 1} of {total_pages:,} ({total_rows:,} routes)")
+    with col3:
+        st.button(
+            "Next →",
+            key=f"{key}_next",
+            disabled=not has_next,
+            on_click=cursors.append,
+            args=(next_cursor,),
+        )
 
 
 def _normalize_token_symbol(symbol: str) -> str:
@@ -471,51 +483,41 @@ def _normalize_token_symbol(symbol: str) -> str:
     return upper
 
 
-def _tokens_match_for_zero_fee(source_token: str, dest_token: str) -> bool:
-    """Check if source and destination tokens are the same (for zero-fee eligibility).
-    
-    Zero-fee bridging requires the same token on both ends (e.g., USDC -> USDC).
-    """
-    normalized_source = _normalize_token_symbol(source_token)
-    normalized_dest = _normalize_token_symbol(dest_token)
-    return normalized_source == normalized_dest
+# =============================================================================
+# ZERO-FEE ROUTE INDEX
+# Built once at import: (normalized token, canonical source chain, canonical
+# destination chain) for every published zero-fee route
+# =============================================================================
+ZERO_FEE_ROUTE_INDEX = frozenset(
+    [("USDC", src, dst) for src, dst in USDC_ZERO_FEE_ROUTES]
+    + [("USDT", src, dst) for src, dst in USDT_NATIVE_ZERO_FEE_ROUTES]
+    + [("USDT", src, dst) for src, dst in USDT0_ZERO_FEE_ROUTES]
+)
 
 
-def _get_zero_fee_status(source_chain: str, dest_chain: str, source_token: str, dest_token: str) -> str:
-    """Check if a zero-fee route exists for the given chain pair and tokens.
+def _map_unique(values: pd.Series, fn) -> pd.Series:
+    """Apply fn once per distinct value instead of once per row."""
+    return values.map({value: fn(value) for value in values.unique()})
 
-    Returns:
-        - "✓" if zero-fee route exists
-        - "" if no zero-fee route
-        
-    Note: Zero-fee bridging requires the same token on both source and destination.
-    """
-    # First check if tokens match - zero-fee only applies to same-token transfers
-    if not _tokens_match_for_zero_fee(source_token, dest_token):
-        return ""
-    
-    token_upper = _normalize_token_symbol(source_token)
 
-    # Build lookup sets for each token type
-    usdc_routes = set(USDC_ZERO_FEE_ROUTES)
-    usdt_native_routes = set(USDT_NATIVE_ZERO_FEE_ROUTES)
-    usdt0_routes = set(USDT0_ZERO_FEE_ROUTES)
+def get_zero_fee_statuses(df: pd.DataFrame) -> pd.Series:
+    """Zero Fee column for a routes DataFrame: "✓" where a zero-fee route exists, else "".
 
-    # Normalize chain names from database format to canonical format
-    normalized_source = normalize_chain_name(source_chain)
-    normalized_dest = normalize_chain_name(dest_chain)
-    route_pair = (normalized_source, normalized_dest)
+    Zero-fee bridging needs the same token on both ends. Tokens and chains are
+    normalized once per distinct value, then every row's (token, source chain,
+    dest chain) key is matched against ZERO_FEE_ROUTE_INDEX.
+    """
+    if df.empty:
+        return pd.Series("", index=df.index, dtype=object)
 
-    # Check based on token type
-    if token_upper == "USDC":
-        if route_pair in usdc_routes:
-            return "✓"
-    elif token_upper == "USDT":
-        # Check both USDT native mesh and USDT0 routes
-        if route_pair in usdt_native_routes or route_pair in usdt0_routes:
-            return "✓"
+    source_token = _map_unique(df["Source Token"], _normalize_token_symbol)
+    dest_token = _map_unique(df["Dest Token"], _normalize_token_symbol)
+    source_chain = _map_unique(df["Source Chain"], normalize_chain_name)
+    dest_chain = _map_unique(df["Dest Chain"], normalize_chain_name)
 
-    return ""
+    keys = pd.MultiIndex.from_arrays([source_token, source_chain, dest_chain])
+    is_zero_fee = keys.isin(ZERO_FEE_ROUTE_INDEX) & (source_token == dest_token).to_numpy()
+    return pd.Series(is_zero_fee, index=df.index).map({True: "✓", False: ""})
 
 
 def render_routes_table_with_selection(df: pd.DataFrame, key: str) -> dict | None:
@@ -539,15 +541,7 @@ def render_routes_table_with_selection(df: pd.DataFrame, key: str) -> dict | Non
     )
 
     # Add Zero Fee column - check if tokens match and route exists
-    display_df["Zero Fee"] = display_df.apply(
-        lambda row: _get_zero_fee_status(
-            row["Source Chain"],
-            row["Dest Chain"],
-            row["Source Token"],
-            row["Dest Token"]
-        ),
-        axis=1,
-    )
+    display_df["Zero Fee"] = get_zero_fee_statuses(display_df)
 
     # Columns to display (exclude the raw token/chain columns)
     display_columns = ["Route", "Zero Fee", "Volume", "Slippage %", "Transactions"]
@@ -732,3 +726,32 @@ def render_zero_fee_matrix(
         st.markdown("- ✓ = Zero-fee bridging available")
         st.markdown("- Empty = Route not available")
         st.markdown(f"- Total routes: **{len(routes)}**")
+
+
+def render_query_table(df: pd.DataFrame, key: str) -> int | None:
+    """Render a table of recorded SQL statements. Returns the selected row index."""
+    display_df = df.copy()
+    display_df["statement"] = display_df["statement"].str.replace(r"\s+", " ", regex=True)
+    if "parameters" in display_df.columns:
+        display_df["parameters"] = display_df["parameters"].astype(str)
+
+    event = st.dataframe(
+        display_df,
+        use_container_width=True,
+        hide_index=True,
+        selection_mode="single-row",
+        on_select="rerun",
+        key=key,
+        column_config={
+            "statement": st.column_config.TextColumn("Statement", width="large"),
+            "duration_ms": st.column_config.NumberColumn("Duration", format="%.1f ms"),
+            "total_ms": st.column_config.NumberColumn("Total", format="%.1f ms"),
+            "avg_ms": st.column_config.NumberColumn("Avg", format="%.1f ms"),
+            "max_ms": st.column_config.NumberColumn("Max", format="%.1f ms"),
+            "avg_rows": st.column_config.NumberColumn("Avg Rows", format="%.0f"),
+        },
+    )
+
+    if event and event.selection and event.selection.rows:
+        return event.selection.rows[0]
+    return None
@@ -13,13 +13,18 @@ from src.ui.components import (
     render_volume_matrix,
     render_routes_table_with_selection,
     render_routes_stats,
+    render_routes_sort_selector,
+    get_page_cursor,
+    get_route_cursor,
+    render_pager,
     render_daily_chart,
     render_route_daily_chart,
     get_percentile_label,
-    filter_routes_by_stablecoin,
     render_zero_fee_matrix,
+    render_query_table,
 )
 from src.const import (
+    ROUTES_PAGE_SIZE,
     USDC_ZERO_FEE_ROUTES,
     USDT_NATIVE_ZERO_FEE_ROUTES,
     USDT0_ZERO_FEE_ROUTES,
@@ -56,10 +61,6 @@ def render_same_token_tab(
     st.subheader("Time Period")
     start_date, end_date = render_date_range_selector("period_tab1", earliest_date)
 
-    # Row 3: Percentile slider
-    percentile_value = render_percentile_slider("percentile_tab1")
-    percentile_label = get_percentile_label(percentile_value)
-
     st.markdown("---")
 
     token_stats = get_token_stats_fn(selected_symbol, start_date, end_date)
@@ -73,28 +74,69 @@ def render_same_token_tab(
 
     st.markdown("---")
 
+    render_slippage_matrix_panel(selected_symbol, start_date, end_date, load_slippage_matrix_fn)
+
+    st.markdown("---")
+
+    render_matrix_sub_tabs_panel(
+        selected_symbol, start_date, end_date, get_transaction_counts_fn, get_volume_matrix_fn
+    )
+
+
+@st.fragment
+def render_slippage_matrix_panel(
+    selected_symbol: str,
+    start_date: date,
+    end_date: date,
+    load_slippage_matrix_fn,
+) -> None:
+    """Render the slippage matrix with its own percentile slider.
+
+    Runs as a fragment, so moving the slider only recomputes this matrix.
+    """
+    percentile_value = render_percentile_slider("percentile_tab1")
+    percentile_label = get_percentile_label(percentile_value)
+
     st.subheader(f"Slippage Matrix - {percentile_label}")
     slippage_matrix = load_slippage_matrix_fn(
         selected_symbol, start_date, end_date, percentile_value
     )
     render_slippage_matrix(slippage_matrix, percentile_label)
 
-    st.markdown("---")
-
-    sub_tab1, sub_tab2 = st.tabs(["Transaction Counts", "Volume"])
 
-    with sub_tab1:
-        tx_counts = get_transaction_counts_fn(selected_symbol, start_date, end_date)
-        render_transaction_counts_matrix(tx_counts)
+@st.fragment
+def render_matrix_sub_tabs_panel(
+    selected_symbol: str,
+    start_date: date,
+    end_date: date,
+    get_transaction_counts_fn,
+    get_volume_matrix_fn,
+) -> None:
+    """Render the Transaction Counts or Volume matrix as an isolated fragment.
+
+    Uses a segmented control instead of st.tabs so only the selected matrix
+    is queried; st.tabs runs the body of every tab on each rerun.
+    """
+    view = st.segmented_control(
+        "Matrix",
+        ["Transaction Counts", "Volume"],
+        default="Transaction Counts",
+        key="matrix_view_tab1",
+        label_visibility="collapsed",
+    )
 
-    with sub_tab2:
+    if view == "Volume":
         volume_matrix = get_volume_matrix_fn(selected_symbol, start_date, end_date)
         render_volume_matrix(volume_matrix)
+    else:
+        tx_counts = get_transaction_counts_fn(selected_symbol, start_date, end_date)
+        render_transaction_counts_matrix(tx_counts)
 
 
 def render_routes_tab(
     earliest_date: date | None,
     get_routes_data_fn,
+    get_routes_summary_fn,
     get_route_daily_stats_fn,
     get_route_slippage_percentile_fn,
 ) -> None:
@@ -113,63 +155,120 @@ def render_routes_tab(
     start_date, end_date = render_date_range_selector("period_tab2", earliest_date)
 
     # Row 3: Filters
-    col1, col2 = st.columns(2)
+    col1, col2, col3 = st.columns(3)
     with col1:
         stablecoin_filter = render_stablecoin_filter("stablecoin_filter")
     with col2:
         min_amount, max_amount = render_transaction_size_filter("tx_size_filter")
+    with col3:
+        sort_by = render_routes_sort_selector("routes_sort")
 
     st.markdown("---")
 
-    # Get routes data and apply stablecoin filter (always use average slippage)
-    routes_df = get_routes_data_fn(start_date, end_date, min_amount, max_amount)
-    filtered_routes_df = filter_routes_by_stablecoin(routes_df, stablecoin_filter)
-
-    # Routes-specific stats (based on filtered data)
-    render_routes_stats(filtered_routes_df)
+    # Routes-specific stats (aggregated in SQL over all filtered routes)
+    summary = get_routes_summary_fn(start_date, end_date, min_amount, max_amount, stablecoin_filter)
+    render_routes_stats(summary)
 
     st.markdown("---")
 
+    render_route_explorer(
+        (start_date, end_date, min_amount, max_amount, stablecoin_filter),
+        sort_by,
+        summary["routes"],
+        get_routes_data_fn,
+        get_route_daily_stats_fn,
+        get_route_slippage_percentile_fn,
+    )
+
+
+@st.fragment
+def render_route_explorer(
+    filters: tuple,
+    sort_by: str,
+    total_routes: int,
+    get_routes_data_fn,
+    get_route_daily_stats_fn,
+    get_route_slippage_percentile_fn,
+) -> None:
+    """Render the paged routes table and the selected route's details.
+
+    Runs as a fragment: selecting a row or changing page reruns only this
+    section, not the filters and stats above it.
+    """
+    start_date, end_date = filters[0], filters[1]
+
+    # Fetch only the current page of routes (always use average slippage)
     st.subheader("All Routes - Average Slippage")
-    selected_route = render_routes_table_with_selection(filtered_routes_df, "route_selector")
+    cursor, page_index = get_page_cursor("routes_page", filters + (sort_by,))
+    routes_page_df = get_routes_data_fn(*filters, sort_by, ROUTES_PAGE_SIZE, cursor)
+    selected_route = render_routes_table_with_selection(routes_page_df, f"route_selector_{page_index}")
+    render_pager(
+        "routes_page",
+        page_index,
+        total_routes,
+        ROUTES_PAGE_SIZE,
+        get_route_cursor(routes_page_df, sort_by),
+    )
 
     # Display details for selected route
     if selected_route:
-        st.markdown("---")
-        st.subheader(f"Route Details: {selected_route['route_label']}")
-
-        # Percentile slider for selected route
-        percentile_value = render_percentile_slider("route_percentile")
-        percentile_label = get_percentile_label(percentile_value)
-
-        # Calculate and display slippage percentile
-        slippage_percentile = get_route_slippage_percentile_fn(
-            selected_route["source_token"],
-            selected_route["source_chain"],
-            selected_route["dest_token"],
-            selected_route["dest_chain"],
-            percentile_value,
+        render_route_detail(
+            selected_route,
             start_date,
             end_date,
+            get_route_daily_stats_fn,
+            get_route_slippage_percentile_fn,
         )
 
-        if slippage_percentile is not None:
-            st.metric(f"{percentile_label} Slippage", f"{slippage_percentile:.4f}%")
-        else:
-            st.metric(f"{percentile_label} Slippage", "N/A")
 
-        st.markdown("---")
+@st.fragment
+def render_route_detail(
+    selected_route: dict,
+    start_date: date,
+    end_date: date,
+    get_route_daily_stats_fn,
+    get_route_slippage_percentile_fn,
+) -> None:
+    """Render the percentile metric and daily charts for one route.
 
-        # Daily charts
-        daily_stats = get_route_daily_stats_fn(
-            selected_route["source_token"],
-            selected_route["source_chain"],
-            selected_route["dest_token"],
-            selected_route["dest_chain"],
-            start_date,
-            end_date,
-        )
-        render_route_daily_chart(daily_stats, selected_route["route_label"])
+    Runs as a fragment, so moving the percentile slider only recomputes the
+    metric and charts below it.
+    """
+    st.markdown("---")
+    st.subheader(f"Route Details: {selected_route['route_label']}")
+
+    # Percentile slider for selected route
+    percentile_value = render_percentile_slider("route_percentile")
+    percentile_label = get_percentile_label(percentile_value)
+
+    # Calculate and display slippage percentile
+    slippage_percentile = get_route_slippage_percentile_fn(
+        selected_route["source_token"],
+        selected_route["source_chain"],
+        selected_route["dest_token"],
+        selected_route["dest_chain"],
+        percentile_value,
+        start_date,
+        end_date,
+    )
+
+    if slippage_percentile is not None:
+        st.metric(f"{percentile_label} Slippage", f"{slippage_percentile:.4f}%")
+    else:
+        st.metric(f"{percentile_label} Slippage", "N/A")
+
+    st.markdown("---")
+
+    # Daily charts
+    daily_stats = get_route_daily_stats_fn(
+        selected_route["source_token"],
+        selected_route["source_chain"],
+        selected_route["dest_token"],
+        selected_route["dest_chain"],
+        start_date,
+        end_date,
+    )
+    render_route_daily_chart(daily_stats, selected_route["route_label"])
 
 
 def render_zero_fee_routes_tab() -> None:
@@ -211,3 +310,44 @@ def render_zero_fee_routes_tab() -> None:
         render_zero_fee_matrix(USDT0_ZERO_FEE_ROUTES, "USDT0", ZERO_FEE_CHAINS_USDT0)
     else:
         st.info("No USDT0 zero-fee routes configured yet.")
+
+
+def render_query_stats_tab(get_query_stats_fn, explain_query_fn) -> None:
+    """Render the hidden admin page with slow and frequent SQL statements."""
+    st.header("Query Stats")
+    st.caption("Statements recently executed by this server process (in-memory ring buffer).")
+
+    col1, col2 = st.columns([3, 1])
+    with col2:
+        if render_refresh_button("refresh_query_stats"):
+            st.rerun()
+
+    slowest, most_frequent = get_query_stats_fn()
+    if slowest.empty:
+        st.info("No queries recorded yet.")
+        return
+
+    st.subheader("Slowest Statements")
+    selected_slow = render_query_table(slowest, "slowest_queries")
+
+    st.subheader("Most Frequent Statements")
+    selected_frequent = render_query_table(most_frequent, "frequent_queries")
+
+    if selected_slow is not None:
+        selected = slowest.iloc[selected_slow]
+    elif selected_frequent is not None:
+        selected = most_frequent.iloc[selected_frequent]
+    else:
+        st.caption("Select a statement to see its query plan.")
+        return
+
+    st.markdown("---")
+    st.subheader("Query Plan")
+    st.code(selected["statement"], language="sql")
+
+    analyze = st.checkbox("EXPLAIN ANALYZE (executes the statement)", key="explain_analyze")
+    if st.button("Explain", key="explain_query"):
+        try:
+            st.code(explain_query_fn(selected["statement"], selected["parameters"], analyze))
+        except Exception as e:
+            st.error(f"Could not explain statement: {e}")
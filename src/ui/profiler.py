@@ -0,0 +1,164 @@
+"""Opt-in per-rerun timing of render functions and cached data calls.
+
+Enable with the PROFILE_RENDERS=1 environment variable or the ?profile=1 query
+parameter. Every render_* function and cached_* call then records its wall
+time (and cache hit/miss) for the current rerun, shown in a breakdown panel.
+With PROFILE_DUMP_DIR set, a cProfile (or pyinstrument, when installed and
+PROFILE_TOOL=pyinstrument) trace of each rerun is written there as well.
+"""
+import functools
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+import streamlit as st
+
+_state = threading.local()
+_wrappers = {}
+
+
+def is_profiling_enabled() -> bool:
+    """Check the env flag and the ?profile=1 query parameter."""
+    if os.getenv("PROFILE_RENDERS", "").lower() in ("1", "true", "yes"):
+        return True
+    return st.query_params.get("profile") == "1"
+
+
+def _active() -> bool:
+    return getattr(_state, "records", None) is not None
+
+
+def _record(name: str, kind: str, fn, args, kwargs):
+    """Run fn and append its timing to the current rerun's records."""
+    record = {"name": name, "kind": kind, "depth": _state.depth, "ms": None, "cache": None}
+    _state.records.append(record)
+    _state.depth += 1
+    previous_miss = getattr(_state, "cache_miss", False)
+    _state.cache_miss = False
+    started = time.perf_counter()
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        record["ms"] = (time.perf_counter() - started) * 1000
+        if kind == "cache":
+            record["cache"] = "miss" if _state.cache_miss else "hit"
+        _state.cache_miss = previous_miss
+        _state.depth -= 1
+
+
+def profiled(fn, kind: str = "render"):
+    """Wrap a function so it is timed while a profiled rerun is active."""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not _active():
+            return fn(*args, **kwargs)
+        return _record(fn.__name__, kind, fn, args, kwargs)
+
+    wrapper.__profiled__ = True
+    return wrapper
+
+
+def profiled_cache_data(**cache_kwargs):
+    """Drop-in for st.cache_data that also reports cache hits and misses.
+
+    The undecorated function only runs on a cache miss, so it flags the miss
+    for the timing wrapper around the cached function.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def mark_miss(*args, **kwargs):
+            _state.cache_miss = True
+            return fn(*args, **kwargs)
+
+        return profiled(st.cache_data(**cache_kwargs)(mark_miss), kind="cache")
+
+    return decorator
+
+
+def instrument_render_functions(*modules) -> None:
+    """Replace every render_* function in the given modules with a profiled wrapper.
+
+    A function imported into several modules shares one wrapper, and already
+    wrapped functions are left alone, so this is safe to call on every rerun.
+    """
+    for module in modules:
+        for name, value in list(vars(module).items()):
+            if name.startswith("render_") and callable(value) and not getattr(value, "__profiled__", False):
+                if value not in _wrappers:
+                    _wrappers[value] = profiled(value)
+                setattr(module, name, _wrappers[value])
+
+
+def start_rerun() -> None:
+    """Start collecting timings (and an optional trace) for this rerun."""
+    _state.records = []
+    _state.depth = 0
+    _state.started = time.perf_counter()
+    _state.tracer = None
+
+    dump_dir = os.getenv("PROFILE_DUMP_DIR")
+    if not dump_dir:
+        return
+    if os.getenv("PROFILE_TOOL") == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            Profiler = None
+        if Profiler:
+            _state.tracer = ("pyinstrument", Profiler())
+            _state.tracer[1].start()
+            return
+
+    import cProfile
+
+    _state.tracer = ("cprofile", cProfile.Profile())
+    _state.tracer[1].enable()
+
+
+def finish_rerun() -> tuple[list[dict], float]:
+    """Stop collecting and dump the trace if enabled. Returns (records, total ms)."""
+    records = getattr(_state, "records", None) or []
+    total_ms = (time.perf_counter() - getattr(_state, "started", time.perf_counter())) * 1000
+    _state.records = None
+
+    tracer = getattr(_state, "tracer", None)
+    _state.tracer = None
+    if tracer:
+        dump_dir = Path(os.getenv("PROFILE_DUMP_DIR"))
+        dump_dir.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        tool, profiler = tracer
+        if tool == "pyinstrument":
+            profiler.stop()
+            (dump_dir / f"rerun-{stamp}.html").write_text(profiler.output_html())
+        else:
+            profiler.disable()
+            profiler.dump_stats(dump_dir / f"rerun-{stamp}.prof")
+
+    return records, total_ms
+
+
+def render_profile_panel(records: list[dict], total_ms: float) -> None:
+    """Render the per-rerun timing breakdown."""
+    import pandas as pd
+
+    with st.expander(f"Render profile: {total_ms:,.0f} ms this rerun", expanded=True):
+        if not records:
+            st.caption("No profiled calls in this rerun.")
+            return
+
+        df = pd.DataFrame(records)
+        df["call"] = df.apply(lambda r: " " * r["depth"] + r["name"], axis=1)
+        hits = (df["cache"] == "hit").sum()
+        misses = (df["cache"] == "miss").sum()
+        st.caption(f"Cache: {hits} hit(s), {misses} miss(es)")
+        st.dataframe(
+            df[["call", "kind", "ms", "cache"]],
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                "call": st.column_config.TextColumn("Call", width="large"),
+                "ms": st.column_config.NumberColumn("Wall Time", format="%.1f ms"),
+            },
+        )
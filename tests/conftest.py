@@ -0,0 +1,5 @@
+import os
+
+# src.database creates its engine at import time; these tests never connect to it
+os.environ.setdefault("DATABASE_URL", "postgresql+psycopg2://localhost/stablecoins_test")
+os.environ.setdefault("ARCHIVE_DIR", "")
@@ -0,0 +1,44 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+
+from src.api_client import AdaptiveRateController, parse_retry_after
+
+
+@pytest.mark.parametrize("value, expected", [("5", 5.0), ("0.5", 0.5), ("-3", 0.0), (None, None), ("", None), ("soon", None)])
+def test_parse_retry_after_seconds(value, expected):
+    assert parse_retry_after(value) == expected
+
+
+def test_parse_retry_after_http_date():
+    retry_at = datetime.now(timezone.utc) + timedelta(seconds=30)
+    assert 25 <= parse_retry_after(format_datetime(retry_at, usegmt=True)) <= 30
+
+
+def test_parse_retry_after_past_date_is_zero():
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+
+def test_controller_speeds_up_to_min_delay():
+    controller = AdaptiveRateController(initial_delay=1.0, min_delay=0.5, max_delay=10.0, step=0.2, factor=2.0)
+    controller.on_success()
+    assert controller.delay == pytest.approx(0.8)
+    for _ in range(10):
+        controller.on_success()
+    assert controller.delay == 0.5
+
+
+def test_controller_backs_off_up_to_max_delay():
+    controller = AdaptiveRateController(initial_delay=1.0, min_delay=0.5, max_delay=10.0, step=0.2, factor=2.0)
+    controller.on_throttle()
+    assert controller.delay == 2.0
+    for _ in range(10):
+        controller.on_throttle()
+    assert controller.delay == 10.0
+
+
+def test_controller_honours_retry_after():
+    controller = AdaptiveRateController(initial_delay=1.0, min_delay=0.5, max_delay=10.0, step=0.2, factor=2.0)
+    controller.on_throttle(retry_after=7.0)
+    assert controller.delay == 7.0
@@ -0,0 +1,102 @@
+from datetime import datetime
+
+from src.archive import INDEX_FILE, SEGMENTS_DIR, PageArchive
+
+WINDOW = (datetime(2024, 1, 1), datetime(2024, 1, 2))
+
+
+def _archive(root, **kwargs) -> PageArchive:
+    return PageArchive(root, compression="gzip", **kwargs)
+
+
+def test_append_and_read_back(tmp_path):
+    archive = _archive(tmp_path)
+    first = archive.append_page([{"depositAddress": "a"}], *WINDOW, params={"page": 1})
+    second = archive.append_page([{"depositAddress": "b"}], *WINDOW)
+
+    assert second["offset"] == first["offset"] + first["length"]
+    records = [record for _, record in archive.iter_pages()]
+    assert [record["transactions"] for record in records] == [
+        [{"depositAddress": "a"}],
+        [{"depositAddress": "b"}],
+    ]
+    assert records[0]["params"] == {"page": 1}
+
+
+def test_find_pages_filters_by_window(tmp_path):
+    archive = _archive(tmp_path)
+    archive.append_page([], datetime(2024, 1, 1), datetime(2024, 1, 2))
+    archive.append_page([], datetime(2024, 2, 1), datetime(2024, 2, 2))
+
+    entries = archive.find_pages(start=datetime(2024, 1, 15))
+    assert [entry["window_start"] for entry in entries] == ["2024-02-01T00:00:00"]
+
+
+def test_recovery_truncates_unindexed_segment_tail(tmp_path):
+    archive = _archive(tmp_path)
+    entry = archive.append_page([{"depositAddress": "a"}], *WINDOW)
+    segment = tmp_path / SEGMENTS_DIR / entry["segment"]
+    with open(segment, "ab") as f:
+        f.write(b"torn page without an index entry")
+
+    recovered = _archive(tmp_path)
+    assert segment.stat().st_size == entry["offset"] + entry["length"]
+    assert [record["transactions"] for _, record in recovered.iter_pages()] == [[{"depositAddress": "a"}]]
+
+
+def test_recovery_drops_torn_index_line(tmp_path):
+    archive = _archive(tmp_path)
+    archive.append_page([], *WINDOW)
+    with open(tmp_path / INDEX_FILE, "a") as f:
+        f.write('{"segment": "segment-0000')
+
+    recovered = _archive(tmp_path)
+    recovered.append_page([], *WINDOW)
+    assert len(recovered.read_index()) == 2
+
+
+def test_recovery_ignores_foreign_files(tmp_path):
+    archive = _archive(tmp_path)
+    archive.append_page([], *WINDOW)
+    (tmp_path / SEGMENTS_DIR / ".DS_Store").write_bytes(b"junk")
+    (tmp_path / SEGMENTS_DIR / ".segment-000001.ndjson.gz.swp").write_bytes(b"junk")
+
+    recovered = _archive(tmp_path)
+    assert (tmp_path / SEGMENTS_DIR / ".DS_Store").read_bytes() == b"junk"
+    assert len(recovered.read_index()) == 1
+
+
+def test_rolls_over_to_new_segment(tmp_path):
+    archive = _archive(tmp_path, segment_pages=2)
+    entries = [archive.append_page([], *WINDOW) for _ in range(5)]
+
+    segments = [entry["segment"] for entry in entries]
+    assert len(set(segments)) == 3
+    assert segments[0] == segments[1] != segments[2]
+
+
+def _write_pages(root, writer: int, pages: int) -> None:
+    archive = PageArchive(root, compression="gzip", segment_pages=3)
+    for page in range(pages):
+        archive.append_page([{"writer": writer, "page": page}], *WINDOW)
+
+
+def test_concurrent_writers_keep_every_page(tmp_path):
+    import multiprocessing
+
+    context = multiprocessing.get_context("spawn")
+    processes = [context.Process(target=_write_pages, args=(tmp_path, writer, 10)) for writer in range(3)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(timeout=60)
+        assert process.exitcode == 0
+
+    archive = _archive(tmp_path, segment_pages=3)
+    pages = [(record["transactions"][0]["writer"], record["transactions"][0]["page"]) for _, record in archive.iter_pages()]
+    assert sorted(pages) == [(writer, page) for writer in range(3) for page in range(10)]
+
+    per_segment = {}
+    for entry in archive.read_index():
+        per_segment[entry["segment"]] = per_segment.get(entry["segment"], 0) + 1
+    assert max(per_segment.values()) <= 3
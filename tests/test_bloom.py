@@ -0,0 +1,58 @@
+from src.bloom import BloomFilter, RecentKeysFilter
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(1000, 0.01)
+    keys = [f"deposit-{i}" for i in range(1000)]
+    for key in keys:
+        bloom.add(key)
+
+    assert len(bloom) == 1000
+    assert all(key in bloom for key in keys)
+
+
+def test_bloom_filter_false_positive_rate():
+    bloom = BloomFilter(1000, 0.01)
+    for i in range(1000):
+        bloom.add(f"deposit-{i}")
+
+    false_positives = sum(f"other-{i}" in bloom for i in range(10000))
+    # Expected ~100 at the configured rate; allow generous slack
+    assert false_positives < 300
+
+
+def test_empty_bloom_filter_contains_nothing():
+    bloom = BloomFilter(10, 0.01)
+    assert "deposit" not in bloom
+    assert bloom.size >= 8 and bloom.hash_count >= 1
+
+
+def test_recent_keys_filter_contains_all():
+    recent = RecentKeysFilter(100, 0.01)
+    recent.update(["a", "b", "c"])
+
+    assert "a" in recent
+    assert recent.contains_all(["a", "b", "c"])
+    assert not recent.contains_all(["a", "never-added"])
+    assert recent.contains_all([])
+
+
+def test_recent_keys_filter_ages_out_old_generations():
+    recent = RecentKeysFilter(10, 0.001)
+    recent.update(f"old-{i}" for i in range(10))
+    # Filling a second generation keeps the first one as the previous generation
+    recent.update(f"mid-{i}" for i in range(10))
+    assert recent.contains_all(f"old-{i}" for i in range(10))
+
+    recent.update(f"new-{i}" for i in range(10))
+    assert recent.contains_all(f"mid-{i}" for i in range(10))
+    assert recent.contains_all(f"new-{i}" for i in range(10))
+    assert sum(f"old-{i}" in recent for i in range(10)) < 10
+
+
+def test_recent_keys_filter_clear():
+    recent = RecentKeysFilter(10, 0.01)
+    recent.update(f"key-{i}" for i in range(15))
+    recent.clear()
+
+    assert not any(f"key-{i}" in recent for i in range(15))
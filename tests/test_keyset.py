@@ -0,0 +1,84 @@
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from src import duckdb_service
+from src.parquet_export import PARTITION_FILE, TOKENS_FILE, TRANSACTIONS_DIR
+from src.ui.components import get_route_cursor
+
+
+def _routes(rows) -> pd.DataFrame:
+    return pd.DataFrame(rows, columns=["Volume", "Token In ID", "Token Out ID"])
+
+
+def test_route_cursor_from_last_row():
+    df = _routes([(300.5, 1, 2), (100.25, 3, 4)])
+    cursor = get_route_cursor(df)
+    assert cursor == (100.25, 3, 4)
+    assert [type(value) for value in cursor] == [float, int, int]
+
+
+def test_route_cursor_empty():
+    assert get_route_cursor(pd.DataFrame()) is None
+
+
+@pytest.fixture
+def export_dir(tmp_path, monkeypatch):
+    pytest.importorskip("duckdb")
+    pytest.importorskip("pyarrow")
+
+    rows = []
+    # 12 routes in 3 groups of 4 tied volumes, split across pages;
+    # 0.1 + 0.2 only sums to 0.3 exactly as decimals
+    for route in range(12):
+        token_in_id, token_out_id = route // 3 + 1, route % 3 + 10
+        group = route // 4
+        amounts = [0.1 + group, 0.2] if route % 4 == 0 else [0.3 + group]
+        for amount in amounts:
+            rows.append({
+                "id": len(rows) + 1,
+                "token_in_id": token_in_id,
+                "token_out_id": token_out_id,
+                "amount_in": amount,
+                "amount_out": amount,
+                "slippage": 0.0,
+                "status": "SUCCESS",
+                "created_at": datetime(2024, 1, 1, 12),
+                "source_token": "USDC",
+                "source_chain": "Ethereum",
+                "source_is_stablecoin": True,
+                "dest_token": "USDC",
+                "dest_chain": "Base",
+                "dest_is_stablecoin": True,
+            })
+    partition = tmp_path / TRANSACTIONS_DIR / "date=2024-01-01" / PARTITION_FILE
+    partition.parent.mkdir(parents=True)
+    pd.DataFrame(rows).to_parquet(partition, index=False)
+    pd.DataFrame({"id": [1], "symbol": ["USDC"], "chain": ["Ethereum"]}).to_parquet(
+        tmp_path / TOKENS_FILE, index=False
+    )
+
+    monkeypatch.setenv("EXPORT_DIR", str(tmp_path))
+    monkeypatch.setattr(duckdb_service, "_connection", None)
+    return tmp_path
+
+
+def test_keyset_pages_match_offset_pages(export_dir):
+    full = duckdb_service.get_routes_data()
+    assert len(full) == 12
+    assert full["Volume"].nunique() == 3
+
+    pages, cursor = [], None
+    while True:
+        page = duckdb_service.get_routes_data(limit=5, after=cursor)
+        if page.empty:
+            break
+        pages.append(page)
+        cursor = get_route_cursor(page)
+
+    keyset = pd.concat(pages, ignore_index=True)
+    assert [len(page) for page in pages] == [5, 5, 2]
+    assert keyset[["Token In ID", "Token Out ID"]].values.tolist() == (
+        full[["Token In ID", "Token Out ID"]].values.tolist()
+    )
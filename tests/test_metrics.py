@@ -0,0 +1,81 @@
+from src.metrics import Counter, Gauge, Histogram, MetricsRegistry
+
+
+def test_counter_render():
+    counter = Counter("rows_total", "Rows stored")
+    counter.inc()
+    counter.inc(2, status="ok")
+
+    assert counter.render().splitlines() == [
+        "# HELP rows_total Rows stored",
+        "# TYPE rows_total counter",
+        "rows_total 1",
+        'rows_total{status="ok"} 2',
+    ]
+
+
+def test_gauge_render_keeps_last_value():
+    gauge = Gauge("lag_seconds", "Lag")
+    gauge.set(5.0)
+    gauge.set(2.5)
+
+    assert gauge.render().splitlines()[-1] == "lag_seconds 2.5"
+
+
+def test_histogram_render_is_cumulative():
+    histogram = Histogram("request_seconds", "Latency", buckets=(0.1, 1.0))
+    histogram.observe(0.05)
+    histogram.observe(0.5)
+    histogram.observe(5.0)
+
+    assert histogram.render().splitlines()[2:] == [
+        'request_seconds_bucket{le="0.1"} 1',
+        'request_seconds_bucket{le="1.0"} 2',
+        'request_seconds_bucket{le="+Inf"} 3',
+        "request_seconds_sum 5.55",
+        "request_seconds_count 3",
+    ]
+
+
+def test_registry_render_joins_metrics():
+    registry = MetricsRegistry()
+    registry.register(Counter("a_total", "A")).inc()
+    registry.register(Gauge("b", "B")).set(1)
+
+    text = registry.render()
+    assert text.endswith("\n")
+    assert "a_total 1" in text and "b 1" in text
+
+
+def test_registry_merges_worker_snapshot():
+    def build():
+        registry = MetricsRegistry()
+        counter = registry.register(Counter("jobs_total", "Jobs"))
+        gauge = registry.register(Gauge("lag", "Lag"))
+        histogram = registry.register(Histogram("seconds", "Seconds", buckets=(1.0,)))
+        return registry, counter, gauge, histogram
+
+    parent, counter, gauge, histogram = build()
+    counter.inc(job="sync")
+    gauge.set(10)
+    histogram.observe(0.5)
+
+    worker, worker_counter, worker_gauge, worker_histogram = build()
+    worker_counter.inc(2, job="sync")
+    worker_gauge.set(3)
+    worker_histogram.observe(2.0)
+
+    parent.merge(worker.snapshot())
+
+    assert counter.snapshot() == {(("job", "sync"),): 3}
+    assert gauge.snapshot() == {(): 3}
+    assert histogram.snapshot() == {(): ([1, 2], 2.5)}
+
+
+def test_snapshot_is_a_copy():
+    histogram = Histogram("seconds", "Seconds", buckets=(1.0,))
+    histogram.observe(0.5)
+    snapshot = histogram.snapshot()
+    histogram.observe(0.5)
+
+    assert snapshot == {(): ([1, 1], 0.5)}
@@ -0,0 +1,90 @@
+from datetime import datetime
+
+import numpy as np
+
+from src.const import (
+    FIELD_AMOUNT_IN,
+    FIELD_AMOUNT_OUT,
+    FIELD_CREATED_AT,
+    FIELD_DEPOSIT_ADDRESS,
+    FIELD_DEPOSIT_KEY,
+    FIELD_DEST_ASSET,
+    FIELD_ORIGIN_ASSET,
+    FIELD_STATUS,
+)
+from src.page_decoder import compute_slippage, decode_page, parse_created_at
+
+
+def _tx(key, origin="nep141:a.near", dest="nep141:b.near", amount_in="100", amount_out="99",
+        created_at="2024-01-02T03:04:05.123456Z", **extra) -> dict:
+    return {
+        FIELD_DEPOSIT_KEY: key,
+        FIELD_ORIGIN_ASSET: origin,
+        FIELD_DEST_ASSET: dest,
+        FIELD_AMOUNT_IN: amount_in,
+        FIELD_AMOUNT_OUT: amount_out,
+        FIELD_CREATED_AT: created_at,
+        **extra,
+    }
+
+
+def test_compute_slippage():
+    amount_in = np.array([100.0, 0.0, -5.0, 50.0])
+    amount_out = np.array([99.0, 10.0, 1.0, 55.0])
+    np.testing.assert_allclose(compute_slippage(amount_in, amount_out), [1.0, 0.0, 0.0, -10.0])
+
+
+def test_parse_created_at_utc():
+    parsed = parse_created_at(["2024-01-02T03:04:05.123456Z", None])
+    assert parsed[0] == np.datetime64("2024-01-02T03:04:05.123456")
+    assert np.isnat(parsed[1])
+
+
+def test_parse_created_at_offsets_and_invalid():
+    parsed = parse_created_at(["2024-01-02T05:04:05+02:00", "not a date", "2024-01-02T03:04:05Z"])
+    assert parsed[0] == np.datetime64("2024-01-02T03:04:05")
+    assert np.isnat(parsed[1])
+    assert parsed[2] == np.datetime64("2024-01-02T03:04:05")
+
+
+def test_decode_page():
+    batch = decode_page([
+        _tx("k1", **{FIELD_DEPOSIT_ADDRESS: "addr1", FIELD_STATUS: "SUCCESS"}),
+        _tx("k2", origin="nep141:b.near", dest="nep141:c.near", amount_in=50, amount_out=49.5),
+    ])
+
+    assert len(batch) == 2
+    assert batch.deposit_keys.tolist() == ["k1", "k2"]
+    assert batch.deposit_addresses.tolist() == ["addr1", ""]
+    assert batch.statuses.tolist() == ["SUCCESS", ""]
+    np.testing.assert_allclose(batch.amount_in, [100.0, 50.0])
+    np.testing.assert_allclose(batch.slippage, [1.0, 1.0])
+    assert batch.created_at_datetimes()[0] == datetime(2024, 1, 2, 3, 4, 5, 123456)
+
+    assert sorted(batch.asset_ids.tolist()) == ["nep141:a.near", "nep141:b.near", "nep141:c.near"]
+    assert batch.asset_ids[batch.origin_codes].tolist() == ["nep141:a.near", "nep141:b.near"]
+    assert batch.asset_ids[batch.dest_codes].tolist() == ["nep141:b.near", "nep141:c.near"]
+
+
+def test_decode_page_drops_invalid_and_duplicate_rows():
+    batch = decode_page([
+        _tx("k1"),
+        _tx(""),
+        _tx("k3", origin=None),
+        _tx("k4", amount_in="abc"),
+        _tx("k5", created_at="2023-12-31T00:00:00Z", dest=""),
+        _tx("k6", created_at="garbage"),
+        _tx("k1", amount_in="1"),
+    ])
+
+    assert batch.deposit_keys.tolist() == ["k1"]
+    np.testing.assert_allclose(batch.amount_in, [100.0])
+    # Dropped rows still count towards the oldest timestamp seen on the page
+    assert batch.oldest == datetime(2023, 12, 31)
+
+
+def test_decode_empty_page():
+    batch = decode_page([])
+    assert len(batch) == 0
+    assert batch.oldest is None
+    assert len(batch.asset_ids) == 0
@@ -0,0 +1,61 @@
+import dataclasses
+
+import pytest
+
+from src import parser
+from src.const import UNKNOWN_SYMBOL
+from src.parser import UNKNOWN_ASSET, ParsedAsset, parse_asset_id, parse_asset_ids
+
+USDT_ETH = "0xdac17f958d2ee523a2206206994597c13d831ec7"
+
+
+@pytest.fixture(autouse=True)
+def restore_mappings():
+    mappings = parser.get_mappings()
+    parser.clear_parser_cache()
+    yield
+    parser.set_mappings(*mappings)
+
+
+@pytest.mark.parametrize("asset_id, expected", [
+    (f"nep141:eth-{USDT_ETH}.omft.near", ParsedAsset("eth", USDT_ETH, "USDT")),
+    ("nep141:wrap.near", ParsedAsset("NEAR", "wrap.near", "WNEAR")),
+    ("nep245:v2_1.omni.hot.tg:56_11111111111111111111", ParsedAsset("BNB", "native", "BNB")),
+    ("nep245:v2_1.omni.hot.tg:999999_abc", ParsedAsset(None, "abc", UNKNOWN_SYMBOL)),
+    ("nep245:v2_1.omni.hot.tg:56", UNKNOWN_ASSET),
+    (f"1cs_v1:eth:erc20:{USDT_ETH}", ParsedAsset("ETH", USDT_ETH, "USDT")),
+    ("1cs_v1:eth:erc20", UNKNOWN_ASSET),
+    ("erc20:0xabc", UNKNOWN_ASSET),
+    ("no-protocol", UNKNOWN_ASSET),
+    ("", ParsedAsset(None, None, None)),
+])
+def test_parse_asset_id(asset_id, expected):
+    assert parse_asset_id(asset_id) == expected
+
+
+def test_parsed_asset_is_frozen():
+    asset = parse_asset_id("nep141:wrap.near")
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        asset.symbol = "NEAR"
+    assert not hasattr(asset, "__dict__")
+
+
+def test_parse_asset_ids_parses_each_id_once():
+    ids = ["nep141:wrap.near", "nep141:wrap.near", "nep245:v2_1.omni.hot.tg:56_11111111111111111111"]
+
+    parsed = parse_asset_ids(ids)
+
+    assert parsed == {
+        "nep141:wrap.near": ParsedAsset("NEAR", "wrap.near", "WNEAR"),
+        "nep245:v2_1.omni.hot.tg:56_11111111111111111111": ParsedAsset("BNB", "native", "BNB"),
+    }
+    assert parse_asset_id.cache_info().misses == 2
+
+
+def test_set_mappings_drops_cached_parses():
+    asset_id = "1cs_v1:foo:erc20:0xabc"
+    assert parse_asset_id(asset_id).symbol == UNKNOWN_SYMBOL
+
+    parser.set_mappings({("FOO", "0xabc"): "FOOD"}, {})
+
+    assert parse_asset_id(asset_id) == ParsedAsset("FOO", "0xabc", "FOOD")
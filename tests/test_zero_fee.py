@@ -0,0 +1,28 @@
+import pandas as pd
+
+from src.ui.components import get_zero_fee_statuses
+
+
+def _routes(*rows) -> pd.DataFrame:
+    return pd.DataFrame(rows, columns=["Source Token", "Source Chain", "Dest Token", "Dest Chain"])
+
+
+def test_zero_fee_statuses():
+    df = _routes(
+        ("USDC", "ETH", "USDC", "OP"),  # published USDC route
+        ("USDT0", "eth", "USDT", "optimism"),  # USDT variants normalize to USDT
+        ("USDC", "ETH", "USDT", "OP"),  # different tokens
+        ("USDC", "sol", "USDC", "ETH"),  # chain pair not published
+        ("WETH", "ETH", "WETH", "OP"),  # not a zero-fee token
+    )
+    assert get_zero_fee_statuses(df).tolist() == ["✓", "✓", "", "", ""]
+
+
+def test_zero_fee_statuses_keeps_index():
+    df = _routes(("USDC", "ETH", "USDC", "OP"), ("USDC", "ETH", "USDT", "OP"))
+    df.index = [10, 20]
+    assert get_zero_fee_statuses(df).to_dict() == {10: "✓", 20: ""}
+
+
+def test_zero_fee_statuses_empty():
+    assert get_zero_fee_statuses(_routes()).empty